@@ -1,6 +1,6 @@
 from functools import lru_cache
 import os
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -18,17 +18,32 @@ class Settings(BaseSettings):
     # ── Gmail OAuth ───────────────────────────────────────────────────────────
     GMAIL_TOKEN_FILE: str | None = None
     GMAIL_DELEGATED_USER: str | None = None  # mailbox to scan; None → "me"
+    GMAIL_CREDENTIAL_REFRESH_SECONDS: int = 300         # background token check interval; 0 = disabled
+    GMAIL_CREDENTIAL_REFRESH_MARGIN_SECONDS: int = 600  # refresh when the token expires within this
 
     # ── Gmail fetch tuning ────────────────────────────────────────────────────
+    # "googleapiclient" runs blocking I/O on the scan executor; "httpx" awaits
+    # Gmail on the event loop over pooled keep-alive connections.
+    GMAIL_TRANSPORT: Literal["googleapiclient", "httpx"] = "googleapiclient"
     GMAIL_QUERY_WINDOW_DAYS: int = 30
     GMAIL_MAX_MESSAGES: int = 200
     GMAIL_LIST_PAGE_SIZE: int = 50
-    GMAIL_BATCH_SIZE: int = 100           # messages per Gmail batch-get request
-    GMAIL_RETRY_BACKOFF_SECONDS: int = 2  # wait before retrying 429-throttled msgs
+    GMAIL_LIST_SHARD_DAYS: int = 30       # longer windows are listed as concurrent date shards
+    GMAIL_LIST_CONCURRENCY: int = 4       # date shards listed at once
+    GMAIL_BATCH_SIZE: int = 100           # max messages per Gmail batch-get request (adaptive below it)
+    GMAIL_RETRY_BACKOFF_SECONDS: int = 2  # base of the jittered exponential backoff for 429/5xx retries
+    GMAIL_RETRY_BUDGET_SECONDS: int = 60  # total time spent retrying throttled msgs before dropping them
+    GMAIL_INCREMENTAL_SYNC: bool = True   # list only mail added since the last scan's historyId
+    GMAIL_TWO_PHASE_FETCH: bool = True    # fetch metadata first; full payload only for likely job mail
+    GMAIL_PAYLOAD_CACHE_DIR: str | None = None  # keep raw message JSON here for re-parsing; None → disabled
+    GMAIL_PAYLOAD_CACHE_MAX_MB: int = 512       # LRU-evict cached payloads beyond this size
 
     # ── Scan behaviour ────────────────────────────────────────────────────────
     SCAN_RATE_LIMIT_SECONDS: int = 10     # minimum gap between scans
     SCAN_EXECUTOR_MAX_WORKERS: int = 4    # thread-pool workers for Gmail I/O
+    SCAN_PIPELINE_QUEUE_SIZE: int = 2     # fetched batches buffered ahead of filter/insert
+    SCAN_CLASSIFY_PROCESSES: int = 2      # worker processes for filtering/parsing/matching; 0 = inline
+    GMAIL_FETCH_CONCURRENCY: int = 4      # batch-get requests in flight at once (bounded by the executor)
     SSE_KEEPALIVE_TIMEOUT: float = 60.0   # seconds before SSE keepalive is sent
     SCAN_HISTORY_LIMIT: int = 10          # rows returned by /scan/history
     SCAN_INTERVAL_HOURS: float = 0        # auto-scan interval; 0 = disabled
@@ -1,12 +1,15 @@
 """Shared FastAPI dependencies and factory helpers used across all route modules."""
 import logging
 import secrets
+import threading
 from typing import Optional
 
 from fastapi import Header, HTTPException, status
 
 from app.config import get_settings
-from app.job_tracker.email_scanner.gmail_client import GmailClient
+from app.job_tracker.email_scanner.async_gmail_client import AsyncGmailClient
+from app.job_tracker.email_scanner.gmail_client import GmailClient, GmailClientBase
+from app.job_tracker.email_scanner.payload_cache import PayloadCache
 from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
 from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
 from app.job_tracker.services.job_application_service import JobApplicationService
@@ -21,16 +24,70 @@ async def check_api_key(x_api_key: Optional[str] = Header(None, alias="X-Api-Key
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or missing API key")
 
 
-def make_gmail_client(settings) -> GmailClient:
-    return GmailClient(
+# Process-wide Gmail clients keyed by their settings. A client keeps its
+# credentials, per-thread discovery services and pooled HTTP connections, so
+# only the first scan pays for loading the token and building the service.
+_gmail_clients: dict[tuple, GmailClientBase] = {}
+_gmail_clients_lock = threading.Lock()
+
+
+def make_gmail_client(settings) -> GmailClientBase:
+    """Return the shared Gmail client for these settings, creating it on first use.
+
+    Scans are single-flight (see scan_rate_limit.try_start_scan), so the
+    per-scan state a client carries (latest_history_id, fetch stats) is never
+    used by two scans at once; list_message_ids() resets it for each scan.
+    """
+    options = dict(
         token_file=settings.GMAIL_TOKEN_FILE,
         delegated_user=settings.GMAIL_DELEGATED_USER,
         query_window_days=settings.GMAIL_QUERY_WINDOW_DAYS,
         max_messages=settings.GMAIL_MAX_MESSAGES,
         page_size=settings.GMAIL_LIST_PAGE_SIZE,
+        list_shard_days=settings.GMAIL_LIST_SHARD_DAYS,
+        list_concurrency=settings.GMAIL_LIST_CONCURRENCY,
         batch_size=settings.GMAIL_BATCH_SIZE,
         retry_backoff_seconds=settings.GMAIL_RETRY_BACKOFF_SECONDS,
+        retry_budget_seconds=settings.GMAIL_RETRY_BUDGET_SECONDS,
     )
+    key = (
+        settings.GMAIL_TRANSPORT,
+        settings.GMAIL_FETCH_CONCURRENCY,
+        settings.GMAIL_PAYLOAD_CACHE_DIR,
+        settings.GMAIL_PAYLOAD_CACHE_MAX_MB,
+        *sorted(options.items()),
+    )
+    with _gmail_clients_lock:
+        client = _gmail_clients.get(key)
+        if client is None:
+            if settings.GMAIL_PAYLOAD_CACHE_DIR:
+                options["payload_cache"] = make_payload_cache(settings)
+            if settings.GMAIL_TRANSPORT == "httpx":
+                client = AsyncGmailClient(
+                    max_connections=max(settings.GMAIL_FETCH_CONCURRENCY, settings.GMAIL_LIST_CONCURRENCY),
+                    **options,
+                )
+            else:
+                client = GmailClient(**options)
+            _gmail_clients[key] = client
+    return client
+
+
+def make_payload_cache(settings) -> PayloadCache:
+    return PayloadCache(
+        settings.GMAIL_PAYLOAD_CACHE_DIR,
+        max_bytes=settings.GMAIL_PAYLOAD_CACHE_MAX_MB * 1024 * 1024,
+    )
+
+
+async def close_gmail_clients() -> None:
+    """Drop the cached Gmail clients, closing pooled asyncio connections."""
+    with _gmail_clients_lock:
+        clients = list(_gmail_clients.values())
+        _gmail_clients.clear()
+    for client in clients:
+        if isinstance(client, AsyncGmailClient):
+            await client.aclose()
 
 
 def make_svc(session) -> JobApplicationService:
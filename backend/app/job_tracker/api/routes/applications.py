@@ -6,10 +6,12 @@ from app.config import get_settings
 from app.db import get_session
 from app.job_tracker.api.deps import check_api_key, make_svc
 from app.job_tracker.models.job_application import ApplicationStatus
+from app.job_tracker.repositories.keyset import InvalidCursorError
 from app.job_tracker.schemas.applications import (
     JobApplicationCreate,
     JobApplicationPage,
     JobApplicationRead,
+    JobApplicationSummary,
     JobApplicationUpdate,
 )
 
@@ -26,20 +28,32 @@ async def list_applications(
     search: Optional[str] = Query(None, max_length=_search_max_length),
     company_name: Optional[str] = Query(None, max_length=255),
     sort: Optional[str] = Query(None, pattern="^(updated_at|created_at|applied_at|last_email_at|company_name|role_title|status)$"),
+    cursor: Optional[str] = Query(None, max_length=1000, description="next_cursor of the previous page; replaces offset"),
+    include: Optional[str] = Query(None, pattern="^emails$", description="emails: also return each application's linked emails"),
     session=Depends(get_session),
     _=Depends(check_api_key),
 ):
     settings = get_settings()
     limit = limit if limit is not None else settings.PAGINATION_LIMIT_DEFAULT
     offset = offset if offset is not None else settings.PAGINATION_OFFSET_DEFAULT
-
-    items, total = await make_svc(session).list_paginated(
-        limit=limit, offset=offset, status=status_filter, search=search, company_name=company_name, sort=sort
-    )
-    return JobApplicationPage(
-        total=total,
-        items=[JobApplicationRead.model_validate(i) for i in items],
-    )
+    include_emails = include == "emails"
+
+    try:
+        items, total, next_cursor = await make_svc(session).list_paginated(
+            limit=limit,
+            offset=offset,
+            status=status_filter,
+            search=search,
+            company_name=company_name,
+            sort=sort,
+            cursor=cursor,
+            include_emails=include_emails,
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    item_schema = JobApplicationRead if include_emails else JobApplicationSummary
+    page_items = [item_schema.model_validate(i) for i in items]
+    return JobApplicationPage(total=total, items=page_items, next_cursor=next_cursor)
 
 
 @router.post("/applications", response_model=JobApplicationRead, status_code=status.HTTP_201_CREATED)
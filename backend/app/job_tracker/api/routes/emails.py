@@ -1,20 +1,25 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.config import get_settings
 from app.db import get_session
 from app.job_tracker.api.deps import check_api_key
 from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+from app.job_tracker.repositories.keyset import InvalidCursorError
 from app.job_tracker.schemas.email_reference import EmailReferencePage, EmailReferenceRead
 
 router = APIRouter()
 
+_search_max_length = get_settings().SEARCH_MAX_LENGTH
+
 
 @router.get("/emails", response_model=EmailReferencePage)
 async def list_emails(
     limit: Optional[int] = Query(None, ge=1, le=500),
     offset: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None, max_length=1000, description="next_cursor of the previous page; replaces offset"),
+    search: Optional[str] = Query(None, max_length=_search_max_length),
     session=Depends(get_session),
     _=Depends(check_api_key),
 ):
@@ -23,5 +28,14 @@ async def list_emails(
     offset = offset if offset is not None else settings.PAGINATION_OFFSET_DEFAULT
 
     repo = EmailReferenceRepository(session)
-    items, total = await repo.list_paginated(limit=limit, offset=offset)
-    return EmailReferencePage(total=total, items=[EmailReferenceRead.model_validate(i) for i in items])
+    try:
+        items, total, next_cursor = await repo.list_paginated(
+            limit=limit, offset=offset, cursor=cursor, search=search
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return EmailReferencePage(
+        total=total,
+        items=[EmailReferenceRead.model_validate(i) for i in items],
+        next_cursor=next_cursor,
+    )
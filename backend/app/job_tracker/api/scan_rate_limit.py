@@ -11,7 +11,7 @@ _lock = asyncio.Lock()
 # single scan run easily outlasts that window, so two callers can both pass
 # the throttle while the first scan is still in flight. This flag is the real
 # mutex that prevents overlapping scan runs (which can race on
-# list_company_role_keys() and create duplicate applications). Safe without a
+# the auto-create dedup keys and create duplicate applications). Safe without a
 # lock: on asyncio's single-threaded event loop, nothing can run between the
 # `if` check and the assignment below since neither line awaits.
 _scan_in_progress: bool = False
@@ -0,0 +1,341 @@
+"""Gmail client on a native asyncio transport (httpx).
+
+Behaves like GmailClient (same listing, two-phase fetch, adaptive batching,
+retries and parsing via GmailClientBase) but every request is awaited on the
+event loop over one pool of keep-alive connections instead of running
+googleapiclient/httplib2 on executor threads. googleapiclient's
+BatchHttpRequest is tied to httplib2, so multipart batch requests are built
+and parsed here.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from email.parser import FeedParser
+from typing import Callable, Optional
+from urllib.parse import quote, urlencode
+
+import httplib2
+import httpx
+from googleapiclient.errors import HttpError
+
+from app.job_tracker.email_scanner.gmail_client import (
+    _HISTORY_PAGE_SIZE,
+    GmailClientBase,
+    _BatchOutcome,
+)
+
+logger = logging.getLogger(__name__)
+
+_API_ROOT = "https://gmail.googleapis.com"
+_USERS_PATH = "/gmail/v1/users"
+_BATCH_PATH = "/batch/gmail/v1"
+_REQUEST_TIMEOUT_SECONDS = 60.0
+
+
+def _http_error(status: int, content: bytes, uri: Optional[str] = None) -> HttpError:
+    """Wrap a failed response in googleapiclient's HttpError so both transports
+    surface errors (and 404/429/5xx handling) identically."""
+    return HttpError(httplib2.Response({"status": status}), content, uri=uri)
+
+
+def _build_batch_body(boundary: str, paths: list[str]) -> bytes:
+    """Encode GET requests as a multipart/mixed batch body; part i has Content-ID <item-i>."""
+    parts = [
+        f"--{boundary}\r\n"
+        "Content-Type: application/http\r\n"
+        f"Content-ID: <item-{i}>\r\n"
+        "\r\n"
+        f"GET {path}\r\n"
+        "\r\n"
+        for i, path in enumerate(paths)
+    ]
+    return ("".join(parts) + f"--{boundary}--\r\n").encode()
+
+
+def _parse_batch_response(content_type: str, content: bytes) -> dict[int, tuple[int, bytes]]:
+    """Decode a multipart/mixed batch response into {part index: (status, body)}."""
+    parser = FeedParser()
+    parser.feed(f"Content-Type: {content_type}\r\n\r\n")
+    parser.feed(content.decode("utf-8", errors="replace"))
+    results: dict[int, tuple[int, bytes]] = {}
+    for part in parser.close().get_payload():
+        content_id = (part["Content-ID"] or "").strip("<> ")
+        _, _, index = content_id.rpartition("item-")
+        if not index.isdigit():
+            continue
+        # Each part is an embedded HTTP response: status line, headers, body.
+        raw = part.get_payload()
+        status_line, _, rest = raw.partition("\n")
+        status = int(status_line.split()[1])
+        rest = rest.replace("\r\n", "\n")
+        _, _, body = rest.partition("\n\n")
+        results[int(index)] = (status, body.strip().encode())
+    return results
+
+
+def _store_all(store: Callable[[str, dict], None], payloads: list[tuple[str, dict]]) -> None:
+    for msg_id, payload in payloads:
+        store(msg_id, payload)
+
+
+class AsyncGmailClient(GmailClientBase):
+    def __init__(
+        self,
+        *,
+        max_connections: int = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.max_connections = max(1, max_connections)
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=_API_ROOT,
+                timeout=_REQUEST_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _auth_headers(self) -> dict[str, str]:
+        creds = self._credentials
+        if creds is None or not creds.valid:
+            # Loading/refreshing reads and writes the token file; keep it off the loop.
+            await asyncio.to_thread(self.refresh_credentials)
+            creds = self._credentials
+        return {"Authorization": f"Bearer {creds.token}"}
+
+    async def _get_json(self, path: str, params: dict) -> dict:
+        response = await self._client().get(
+            f"{_USERS_PATH}/{quote(self._user_id)}/{path}",
+            params={k: v for k, v in params.items() if v is not None},
+            headers=await self._auth_headers(),
+        )
+        if response.status_code >= 400:
+            raise _http_error(response.status_code, response.content, str(response.url))
+        return response.json()
+
+    async def fetch_recent_messages(self, start_history_id: Optional[str] = None) -> list[dict]:
+        """List and fetch job-candidate messages in one call."""
+        return await self.fetch_messages(await self.list_message_ids(start_history_id))
+
+    async def list_message_ids(self, start_history_id: Optional[str] = None) -> list[str]:
+        """List candidate message IDs; see GmailClient.list_message_ids."""
+        self._start_listing()
+        try:
+            message_ids: Optional[list[str]] = None
+            if start_history_id:
+                message_ids = await self._list_history_message_ids(start_history_id)
+            if message_ids is None:
+                message_ids = await self._list_query_message_ids()
+            return message_ids
+        except HttpError:
+            logger.exception("Gmail API error")
+            raise
+
+    async def fetch_messages(
+        self,
+        message_ids: list[str],
+        metadata_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> list[dict]:
+        """Fetch and parse every message in message_ids as a single list."""
+        results: list[dict] = []
+        pos = 0
+        while pos < len(message_ids):
+            size = self.batch_size_hint
+            results.extend(await self.fetch_batch(message_ids[pos : pos + size], metadata_filter))
+            pos += size
+        logger.info("Fetched %s Gmail messages", len(results))
+        return results
+
+    async def fetch_batch(
+        self,
+        message_ids: list[str],
+        metadata_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> list[dict]:
+        """Fetch and parse one chunk of messages; see GmailClient.fetch_batch."""
+        if self.payload_cache is not None:
+            # Cache reads gunzip files from disk; keep them off the event loop.
+            cached, chunk = await asyncio.to_thread(self._take_cached, message_ids)
+        else:
+            cached, chunk = [], message_ids
+        if not chunk:
+            return cached
+        try:
+            if metadata_filter is not None:
+                candidates = await self._fetch_message_details(chunk, message_format="metadata")
+                chunk = [msg["gmail_message_id"] for msg in candidates if metadata_filter(msg)]
+                logger.debug(
+                    "Metadata pre-filter kept %s of %s Gmail messages for full fetch",
+                    len(chunk),
+                    len(candidates),
+                )
+            if not chunk:
+                return cached
+            return cached + await self._fetch_message_details(chunk)
+        except HttpError:
+            logger.exception("Gmail API error")
+            raise
+
+    async def _list_query_message_ids(self) -> list[str]:
+        profile = await self._get_json("profile", {})
+        self.latest_history_id = profile.get("historyId")
+
+        queries = [self._build_query(after, before) for after, before in self._query_shards()]
+        if len(queries) == 1:
+            return await self._list_shard_message_ids(queries[0])
+
+        limit = asyncio.Semaphore(self.list_concurrency)
+
+        async def list_shard(query: str) -> list[str]:
+            async with limit:
+                return await self._list_shard_message_ids(query)
+
+        shard_results = await asyncio.gather(*(list_shard(query) for query in queries))
+        return self._merge_shard_ids(list(shard_results))
+
+    async def _list_shard_message_ids(self, query: str) -> list[str]:
+        messages: list[dict] = []
+        page_token: Optional[str] = None
+
+        while len(messages) < self.max_messages:
+            page_size = min(self.page_size, self.max_messages - len(messages))
+            response = await self._get_json(
+                "messages",
+                {"q": query, "maxResults": page_size, "pageToken": page_token},
+            )
+            messages.extend(response.get("messages", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        return [msg["id"] for msg in messages]
+
+    async def _list_history_message_ids(self, start_history_id: str) -> Optional[list[str]]:
+        message_ids: list[str] = []
+        seen: set[str] = set()
+        page_token: Optional[str] = None
+        consumed_history_id = start_history_id
+
+        while True:
+            try:
+                response = await self._get_json(
+                    "history",
+                    {
+                        "startHistoryId": start_history_id,
+                        "historyTypes": "messageAdded",
+                        "maxResults": _HISTORY_PAGE_SIZE,
+                        "pageToken": page_token,
+                    },
+                )
+            except HttpError as exc:
+                if exc.resp.status == 404:
+                    logger.info(
+                        "Gmail history %s has expired; falling back to a full window scan",
+                        start_history_id,
+                    )
+                    return None
+                raise
+
+            consumed_history_id, capped = self._consume_history_page(
+                response, message_ids, seen, consumed_history_id
+            )
+            if capped:
+                return message_ids
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                self.latest_history_id = response.get("historyId", consumed_history_id)
+                logger.info("Listed %s Gmail messages added since history %s", len(message_ids), start_history_id)
+                return message_ids
+
+    async def _fetch_message_details(self, message_ids: list[str], message_format: str = "full") -> list[dict]:
+        """Batch-fetch messages with adaptive sizing and budgeted retries, like GmailClient."""
+        params = self._message_get_params(message_format)
+        fetched: dict[str, dict] = {}
+        pending = list(message_ids)
+        deadline = time.monotonic() + self.retry_budget_seconds
+        attempt = 0
+
+        while pending:
+            retryable: list[str] = []
+            pos = 0
+            while pos < len(pending):
+                size = self._batch_controller.size
+                chunk = pending[pos : pos + size]
+                pos += size
+                retryable.extend(await self._execute_batch(chunk, params, fetched))
+
+            if not retryable:
+                break
+            delay = self._retry_delay(retryable, attempt, deadline)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+            pending = retryable
+            attempt += 1
+
+        return [fetched[mid] for mid in message_ids if mid in fetched]
+
+    async def _execute_batch(self, chunk: list[str], params: dict, fetched: dict[str, dict]) -> list[str]:
+        """POST one multipart batch-get request and record each part's outcome.
+
+        Payloads for the cache are collected and stored in one worker thread
+        per batch, since storing compresses, writes and may evict files.
+        """
+        store = self._payload_store(params)
+        to_store: list[tuple[str, dict]] = []
+        outcome = _BatchOutcome(
+            fetched,
+            self._parse_message,
+            (lambda msg_id, payload: to_store.append((msg_id, payload))) if store is not None else None,
+        )
+        boundary = f"batch_{uuid.uuid4().hex}"
+        query = urlencode(params, doseq=True)
+        user_path = f"{_USERS_PATH}/{quote(self._user_id)}/messages"
+        body = _build_batch_body(boundary, [f"{user_path}/{quote(msg_id)}?{query}" for msg_id in chunk])
+
+        started = time.monotonic()
+        response = await self._client().post(
+            _BATCH_PATH,
+            content=body,
+            headers={
+                **await self._auth_headers(),
+                "Content-Type": f"multipart/mixed; boundary={boundary}",
+            },
+        )
+        if response.status_code >= 400:
+            outcome.reject(chunk, _http_error(response.status_code, response.content, str(response.url)))
+        else:
+            parts = _parse_batch_response(response.headers["Content-Type"], response.content)
+            for i, msg_id in enumerate(chunk):
+                if i not in parts:
+                    logger.warning("Batch response had no part for message %s", msg_id)
+                    outcome.missing += 1
+                    continue
+                status, part_body = parts[i]
+                if status >= 400:
+                    outcome.record(msg_id, None, _http_error(status, part_body))
+                else:
+                    outcome.record(msg_id, json.loads(part_body), None)
+        self._batch_controller.record_batch(
+            len(chunk), outcome.throttled, outcome.server_errors, time.monotonic() - started
+        )
+        self._record_outcome(outcome)
+        if to_store:
+            await asyncio.to_thread(_store_all, store, to_store)
+        return outcome.retryable
@@ -0,0 +1,80 @@
+"""Adaptive sizing for Gmail batch-get requests.
+
+Gmail throttles per-user concurrency with 429s (and occasionally sheds load
+with 5xx). A fixed batch size either leaves throughput on the table or keeps
+tripping the limit, so the size is steered with additive-increase /
+multiplicative-decrease: grow a little after every clean batch, halve after a
+batch that saw throttling.
+"""
+import math
+import threading
+
+
+class AdaptiveBatchController:
+    def __init__(
+        self,
+        max_size: int,
+        min_size: int = 1,
+        decrease_factor: float = 0.5,
+    ):
+        self.max_size = max(1, max_size)
+        self.min_size = max(1, min(min_size, self.max_size))
+        self.increase_step = max(1, self.max_size // 10)
+        self.decrease_factor = decrease_factor
+        self._size = self.max_size
+        # Batches may complete on several executor threads at once.
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def reset_stats(self) -> None:
+        """Clear the counters reported by stats(); the learned size is kept."""
+        with self._lock:
+            self._batches = 0
+            self._messages = 0
+            self._throttled = 0
+            self._server_errors = 0
+            self._retried = 0
+            self._dropped = 0
+            self._latency_total = 0.0
+            self._latency_max = 0.0
+
+    def record_batch(self, requested: int, throttled: int, server_errors: int, latency: float) -> None:
+        """Feed one executed batch back into the size controller."""
+        with self._lock:
+            self._batches += 1
+            self._messages += requested
+            self._throttled += throttled
+            self._server_errors += server_errors
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+            if throttled or server_errors:
+                self._size = max(self.min_size, math.floor(self._size * self.decrease_factor))
+            else:
+                self._size = min(self.max_size, self._size + self.increase_step)
+
+    def record_retry(self, count: int) -> None:
+        with self._lock:
+            self._retried += count
+
+    def record_dropped(self, count: int) -> None:
+        with self._lock:
+            self._dropped += count
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg_ms = (self._latency_total / self._batches * 1000) if self._batches else 0.0
+            return {
+                "batches": self._batches,
+                "messages_requested": self._messages,
+                "throttled": self._throttled,
+                "server_errors": self._server_errors,
+                "retried": self._retried,
+                "dropped": self._dropped,
+                "avg_batch_latency_ms": round(avg_ms, 1),
+                "max_batch_latency_ms": round(self._latency_max * 1000, 1),
+                "batch_size": self._size,
+            }
@@ -1,21 +1,120 @@
 import datetime as dt
 import logging
 import os
+import random
 import re
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
 
+import httplib2
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from app.job_tracker.email_scanner.batch_controller import AdaptiveBatchController
+from app.job_tracker.email_scanner.payload_cache import PayloadCache
+
 logger = logging.getLogger(__name__)
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
+# Messages carrying any of these labels never appear in a normal Gmail search,
+# so incremental (history-based) listing skips them to match the full scan.
+_SKIPPED_HISTORY_LABELS: frozenset[str] = frozenset(["DRAFT", "SPAM", "TRASH"])
+
+# Upper bound for a single backoff sleep between retry rounds.
+_MAX_BACKOFF_SECONDS = 32
+
+# users.history.list page size (the API maximum).
+_HISTORY_PAGE_SIZE = 500
+
+
+def _retryable_status(exc: Exception) -> Optional[int]:
+    """Return the HTTP status if exc is a throttling (429) or server (5xx) error."""
+    if not isinstance(exc, HttpError):
+        return None
+    status = exc.resp.status
+    if status == 429 or 500 <= status < 600:
+        return status
+    return None
+
+
+def _is_gone(exc: Exception) -> bool:
+    """Whether exc says the message no longer exists (deleted since it was listed)."""
+    return isinstance(exc, HttpError) and exc.resp.status in (404, 410)
+
+
+class _BatchOutcome:
+    """Per-message results of one batch-get request."""
+
+    def __init__(
+        self,
+        fetched: dict[str, dict],
+        parse: Callable[[dict], dict],
+        store: Optional[Callable[[str, dict], None]] = None,
+    ):
+        self.fetched = fetched
+        self._parse = parse
+        self._store = store
+        self.retryable: list[str] = []
+        self.throttled = 0
+        self.server_errors = 0
+        # Messages that failed with a non-retryable error other than 404/410.
+        self.failed = 0
+        # Messages the batch response had no part for; fetching them may succeed later.
+        self.missing = 0
+
+    def record(self, request_id: str, response: Optional[dict], exception: Optional[Exception]) -> None:
+        if exception is None:
+            if self._store is not None:
+                self._store(request_id, response)
+            self.fetched[request_id] = self._parse(response)
+            return
+        if _is_gone(exception):
+            # Deleted after it was listed; history keeps reporting it, so it
+            # must not hold back the scan checkpoint.
+            logger.info("Message %s no longer exists; skipping it", request_id)
+            return
+        status = _retryable_status(exception)
+        if status is None:
+            logger.warning("Batch get failed for message %s: %s", request_id, exception)
+            self.failed += 1
+            return
+        self._count(status, 1)
+        self.retryable.append(request_id)
+
+    def reject(self, chunk: list[str], exc: HttpError) -> None:
+        """The whole batch was rejected; retry every message not yet answered.
+
+        Re-raises exc unless it is a throttling or server error.
+        """
+        status = _retryable_status(exc)
+        if status is None:
+            raise exc
+        answered = set(self.retryable) | self.fetched.keys()
+        missing = [msg_id for msg_id in chunk if msg_id not in answered]
+        self._count(status, len(missing))
+        self.retryable.extend(missing)
+
+    def _count(self, status: int, n: int) -> None:
+        if status == 429:
+            self.throttled += n
+        else:
+            self.server_errors += n
+
+
+class GmailClientBase:
+    """Transport-independent Gmail logic: configuration, credentials, query
+    building, date shards, history paging, retry planning and parsing.
+
+    GmailClient drives it with googleapiclient on executor threads;
+    AsyncGmailClient drives it with httpx on the event loop.
+    """
 
-class GmailClient:
     def __init__(
         self,
         *,
@@ -26,6 +125,10 @@ class GmailClient:
         page_size: int,
         batch_size: int = 100,
         retry_backoff_seconds: int = 2,
+        retry_budget_seconds: int = 60,
+        list_shard_days: int = 30,
+        list_concurrency: int = 4,
+        payload_cache: Optional[PayloadCache] = None,
     ):
         self._token_file = token_file
         self.delegated_user = delegated_user
@@ -34,9 +137,22 @@ class GmailClient:
         self.page_size = max(1, min(page_size, self.max_messages))
         self.batch_size = max(1, batch_size)
         self.retry_backoff_seconds = max(0, retry_backoff_seconds)
+        self.retry_budget_seconds = max(0, retry_budget_seconds)
+        self.list_shard_days = max(1, list_shard_days)
+        self.list_concurrency = max(1, list_concurrency)
+        self.payload_cache = payload_cache
+        self._cache_hits = 0
+        self._failed = 0
+        self._missing = 0
+        self._stats_lock = threading.Lock()
+        # batch_size is the ceiling; the controller shrinks below it on throttling.
+        self._batch_controller = AdaptiveBatchController(max_size=self.batch_size)
         self._credentials: Optional[Credentials] = None
-        self._service = None
+        self._credentials_lock = threading.Lock()
         self._user_id = delegated_user or "me"
+        # Mailbox historyId the caller should persist after a successful fetch;
+        # passing it back as start_history_id makes the next fetch incremental.
+        self.latest_history_id: Optional[str] = None
 
     def _build_credentials(self) -> Credentials:
         if not self._token_file or not os.path.exists(self._token_file):
@@ -49,30 +165,7 @@ class GmailClient:
 
         # Refresh expired credentials automatically
         if creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-                # Persist refreshed token so the next startup doesn't need to re-auth.
-                # Use mode 600 (owner read/write only) to match the initial write in main.py.
-                with open(self._token_file, "w", opener=lambda p, f: os.open(p, f, 0o600)) as fh:
-                    fh.write(creds.to_json())
-                logger.info("Gmail OAuth token refreshed and saved to %s", self._token_file)
-            except RefreshError as exc:
-                logger.exception(
-                    "Gmail token refresh failed due to revoked/expired authorization: %s",
-                    self._token_file,
-                )
-                raise RuntimeError(
-                    "Gmail authorization expired or was revoked. "
-                    "Re-run backend/scripts/generate_token.py and replace GMAIL_TOKEN_JSON "
-                    "(or GMAIL_TOKEN_FILE) with the new token."
-                ) from exc
-            except Exception:
-                logger.exception(
-                    "Failed to refresh Gmail token from %s. "
-                    "Re-run scripts/generate_token.py to re-authorize.",
-                    self._token_file,
-                )
-                raise
+            self._refresh_and_persist(creds)
 
         if not creds.valid:
             raise RuntimeError(
@@ -83,109 +176,248 @@ class GmailClient:
         self._credentials = creds
         return creds
 
-    def _get_service(self):
-        if self._service is None:
-            creds = self._credentials or self._build_credentials()
-            self._service = build("gmail", "v1", credentials=creds, cache_discovery=False)
-        return self._service
+    def _refresh_and_persist(self, creds: Credentials) -> None:
+        try:
+            creds.refresh(Request())
+            # Persist refreshed token so the next startup doesn't need to re-auth.
+            # Use mode 600 (owner read/write only) to match the initial write in main.py.
+            with open(self._token_file, "w", opener=lambda p, f: os.open(p, f, 0o600)) as fh:
+                fh.write(creds.to_json())
+            logger.info("Gmail OAuth token refreshed and saved to %s", self._token_file)
+        except RefreshError as exc:
+            logger.exception(
+                "Gmail token refresh failed due to revoked/expired authorization: %s",
+                self._token_file,
+            )
+            raise RuntimeError(
+                "Gmail authorization expired or was revoked. "
+                "Re-run backend/scripts/generate_token.py and replace GMAIL_TOKEN_JSON "
+                "(or GMAIL_TOKEN_FILE) with the new token."
+            ) from exc
+        except Exception:
+            logger.exception(
+                "Failed to refresh Gmail token from %s. "
+                "Re-run scripts/generate_token.py to re-authorize.",
+                self._token_file,
+            )
+            raise
 
-    # Maximum body text extracted per message (characters) to keep memory bounded.
-    BODY_SNIPPET_MAX_CHARS = 1000
+    def _get_credentials(self) -> Credentials:
+        with self._credentials_lock:
+            return self._credentials or self._build_credentials()
 
-    def fetch_recent_messages(self) -> list[dict]:
-        try:
-            service = self._get_service()
-            query = self._build_query()
-            messages: list[dict] = []
-            page_token: Optional[str] = None
+    def refresh_credentials(self, min_remaining_seconds: float = 0) -> Optional[dt.datetime]:
+        """Load credentials into memory, refreshing them if they expire within
+        min_remaining_seconds. Returns the (naive UTC) expiry, if known.
 
-            while len(messages) < self.max_messages:
-                page_size = min(self.page_size, self.max_messages - len(messages))
-                response = (
-                    service.users()
-                    .messages()
-                    .list(
-                        userId=self._user_id,
-                        q=query,
-                        maxResults=page_size,
-                        pageToken=page_token,
-                    )
-                    .execute()
-                )
-                messages.extend(response.get("messages", []))
-                page_token = response.get("nextPageToken")
-                if not page_token:
-                    break
+        Run periodically in the background so scans never refresh on their
+        hot path; the refreshed token is persisted like any other refresh.
+        """
+        with self._credentials_lock:
+            creds = self._credentials
+            if creds is None:
+                creds = self._build_credentials()
+            elif creds.refresh_token:
+                now = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+                if creds.expiry is None or creds.expiry - now < dt.timedelta(seconds=min_remaining_seconds):
+                    self._refresh_and_persist(creds)
+            return creds.expiry
+
+    def _start_listing(self) -> None:
+        """Clear per-scan state; clients are reused across scans."""
+        self.latest_history_id = None
+        self.reset_fetch_stats()
 
-            message_ids = [msg["id"] for msg in messages]
-            results = self._fetch_message_details(service, message_ids)
+    # Maximum body text extracted per message (characters) to keep memory bounded.
+    BODY_SNIPPET_MAX_CHARS = 1000
 
-            logger.info("Fetched %s Gmail messages", len(results))
-            return results
-        except HttpError:
-            logger.exception("Gmail API error")
-            raise
+    @property
+    def batch_size_hint(self) -> int:
+        """Current adaptive batch-get size; callers dispatching fetch_batch() chunk by this."""
+        return self._batch_controller.size
 
-    def _fetch_message_details(self, service, message_ids: list[str]) -> list[dict]:
-        """Batch-fetch messages with full payload so body text can be extracted.
+    def fetch_stats(self) -> dict:
+        """Batch latency, throttle, retry, failure and cache-hit counters since the last reset_fetch_stats()."""
+        return {
+            **self._batch_controller.stats(),
+            "failed": self._failed,
+            "missing": self._missing,
+            "cache_hits": self._cache_hits,
+        }
 
-        Each batch costs 1 HTTP round-trip instead of 1 per message.
-        Any messages that fail due to 429 rate-limit errors are retried once.
+    def reset_fetch_stats(self) -> None:
+        self._batch_controller.reset_stats()
+        self._cache_hits = 0
+        self._failed = 0
+        self._missing = 0
+
+    @property
+    def has_gaps(self) -> bool:
+        """Whether listed messages that may still be fetchable were given up on
+        since the last reset_fetch_stats(): dropped after the retry budget
+        (429/5xx) or missing from a batch response.
+
+        latest_history_id is then not a safe resume point; the caller should
+        not persist it, so the next scan lists those messages again. Deleted
+        messages (404/410) and other non-retryable errors would fail the same
+        way on every scan, so they do not count.
         """
-        batch_size = self.batch_size
-        fetched: dict[str, dict] = {}
-        failed_ids: list[str] = []
-
-        def _callback(request_id: str, response, exception) -> None:
-            if exception:
-                if isinstance(exception, HttpError) and exception.resp.status == 429:
-                    failed_ids.append(request_id)
-                else:
-                    logger.warning("Batch get failed for message %s: %s", request_id, exception)
-                return
-            fetched[request_id] = self._parse_message(response)
-
-        def _add_to_batch(batch, msg_id: str) -> None:
-            batch.add(
-                service.users()
-                .messages()
-                .get(
-                    userId=self._user_id,
-                    id=msg_id,
-                    format="full",
-                    fields="id,snippet,payload(headers,body,parts)",
-                ),
-                request_id=msg_id,
-            )
+        return self._missing > 0 or self._batch_controller.stats()["dropped"] > 0
+
+    def _record_outcome(self, outcome: _BatchOutcome) -> None:
+        if outcome.failed or outcome.missing:
+            with self._stats_lock:  # batches finish on several threads
+                self._failed += outcome.failed
+                self._missing += outcome.missing
+
+    def _take_cached(self, message_ids: list[str]) -> tuple[list[dict], list[str]]:
+        """Split message_ids into messages parsed from the payload cache and IDs still to fetch."""
+        if self.payload_cache is None:
+            return [], message_ids
+        cached: list[dict] = []
+        missing: list[str] = []
+        for msg_id in message_ids:
+            payload = self.payload_cache.get(msg_id)
+            if payload is None:
+                missing.append(msg_id)
+            else:
+                cached.append(self._parse_message(payload))
+        with self._stats_lock:  # fetch_batch runs on several threads
+            self._cache_hits += len(cached)
+        return cached, missing
+
+    def _payload_store(self, get_params: dict) -> Optional[Callable[[str, dict], None]]:
+        """Cache callback for a batch fetch; only full payloads are worth keeping."""
+        if self.payload_cache is None or get_params.get("format") != "full":
+            return None
+        return self.payload_cache.put
 
-        for i in range(0, len(message_ids), batch_size):
-            chunk = message_ids[i : i + batch_size]
-            batch = service.new_batch_http_request(callback=_callback)
-            for msg_id in chunk:
-                _add_to_batch(batch, msg_id)
-            batch.execute()
+    def _query_shards(self) -> list[tuple[dt.date, Optional[dt.date]]]:
+        """Split the query window into (after, before) date ranges, newest first.
 
-        if failed_ids:
-            logger.info("Retrying %s rate-limited messages after backoff", len(failed_ids))
-            time.sleep(self.retry_backoff_seconds)
-            for i in range(0, len(failed_ids), batch_size):
-                retry_chunk = failed_ids[i : i + batch_size]
-                retry_batch = service.new_batch_http_request(callback=_callback)
-                for msg_id in retry_chunk:
-                    _add_to_batch(retry_batch, msg_id)
-                retry_batch.execute()
+        The newest shard is open-ended (no before:) so today's mail is included.
+        """
+        today = dt.date.today()
+        window_start = today - dt.timedelta(days=self.query_window_days)
+        shards: list[tuple[dt.date, Optional[dt.date]]] = []
+        before: Optional[dt.date] = None
+        after = today - dt.timedelta(days=self.list_shard_days)
+        while True:
+            after = max(after, window_start)
+            shards.append((after, before))
+            if after <= window_start:
+                return shards
+            before = after
+            after = before - dt.timedelta(days=self.list_shard_days)
+
+    def _merge_shard_ids(self, shard_results: list[list[str]]) -> list[str]:
+        """Merge newest-first shard listings, dropping duplicates, capped at max_messages."""
+        message_ids: list[str] = []
+        seen: set[str] = set()
+        for shard_ids in shard_results:
+            for msg_id in shard_ids:
+                if msg_id not in seen:
+                    seen.add(msg_id)
+                    message_ids.append(msg_id)
+        logger.info(
+            "Listed %s Gmail messages across %s date shards",
+            min(len(message_ids), self.max_messages),
+            len(shard_results),
+        )
+        return message_ids[: self.max_messages]
 
-        # Return in original order, skipping any that permanently errored
-        return [fetched[mid] for mid in message_ids if mid in fetched]
+    def _consume_history_page(
+        self,
+        response: dict,
+        message_ids: list[str],
+        seen: set[str],
+        consumed_history_id: str,
+    ) -> tuple[str, bool]:
+        """Append the messages added in one users.history.list page.
+
+        consumed_history_id is the historyId of the last record whose messages
+        were all taken; it is the resume point if max_messages cuts the listing
+        short. Returns the updated value and whether the cut happened (in which
+        case latest_history_id has already been set).
+        """
+        for record in response.get("history", []):
+            for added in record.get("messagesAdded", []):
+                message = added.get("message", {})
+                msg_id = message.get("id")
+                if not msg_id or msg_id in seen:
+                    continue
+                if _SKIPPED_HISTORY_LABELS.intersection(message.get("labelIds", [])):
+                    continue
+                if len(message_ids) >= self.max_messages:
+                    self.latest_history_id = consumed_history_id
+                    logger.info(
+                        "History listing reached max_messages=%s; resuming from %s next scan",
+                        self.max_messages,
+                        consumed_history_id,
+                    )
+                    return consumed_history_id, True
+                seen.add(msg_id)
+                message_ids.append(msg_id)
+            consumed_history_id = record.get("id", consumed_history_id)
+        return consumed_history_id, False
+
+    @staticmethod
+    def _message_get_params(message_format: str) -> dict:
+        """users.messages.get parameters for a "full" or "metadata" fetch.
 
-    def _build_query(self) -> str:
+        "full" returns the MIME tree so body text can be extracted; "metadata"
+        returns only the Subject/From/Date headers and snippet.
+        """
+        if message_format == "metadata":
+            return {
+                "format": "metadata",
+                "metadataHeaders": ["Subject", "From", "Date"],
+                "fields": "id,threadId,snippet,payload/headers",
+            }
+        return {"format": "full", "fields": "id,threadId,snippet,payload(headers,body,parts)"}
+
+    def _retry_delay(self, retryable: list[str], attempt: int, deadline: float) -> Optional[float]:
+        """Plan the next retry round for throttled messages.
+
+        Returns the backoff to sleep before retrying, or None once the retry
+        budget is spent (the messages are logged and counted as dropped). The
+        first retry round always runs.
+        """
+        remaining = deadline - time.monotonic()
+        if attempt > 0 and remaining <= 0:
+            logger.warning(
+                "Dropping %s Gmail messages still throttled after the %ss retry budget",
+                len(retryable),
+                self.retry_budget_seconds,
+            )
+            self._batch_controller.record_dropped(len(retryable))
+            return None
+        delay = self._backoff_delay(attempt)
+        if attempt > 0:
+            delay = min(delay, remaining)
+        logger.info("Retrying %s throttled Gmail messages in %.1fs", len(retryable), delay)
+        self._batch_controller.record_retry(len(retryable))
+        return delay
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: uniform in [0, base * 2**attempt], capped."""
+        ceiling = min(_MAX_BACKOFF_SECONDS, self.retry_backoff_seconds * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _build_query(self, after_date: Optional[dt.date] = None, before_date: Optional[dt.date] = None) -> str:
         """Build a Gmail search query that targets job/application emails.
 
         Searching at the Gmail API level means we only fetch messages that are
         likely job-related, so max_messages budget is spent effectively even in
         a busy inbox rather than pulling generic mail and filtering locally.
+        after_date defaults to the start of the query window; before_date
+        (exclusive) bounds a date shard.
         """
-        after_date = dt.date.today() - dt.timedelta(days=self.query_window_days)
+        if after_date is None:
+            after_date = dt.date.today() - dt.timedelta(days=self.query_window_days)
+        date_range = f"after:{after_date.isoformat()}"
+        if before_date is not None:
+            date_range += f" before:{before_date.isoformat()}"
         job_terms = " OR ".join([
             "application",
             "applied",
@@ -212,9 +444,15 @@ class GmailClient:
             ' -from:connected@linkedin.com'
             ' -from:invitations@linkedin.com'
         )
-        return f"after:{after_date.isoformat()} ({job_terms}){exclusions}"
+        return f"{date_range} ({job_terms}){exclusions}"
 
-    def _parse_message(self, msg: dict) -> dict:
+    @classmethod
+    def parse_payload(cls, msg: dict) -> dict:
+        """Parse a raw users.messages.get payload, e.g. one read from the payload cache."""
+        return cls._parse_message(msg)
+
+    @classmethod
+    def _parse_message(cls, msg: dict) -> dict:
         payload = msg.get("payload", {})
         headers = {
             h["name"].lower(): h.get("value")
@@ -223,9 +461,9 @@ class GmailClient:
         subject = headers.get("subject")
         sender = headers.get("from")
         date_raw = headers.get("date")
-        received_at = self._parse_date(date_raw)
+        received_at = cls._parse_date(date_raw)
         snippet = msg.get("snippet")
-        body_text = self._extract_body_text(payload)
+        body_text = cls._extract_body_text(payload)
         return {
             "gmail_message_id": msg.get("id"),
             "gmail_thread_id": msg.get("threadId"),
@@ -236,7 +474,8 @@ class GmailClient:
             "body_text": body_text,
         }
 
-    def _extract_body_text(self, payload: dict) -> Optional[str]:
+    @classmethod
+    def _extract_body_text(cls, payload: dict) -> Optional[str]:
         """Extract a plain-text body snippet from a Gmail message payload.
 
         Walks the MIME tree preferring text/plain. Falls back to text/html
@@ -275,7 +514,7 @@ class GmailClient:
         text = _collect(payload)
         if not text:
             return None
-        return text[: self.BODY_SNIPPET_MAX_CHARS]
+        return text[: cls.BODY_SNIPPET_MAX_CHARS]
 
     @staticmethod
     def _parse_date(date_str: str | None) -> dt.datetime:
@@ -298,3 +537,277 @@ class GmailClient:
         except Exception:
             logger.warning("Could not parse date string %r, using current time", date_str)
             return dt.datetime.now(dt.timezone.utc)
+
+
+class GmailClient(GmailClientBase):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # One service (and so one httplib2 transport) per thread: httplib2.Http
+        # is not thread-safe, and batches run concurrently on the scan executor.
+        self._local = threading.local()
+
+    def _get_service(self):
+        service = getattr(self._local, "service", None)
+        if service is None:
+            http = AuthorizedHttp(self._get_credentials(), http=httplib2.Http())
+            service = build("gmail", "v1", http=http, cache_discovery=False)
+            self._local.service = service
+        return service
+
+    def fetch_recent_messages(self, start_history_id: Optional[str] = None) -> list[dict]:
+        """List and fetch job-candidate messages in one call.
+
+        Convenience wrapper over list_message_ids() + fetch_messages() for
+        callers that don't need to filter IDs between the two stages.
+        """
+        return self.fetch_messages(self.list_message_ids(start_history_id))
+
+    def list_message_ids(self, start_history_id: Optional[str] = None) -> list[str]:
+        """List candidate message IDs without downloading any payloads.
+
+        With start_history_id, only messages added to the mailbox since that
+        history record are listed. If Gmail no longer retains the record, the
+        full query window is listed instead. Either way latest_history_id is
+        updated so the caller can persist it for the next scan. Listing starts
+        a new scan, so fetch stats are reset here too.
+        """
+        self._start_listing()
+        try:
+            service = self._get_service()
+            message_ids: Optional[list[str]] = None
+            if start_history_id:
+                message_ids = self._list_history_message_ids(service, start_history_id)
+            if message_ids is None:
+                message_ids = self._list_query_message_ids(service)
+            return message_ids
+        except HttpError:
+            logger.exception("Gmail API error")
+            raise
+
+    def fetch_messages(
+        self,
+        message_ids: list[str],
+        metadata_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> list[dict]:
+        """Fetch and parse every message in message_ids as a single list."""
+        results = [msg for batch in self.iter_message_batches(message_ids, metadata_filter) for msg in batch]
+        logger.info("Fetched %s Gmail messages", len(results))
+        return results
+
+    def iter_message_batches(
+        self,
+        message_ids: list[str],
+        metadata_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> Iterator[list[dict]]:
+        """Yield parsed messages one batch-get chunk at a time.
+
+        Only the current chunk's payloads are held in memory, so callers can
+        process each batch while the next one is being downloaded. Empty
+        chunks (everything dropped by metadata_filter) are not yielded.
+        """
+        pos = 0
+        while pos < len(message_ids):
+            size = self.batch_size_hint
+            batch = self.fetch_batch(message_ids[pos : pos + size], metadata_filter)
+            pos += size
+            if batch:
+                yield batch
+
+    def fetch_batch(
+        self,
+        message_ids: list[str],
+        metadata_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> list[dict]:
+        """Fetch and parse one chunk of messages.
+
+        Safe to call from several threads at once; each thread uses its own
+        HTTP transport. With metadata_filter, the chunk is fetched in two
+        phases: first as format="metadata" (headers and snippet only, parsed
+        with body_text=None), then as full payloads for the messages the
+        filter keeps. Messages in the payload cache are parsed from it and
+        never requested.
+        """
+        cached, chunk = self._take_cached(message_ids)
+        if not chunk:
+            return cached
+        try:
+            service = self._get_service()
+            if metadata_filter is not None:
+                candidates = self._fetch_message_details(service, chunk, message_format="metadata")
+                chunk = [msg["gmail_message_id"] for msg in candidates if metadata_filter(msg)]
+                logger.debug(
+                    "Metadata pre-filter kept %s of %s Gmail messages for full fetch",
+                    len(chunk),
+                    len(candidates),
+                )
+            if not chunk:
+                return cached
+            return cached + self._fetch_message_details(service, chunk)
+        except HttpError:
+            logger.exception("Gmail API error")
+            raise
+
+    def _list_query_message_ids(self, service) -> list[str]:
+        """List message IDs matching the job query across the full query window.
+
+        Windows longer than list_shard_days are split into after:/before: date
+        shards listed concurrently (one transport per worker thread), since a
+        single messages.list chain can only page serially. Shard results are
+        merged newest-first, deduplicated and capped at max_messages.
+        """
+        # Capture the baseline before listing so mail arriving mid-scan is
+        # picked up by the next incremental fetch rather than skipped.
+        profile = service.users().getProfile(userId=self._user_id).execute()
+        self.latest_history_id = profile.get("historyId")
+
+        queries = [self._build_query(after, before) for after, before in self._query_shards()]
+        if len(queries) == 1:
+            return self._list_shard_message_ids(service, queries[0])
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(queries), self.list_concurrency),
+            thread_name_prefix="gmail-list",
+        ) as pool:
+            shard_results = list(
+                pool.map(lambda query: self._list_shard_message_ids(self._get_service(), query), queries)
+            )
+        return self._merge_shard_ids(shard_results)
+
+    def _list_shard_message_ids(self, service, query: str) -> list[str]:
+        """Page through messages.list for one query, up to max_messages IDs."""
+        messages: list[dict] = []
+        page_token: Optional[str] = None
+
+        while len(messages) < self.max_messages:
+            page_size = min(self.page_size, self.max_messages - len(messages))
+            response = (
+                service.users()
+                .messages()
+                .list(
+                    userId=self._user_id,
+                    q=query,
+                    maxResults=page_size,
+                    pageToken=page_token,
+                )
+                .execute()
+            )
+            messages.extend(response.get("messages", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        return [msg["id"] for msg in messages]
+
+    def _list_history_message_ids(self, service, start_history_id: str) -> Optional[list[str]]:
+        """List IDs of messages added since start_history_id via users.history.list.
+
+        Returns None when the history record has expired (Gmail answers 404),
+        which tells the caller to fall back to a full window listing.
+        """
+        message_ids: list[str] = []
+        seen: set[str] = set()
+        page_token: Optional[str] = None
+        consumed_history_id = start_history_id
+
+        while True:
+            try:
+                response = (
+                    service.users()
+                    .history()
+                    .list(
+                        userId=self._user_id,
+                        startHistoryId=start_history_id,
+                        historyTypes=["messageAdded"],
+                        maxResults=_HISTORY_PAGE_SIZE,
+                        pageToken=page_token,
+                    )
+                    .execute()
+                )
+            except HttpError as exc:
+                if exc.resp.status == 404:
+                    logger.info(
+                        "Gmail history %s has expired; falling back to a full window scan",
+                        start_history_id,
+                    )
+                    return None
+                raise
+
+            consumed_history_id, capped = self._consume_history_page(
+                response, message_ids, seen, consumed_history_id
+            )
+            if capped:
+                return message_ids
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                self.latest_history_id = response.get("historyId", consumed_history_id)
+                logger.info("Listed %s Gmail messages added since history %s", len(message_ids), start_history_id)
+                return message_ids
+
+    def _fetch_message_details(
+        self,
+        service,
+        message_ids: list[str],
+        message_format: str = "full",
+    ) -> list[dict]:
+        """Batch-fetch messages in message_format and parse them.
+
+        Each batch costs 1 HTTP round-trip instead of 1 per message, and its
+        size follows the adaptive batch controller. Messages that fail with 429
+        or 5xx are retried in rounds with jittered exponential backoff until
+        retry_budget_seconds is spent; at least one retry round always runs.
+        """
+        get_kwargs = self._message_get_params(message_format)
+        fetched: dict[str, dict] = {}
+        pending = list(message_ids)
+        deadline = time.monotonic() + self.retry_budget_seconds
+        attempt = 0
+
+        while pending:
+            retryable: list[str] = []
+            pos = 0
+            while pos < len(pending):
+                size = self._batch_controller.size
+                chunk = pending[pos : pos + size]
+                pos += size
+                retryable.extend(self._execute_batch(service, chunk, get_kwargs, fetched))
+
+            if not retryable:
+                break
+            delay = self._retry_delay(retryable, attempt, deadline)
+            if delay is None:
+                break
+            time.sleep(delay)
+            pending = retryable
+            attempt += 1
+
+        # Return in original order, skipping any that permanently errored
+        return [fetched[mid] for mid in message_ids if mid in fetched]
+
+    def _execute_batch(self, service, chunk: list[str], get_kwargs: dict, fetched: dict[str, dict]) -> list[str]:
+        """Run one batch-get request, parsing successes into fetched.
+
+        Returns the IDs that should be retried (429 or 5xx) and reports the
+        batch outcome to the adaptive batch controller.
+        """
+        outcome = _BatchOutcome(fetched, self._parse_message, self._payload_store(get_kwargs))
+        batch = service.new_batch_http_request(callback=outcome.record)
+        for msg_id in chunk:
+            batch.add(
+                service.users()
+                .messages()
+                .get(userId=self._user_id, id=msg_id, **get_kwargs),
+                request_id=msg_id,
+            )
+
+        started = time.monotonic()
+        try:
+            batch.execute()
+        except HttpError as exc:
+            # The batch endpoint itself throttled or failed.
+            outcome.reject(chunk, exc)
+        self._batch_controller.record_batch(
+            len(chunk), outcome.throttled, outcome.server_errors, time.monotonic() - started
+        )
+        self._record_outcome(outcome)
+        return outcome.retryable
@@ -0,0 +1,128 @@
+"""On-disk cache of raw Gmail message payloads.
+
+Stores the full users.messages.get JSON for each fetched message, gzip
+compressed, at a path derived from the sha256 of its gmail_message_id. The
+parsed EmailReference keeps only a truncated body, so this cache is what
+lets improved parsing be re-run over old mail without refetching it (see
+scripts/reprocess_cache.py).
+
+Size is bounded by least-recently-used eviction: reads refresh a file's
+mtime, and once the total exceeds max_bytes the oldest files are deleted.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".json.gz"
+# Evict down to this fraction of max_bytes so eviction isn't re-run on every put.
+_EVICT_TARGET_RATIO = 0.9
+
+
+class PayloadCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max(1, max_bytes)
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None  # computed lazily on first put
+
+    def _path(self, message_id: str) -> str:
+        digest = hashlib.sha256(message_id.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + _SUFFIX)
+
+    def get(self, message_id: str) -> Optional[dict]:
+        """Return the cached payload for message_id, or None on a miss."""
+        path = self._path(message_id)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                payload = json.load(fh)
+            os.utime(path)  # mark as recently used
+            return payload
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Discarding unreadable cached Gmail payload %s", path, exc_info=True)
+            self._remove(path)
+            return None
+
+    def put(self, message_id: str, payload: dict) -> None:
+        """Store payload, evicting least-recently-used entries if over max_bytes."""
+        path = self._path(message_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = gzip.compress(json.dumps(payload, separators=(",", ":")).encode())
+        # Write to a temp file and rename so readers never see a partial file.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("Could not cache Gmail payload for %s", message_id, exc_info=True)
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(os.path.getsize(p) for p in self._iter_paths())
+            else:
+                self._total_bytes += len(data) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._iter_paths())
+
+    def iter_payloads(self) -> Iterator[dict]:
+        """Yield every cached payload (order unspecified); unreadable files are skipped."""
+        for path in self._iter_paths():
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as fh:
+                    yield json.load(fh)
+            except (OSError, ValueError):
+                logger.warning("Skipping unreadable cached Gmail payload %s", path)
+
+    def _iter_paths(self) -> Iterator[str]:
+        if not os.path.isdir(self.directory):
+            return
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(_SUFFIX):
+                    yield entry.path
+
+    def _evict(self) -> None:
+        """Delete least-recently-used files until under the eviction target. Caller holds _lock."""
+        entries = []
+        for path in self._iter_paths():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * _EVICT_TARGET_RATIO
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+        self._total_bytes = total
+        logger.info("Evicted %s cached Gmail payloads; cache now %s bytes", evicted, total)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 
 from app.db import Base, utcnow
@@ -6,17 +6,47 @@ from app.db import Base, utcnow
 
 class EmailReference(Base):
     __tablename__ = "email_references"
-    __table_args__ = (UniqueConstraint("gmail_message_id", name="uq_email_reference_message_id"),)
+    __table_args__ = (
+        # Its index also serves every gmail_message_id lookup.
+        UniqueConstraint("gmail_message_id", name="uq_email_reference_message_id"),
+        # An application's emails, newest last: the relationship load, the
+        # counter maintenance in JobApplicationRepository and the FK itself.
+        Index("ix_email_references_application_id_received_at", "application_id", "received_at"),
+        # /emails order (received_at DESC, id DESC), scanned backwards.
+        Index("ix_email_references_received_at_id", "received_at", "id"),
+        # The unlinked backlog the scan's match stage reads (list_unlinked).
+        Index(
+            "ix_email_references_unlinked",
+            "matcher_version",
+            postgresql_where=text("application_id IS NULL"),
+            sqlite_where=text("application_id IS NULL"),
+        ),
+        # pg_trgm GIN indexes serving ILIKE '%term%' searches.
+        *(
+            Index(
+                f"ix_email_references_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("subject", "sender")
+        ),
+    )
+    # Migration 007 also adds a generated search_vector tsvector column (see
+    # repositories/search.py); it is PostgreSQL-only and deliberately unmapped.
 
-    id = Column(Integer, primary_key=True, index=True)
-    gmail_message_id = Column(String(255), nullable=False, index=True)
-    gmail_thread_id = Column(String(255), nullable=True)
+    id = Column(Integer, primary_key=True)
+    gmail_message_id = Column(String(255), nullable=False)
+    # Indexed for the scan's thread lookup (EmailReferenceRepository.map_thread_applications).
+    gmail_thread_id = Column(String(255), nullable=True, index=True)
     subject = Column(String(500), nullable=True)
     sender = Column(String(255), nullable=True)
     received_at = Column(DateTime(timezone=True), nullable=False)
     snippet = Column(Text, nullable=True)
     body_text = Column(Text, nullable=True)
     application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=True)
+    # MATCHER_VERSION this email was last evaluated with while unlinked; NULL = not yet.
+    matcher_version = Column(Integer, nullable=True)
 
     application = relationship("JobApplication", back_populates="emails")
 
@@ -13,14 +13,26 @@ class ApplicationStatus(str, Enum):
     REJECTED = "rejected"
 
 
+def _trigram_index(column: str) -> Index:
+    """pg_trgm GIN index serving ILIKE '%term%' searches on column."""
+    return Index(
+        f"ix_job_applications_{column}_trgm",
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+
+
 class JobApplication(Base):
     __tablename__ = "job_applications"
     __table_args__ = (
-        Index("ix_job_applications_status", "status"),
         Index("ix_job_applications_company_name", "company_name"),
+        *(_trigram_index(column) for column in ("company_name", "role_title", "source", "job_url")),
     )
+    # Migration 007 also adds a generated search_vector tsvector column (see
+    # repositories/search.py); it is PostgreSQL-only and deliberately unmapped.
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     company_name = Column(String(255), nullable=False)
     role_title = Column(String(255), nullable=True)
     status = Column(
@@ -35,6 +47,9 @@ class JobApplication(Base):
     source = Column(String(255), nullable=True)
     applied_at = Column(DateTime(timezone=True), nullable=True)
     last_email_at = Column(DateTime(timezone=True), nullable=True)
+    # Linked emails; maintained wherever emails are linked or unlinked
+    # (scripts/repair_email_counters.py recomputes it with last_email_at).
+    email_count = Column(Integer, nullable=False, default=0, server_default="0")
     confidence_score = Column(Float, nullable=True)
     notes = Column(Text, nullable=True)
     job_url = Column(String(2000), nullable=True)
@@ -47,3 +62,16 @@ class JobApplication(Base):
 
     def __repr__(self) -> str:
         return f"<JobApplication id={self.id} company={self.company_name!r} status={self.status}>"
+
+
+# The default list order and, behind a status prefix, the pipeline column
+# order (last_email_at DESC NULLS LAST, id DESC), so a page is read straight
+# off the index. SQLite already sorts NULLs last in DESC and rejects NULLS
+# LAST in an index; migration 008 spells it out for PostgreSQL.
+Index(
+    "ix_job_applications_status_last_email_at",
+    JobApplication.status,
+    JobApplication.last_email_at.desc(),
+    JobApplication.id.desc(),
+)
+Index("ix_job_applications_last_email_at", JobApplication.last_email_at.desc(), JobApplication.id.desc())
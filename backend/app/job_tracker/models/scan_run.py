@@ -1,19 +1,29 @@
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
 
 from app.db import Base, utcnow
 
 
 class ScanRun(Base):
     __tablename__ = "scan_runs"
+    __table_args__ = (
+        # Scan history, newest first.
+        Index("ix_scan_runs_started_at", "started_at"),
+        # The latest completed scan's history_id (ScanRunRepository.get_last_history_id).
+        Index("ix_scan_runs_status_started_at_id", "status", "started_at", "id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     started_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(String(20), nullable=False, default="running")  # running | completed | failed
     emails_fetched = Column(Integer, nullable=True)
     emails_inserted = Column(Integer, nullable=True)
     apps_created = Column(Integer, nullable=True)
+    fetches_avoided = Column(Integer, nullable=True)  # listed IDs already stored, so not downloaded
     error = Column(Text, nullable=True)
+    # Gmail mailbox historyId captured by this scan; the next scan lists only
+    # messages added after it instead of re-running the full window query.
+    history_id = Column(String(64), nullable=True)
 
     def __repr__(self) -> str:
         return f"<ScanRun id={self.id} status={self.status!r}>"
@@ -1,14 +1,65 @@
-import logging
-from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import select, func
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import bindparam, case, column, func, or_, select, table, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db import utcnow
 from app.job_tracker.models.email_reference import EmailReference
+from app.job_tracker.repositories.keyset import InvalidCursorError, SortKey
+from app.job_tracker.repositories.search import TextSearch, contains_pattern
 
-logger = logging.getLogger(__name__)
+# Bound on bind parameters per IN (...) lookup; keeps large backfill ID lists
+# under driver parameter limits.
+_IN_CLAUSE_CHUNK_SIZE = 1000
+
+# Rows per multi-row INSERT. Each row binds the _INSERT_COLUMNS (9) plus the
+# Python-side created_at default: 1000 rows x 10 = 10000 parameters, under
+# asyncpg's 32767 and SQLite's 32766 limits. Re-check when adding a column.
+_INSERT_CHUNK_SIZE = 1000
+
+# Columns bulk_create writes; id and created_at come from the database/defaults.
+_INSERT_COLUMNS = [
+    column.name for column in EmailReference.__table__.columns if column.name not in ("id", "created_at")
+]
+
+# Session-local staging table for copy_create; dropped again after each merge.
+_COPY_STAGING_TABLE = "email_references_copy_staging"
+_COPY_COLUMNS = [*_INSERT_COLUMNS, "created_at"]
+
+# list_paginated order: newest first.
+_LIST_SORT_KEY = SortKey("received_at", EmailReference.received_at, EmailReference.id, descending=True)
+
+# ?search= of list_paginated. search_vector weights subject, snippet and
+# body_text (A/B/C) with the "english" configuration, so word forms match;
+# subject and sender are also matched as substrings.
+_SEARCH = TextSearch(
+    EmailReference.__table__,
+    "english",
+    [EmailReference.subject, EmailReference.sender],
+    fallback_columns=(EmailReference.snippet, EmailReference.body_text),
+)
+
+# Dialect-specific insert() constructs that support ON CONFLICT DO NOTHING.
+_DIALECT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def _dedupe_rows(items: list[dict]) -> list[dict]:
+    """One insert row per distinct gmail_message_id, with every _INSERT_COLUMNS key."""
+    seen: set[str] = set()
+    rows: list[dict] = []
+    for item in items:
+        mid = item.get("gmail_message_id")
+        if not mid or mid in seen:
+            continue
+        seen.add(mid)
+        # Multi-row VALUES needs the same keys in every row.
+        rows.append({name: item.get(name) for name in _INSERT_COLUMNS})
+    return rows
 
 
 class EmailReferenceRepository:
@@ -29,13 +80,60 @@ class EmailReferenceRepository:
             )
         )
 
-    async def get_latest_received_at(self, application_id: int) -> Optional[datetime]:
-        """Return the max received_at of emails still linked to the application."""
-        return await self.session.scalar(
-            select(func.max(EmailReference.received_at)).where(
-                EmailReference.application_id == application_id
+    async def list_existing_message_ids(self, message_ids: list[str]) -> set[str]:
+        """Return the subset of message_ids already stored, via the unique index."""
+        existing: set[str] = set()
+        for i in range(0, len(message_ids), _IN_CLAUSE_CHUNK_SIZE):
+            chunk = message_ids[i : i + _IN_CLAUSE_CHUNK_SIZE]
+            result = await self.session.execute(
+                select(EmailReference.gmail_message_id).where(EmailReference.gmail_message_id.in_(chunk))
+            )
+            existing.update(result.scalars().all())
+        return existing
+
+    async def update_parsed_fields(self, items: list[dict]) -> int:
+        """Overwrite the parsed columns of stored emails, matched by gmail_message_id.
+
+        Used when re-parsing cached raw payloads; application links are kept.
+        A missing thread ID never clears a stored one. Unlinked emails lose
+        their matcher_version stamp, so the next scan matches the re-parsed
+        fields. Returns the number of items applied.
+        """
+        if not items:
+            return 0
+        table = EmailReference.__table__
+        stmt = (
+            update(table)
+            .where(table.c.gmail_message_id == bindparam("b_gmail_message_id"))
+            .values(
+                gmail_thread_id=func.coalesce(bindparam("b_gmail_thread_id"), table.c.gmail_thread_id),
+                subject=bindparam("b_subject"),
+                sender=bindparam("b_sender"),
+                received_at=bindparam("b_received_at"),
+                snippet=bindparam("b_snippet"),
+                body_text=bindparam("b_body_text"),
+                matcher_version=case(
+                    (table.c.application_id.is_(None), None),
+                    else_=table.c.matcher_version,
+                ),
             )
         )
+        await self.session.execute(
+            stmt,
+            [
+                {
+                    "b_gmail_message_id": item["gmail_message_id"],
+                    "b_gmail_thread_id": item.get("gmail_thread_id"),
+                    "b_subject": item.get("subject"),
+                    "b_sender": item.get("sender"),
+                    "b_received_at": item["received_at"],
+                    "b_snippet": item.get("snippet"),
+                    "b_body_text": item.get("body_text"),
+                }
+                for item in items
+            ],
+        )
+        return len(items)
 
     async def create_from_raw_message(self, data: dict) -> tuple[Optional[EmailReference], bool]:
         message_id = data.get("gmail_message_id")
@@ -53,70 +151,172 @@ class EmailReferenceRepository:
         return record, True
 
     async def bulk_create(self, items: list[dict]) -> tuple[int, int]:
+        """Insert new emails; return (inserted, skipped as already stored).
+
+        One INSERT ... ON CONFLICT (gmail_message_id) DO NOTHING RETURNING per
+        chunk, so rows another scan inserted concurrently are skipped by the
+        database instead of failing the batch.
+        """
         if not items:
             return 0, 0
 
-        # Deduplicate incoming batch by gmail_message_id before hitting the DB.
-        seen: set[str] = set()
-        deduped: list[dict] = []
-        for item in items:
-            mid = item.get("gmail_message_id")
-            if not mid or mid in seen:
-                continue
-            seen.add(mid)
-            deduped.append(item)
-
-        ids = list(seen)
-        existing_ids: set[str] = set()
-        if ids:
-            result = await self.session.execute(
-                select(EmailReference.gmail_message_id).where(EmailReference.gmail_message_id.in_(ids))
+        rows = _dedupe_rows(items)
+        insert = _DIALECT_INSERTS[self.session.bind.dialect.name]
+        table = EmailReference.__table__
+        inserted = 0
+        for i in range(0, len(rows), _INSERT_CHUNK_SIZE):
+            stmt = (
+                insert(table)
+                .values(rows[i : i + _INSERT_CHUNK_SIZE])
+                .on_conflict_do_nothing(index_elements=[table.c.gmail_message_id])
+                .returning(table.c.id, table.c.gmail_message_id)
             )
-            existing_ids = set(result.scalars().all())
-
-        to_insert = [item for item in deduped if item.get("gmail_message_id") not in existing_ids]
-        records = [EmailReference(**item) for item in to_insert]
-
-        if records:
-            self.session.add_all(records)
-            try:
-                await self.session.flush()
-            except IntegrityError:
-                # A concurrent scan may have inserted one of these
-                # gmail_message_ids between our pre-check and this flush.
-                # Retry rows individually so only the actual colliding row(s)
-                # are dropped, rather than discarding the whole batch.
-                await self.session.rollback()
-                logger.warning(
-                    "bulk_create batch flush failed (likely concurrent duplicate); retrying rows individually",
-                    exc_info=True,
-                )
-                inserted = 0
-                skipped = len(existing_ids)
-                for record in records:
-                    self.session.add(record)
-                    try:
-                        await self.session.flush()
-                        inserted += 1
-                    except IntegrityError:
-                        await self.session.rollback()
-                        skipped += 1
-                return inserted, skipped
-
-        return len(records), len(existing_ids)
-
-    async def list_unlinked(self) -> list[EmailReference]:
+            result = await self.session.execute(stmt)
+            inserted += len(result.all())
+
+        return inserted, len(rows) - inserted
+
+    async def copy_create(self, items: list[dict]) -> tuple[int, int]:
+        """Backfill variant of bulk_create for large imports; same result.
+
+        On PostgreSQL the rows are streamed with asyncpg's binary COPY into a
+        temporary staging table, then merged in one INSERT ... SELECT ...
+        ON CONFLICT (gmail_message_id) DO NOTHING. Runs inside the session's
+        transaction. Other dialects fall back to bulk_create.
+        """
+        if self.session.bind.dialect.name != "postgresql":
+            return await self.bulk_create(items)
+        rows = _dedupe_rows(items)
+        if not rows:
+            return 0, 0
+
+        column_list = ", ".join(_COPY_COLUMNS)
+        # Created through the session so it runs in (and begins) the session's transaction.
+        await self.session.execute(
+            text(
+                f"CREATE TEMPORARY TABLE {_COPY_STAGING_TABLE} ON COMMIT DROP AS "
+                f"SELECT {column_list} FROM {EmailReference.__tablename__} WITH NO DATA"
+            )
+        )
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        created_at = utcnow()
+        await raw_connection.driver_connection.copy_records_to_table(
+            _COPY_STAGING_TABLE,
+            columns=_COPY_COLUMNS,
+            records=(
+                tuple(row[name] for name in _INSERT_COLUMNS) + (created_at,)
+                for row in rows
+            ),
+        )
+
+        target = EmailReference.__table__
+        staging = table(_COPY_STAGING_TABLE, *(column(name) for name in _COPY_COLUMNS))
         result = await self.session.execute(
-            select(EmailReference).where(EmailReference.application_id.is_(None))
+            postgresql_insert(target)
+            .from_select(_COPY_COLUMNS, select(staging))
+            .on_conflict_do_nothing(index_elements=[target.c.gmail_message_id])
+            .returning(target.c.id)
         )
+        inserted = len(result.all())
+        await self.session.execute(text(f"DROP TABLE {_COPY_STAGING_TABLE}"))
+        return inserted, len(rows) - inserted
+
+    async def list_unlinked(self, stale_for_version: Optional[int] = None) -> list[EmailReference]:
+        """Return unlinked emails; with stale_for_version, only those not yet
+        evaluated by that matcher version."""
+        query = select(EmailReference).where(EmailReference.application_id.is_(None))
+        if stale_for_version is not None:
+            query = query.where(
+                or_(
+                    EmailReference.matcher_version.is_(None),
+                    EmailReference.matcher_version != stale_for_version,
+                )
+            )
+        result = await self.session.execute(query)
         return list(result.scalars().all())
 
-    async def list_paginated(self, limit: int, offset: int) -> tuple[list[EmailReference], int]:
-        total = await self.session.scalar(select(func.count()).select_from(EmailReference))
+    async def map_thread_applications(self, thread_ids: list[str]) -> dict[str, int]:
+        """Map each thread in thread_ids whose linked emails all belong to one
+        application to that application's id. Threads linked to several
+        applications (e.g. after a manual reassignment) are left out."""
+        unique_ids = list(set(thread_ids))
+        links: dict[str, int] = {}
+        for i in range(0, len(unique_ids), _IN_CLAUSE_CHUNK_SIZE):
+            result = await self.session.execute(
+                select(EmailReference.gmail_thread_id, func.min(EmailReference.application_id))
+                .where(EmailReference.gmail_thread_id.in_(unique_ids[i : i + _IN_CLAUSE_CHUNK_SIZE]))
+                .where(EmailReference.application_id.is_not(None))
+                .group_by(EmailReference.gmail_thread_id)
+                .having(func.count(func.distinct(EmailReference.application_id)) == 1)
+            )
+            links.update({thread_id: application_id for thread_id, application_id in result.all()})
+        return links
+
+    async def list_evaluated_unlinked(self, matcher_version: int, containing: set[str]) -> list[EmailReference]:
+        """Return unlinked emails already evaluated by matcher_version whose
+        subject or sender contains one of the containing terms."""
         result = await self.session.execute(
             select(EmailReference)
-            .order_by(EmailReference.received_at.desc())
-            .limit(limit)
-            .offset(offset)
+            .where(EmailReference.application_id.is_(None))
+            .where(EmailReference.matcher_version == matcher_version)
+            .where(
+                or_(
+                    *(
+                        column.ilike(contains_pattern(term), escape="\\")
+                        for term in sorted(containing)
+                        for column in (EmailReference.subject, EmailReference.sender)
+                    )
+                )
+            )
         )
-        return list(result.scalars().all()), total or 0
+        return list(result.scalars().all())
+
+    async def mark_matched(self, email_ids: list[int], matcher_version: Optional[int]) -> None:
+        """Stamp emails as evaluated by matcher_version; None makes them due again."""
+        for i in range(0, len(email_ids), _IN_CLAUSE_CHUNK_SIZE):
+            await self.session.execute(
+                update(EmailReference)
+                .where(EmailReference.id.in_(email_ids[i : i + _IN_CLAUSE_CHUNK_SIZE]))
+                .values(matcher_version=matcher_version)
+                .execution_options(synchronize_session=False)
+            )
+
+    async def list_paginated(
+        self,
+        limit: int,
+        offset: int,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> tuple[list[EmailReference], Optional[int], Optional[str]]:
+        """Return (items, total, next_cursor), newest first.
+
+        With cursor (a previous page's next_cursor), continue after that row;
+        offset is then ignored and total is None (the first page reported
+        it). With search, only matching emails, ranked by relevance and paged
+        with offset only, so next_cursor is None. Raises InvalidCursorError
+        for a bad cursor or one passed with search."""
+        query = select(EmailReference)
+        count_query = select(func.count()).select_from(EmailReference)
+        if search:
+            if cursor:
+                raise InvalidCursorError("Relevance-ranked search results are paged with offset")
+            dialect = self.session.bind.dialect.name
+            search_filter = _SEARCH.where(dialect, search)
+            query = query.where(search_filter).order_by(
+                _SEARCH.rank(dialect, search).desc(), *_LIST_SORT_KEY.order_by()
+            )
+            result = await self.session.execute(query.limit(limit).offset(offset))
+            total = await self.session.scalar(count_query.where(search_filter))
+            return list(result.scalars().all()), total or 0, None
+
+        query = query.order_by(*_LIST_SORT_KEY.order_by()).limit(limit + 1)
+        if cursor:
+            total = None
+            query = query.where(_LIST_SORT_KEY.after(cursor))
+        else:
+            total = await self.session.scalar(count_query) or 0
+            query = query.offset(offset)
+        result = await self.session.execute(query)
+        items, next_cursor = _LIST_SORT_KEY.page(list(result.scalars().all()), limit)
+        return items, total, next_cursor
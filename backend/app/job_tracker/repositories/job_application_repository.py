@@ -1,13 +1,172 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import delete, select, func, update, or_
+from sqlalchemy import Integer, DateTime, bindparam, case, cast, column, delete, select, func, update, or_, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.db import utcnow
 from app.job_tracker.models.email_reference import EmailReference
 from app.job_tracker.models.job_application import JobApplication, ApplicationStatus
+from app.job_tracker.repositories.keyset import InvalidCursorError, SortKey
+from app.job_tracker.repositories.search import TextSearch
+
+# Rows per UPDATE ... FROM (VALUES ...) statement; four bind parameters each
+# keeps a statement well under PostgreSQL's 32767-parameter limit.
+_ACTIVITY_UPDATE_CHUNK = 5000
+
+# Sort orders of list_paginated; "last_email_at" is the default and also the
+# pipeline column order.
+_SORT_KEYS = {
+    key.name: key
+    for key in (
+        SortKey("updated_at", JobApplication.updated_at, JobApplication.id, descending=True),
+        SortKey("created_at", JobApplication.created_at, JobApplication.id, descending=True),
+        SortKey("applied_at", JobApplication.applied_at, JobApplication.id, descending=True, nullable=True),
+        SortKey("last_email_at", JobApplication.last_email_at, JobApplication.id, descending=True, nullable=True),
+        SortKey("company_name", JobApplication.company_name, JobApplication.id, descending=False),
+        SortKey("role_title", JobApplication.role_title, JobApplication.id, descending=False, nullable=True),
+        SortKey("status", JobApplication.status, JobApplication.id, descending=False),
+    )
+}
+_DEFAULT_SORT_KEY = _SORT_KEYS["last_email_at"]
+
+# ?search= of list_paginated. search_vector weights company_name, role_title
+# and source (A/B/C) with the "simple" configuration: names, not prose.
+_SEARCH = TextSearch(
+    JobApplication.__table__,
+    "simple",
+    [JobApplication.company_name, JobApplication.role_title, JobApplication.source, JobApplication.job_url],
+)
+
+_STATUS_PRIORITY = {
+    ApplicationStatus.APPLIED: 0,
+    ApplicationStatus.INTERVIEWING: 1,
+    ApplicationStatus.OFFER: 2,
+}
+
+
+def next_status_from_email(
+    current: ApplicationStatus,
+    inferred_status: ApplicationStatus,
+) -> Optional[ApplicationStatus]:
+    """Return the status an inferred email signal moves an application to, or None.
+
+    Priority order: applied < interviewing < offer
+    rejected: allowed only from applied; cannot override interviewing or offer.
+    """
+    # Never act on applied — it's the default, not a signal
+    if inferred_status == ApplicationStatus.APPLIED:
+        return None
+
+    # No-op: already at this status
+    if current == inferred_status:
+        return None
+
+    # Rejected is terminal — no automatic transition back out via email inference
+    if current == ApplicationStatus.REJECTED:
+        return None
+
+    if inferred_status == ApplicationStatus.REJECTED:
+        # rejected only upgrades from applied; never downgrades interviewing/offer
+        if current != ApplicationStatus.APPLIED:
+            return None
+    else:
+        # For the priority chain, only allow upgrades
+        if _STATUS_PRIORITY.get(inferred_status, -1) <= _STATUS_PRIORITY.get(current, -1):
+            return None
+
+    return inferred_status
+
+
+class ApplicationMatchRow:
+    """The columns a scan matches emails against, without a full JobApplication.
+
+    Loaded in one query by JobApplicationRepository.list_match_rows and used
+    for MatcherIndex, the auto-create dedup keys and EmailActivityBatch. Rows
+    are not attached to the session, so notes, job_url and the rest are never
+    hydrated and nothing is added to the identity map.
+    """
+
+    __slots__ = ("id", "company_name", "role_title", "status")
+
+    def __init__(self, id: int, company_name: str, role_title: Optional[str], status: ApplicationStatus):
+        self.id = id
+        self.company_name = company_name
+        self.role_title = role_title
+        self.status = status
+
+    @classmethod
+    def from_application(cls, application: JobApplication) -> "ApplicationMatchRow":
+        return cls(application.id, application.company_name, application.role_title, application.status)
+
+    @property
+    def dedup_key(self) -> tuple[str, str]:
+        """(company_name.lower(), role_title.lower()) — the auto-create dedup key."""
+        return (self.company_name.lower(), (self.role_title or "").lower())
+
+
+def _set_loaded(application: JobApplication | ApplicationMatchRow, key: str, value) -> None:
+    """Set a value the database already holds, without marking a JobApplication dirty."""
+    if isinstance(application, ApplicationMatchRow):
+        setattr(application, key, value)
+    else:
+        set_committed_value(application, key, value)
+
+
+class EmailActivityBatch:
+    """email_count, last_email_at and status changes for applications, collected in memory.
+
+    A scan stage records every email it links here, then writes the whole
+    batch with JobApplicationRepository.apply_email_activity in one statement
+    instead of several UPDATEs per email. Status signals are folded through
+    next_status_from_email in the order they are recorded, exactly as
+    per-email update_status_from_email calls would apply them; the new status
+    is set on the loaded application or ApplicationMatchRow right away
+    (without marking it dirty) so matching later in the stage sees it.
+    """
+
+    def __init__(self):
+        self._applications: dict[int, JobApplication | ApplicationMatchRow] = {}
+        self._last_email_at: dict[int, datetime] = {}
+        self._email_counts: dict[int, int] = {}
+        self._status: dict[int, ApplicationStatus] = {}
+
+    def __len__(self) -> int:
+        return len(self._applications)
+
+    def rows(
+        self,
+    ) -> list[tuple[JobApplication | ApplicationMatchRow, datetime, int, Optional[ApplicationStatus]]]:
+        """(application, latest received_at, emails linked, new status or None) per recorded application."""
+        return [
+            (application, self._last_email_at[app_id], self._email_counts[app_id], self._status.get(app_id))
+            for app_id, application in self._applications.items()
+        ]
+
+    def record(
+        self,
+        application: JobApplication | ApplicationMatchRow,
+        received_at: datetime,
+        inferred_status: Optional[ApplicationStatus] = None,
+    ) -> bool:
+        """Record a newly linked email; return True if its status signal changes the application's status."""
+        self._applications[application.id] = application
+        self._email_counts[application.id] = self._email_counts.get(application.id, 0) + 1
+        latest = self._last_email_at.get(application.id)
+        if latest is None or received_at > latest:
+            self._last_email_at[application.id] = received_at
+
+        if inferred_status is None:
+            return False
+        new_status = next_status_from_email(application.status, inferred_status)
+        if new_status is None:
+            return False
+        self._status[application.id] = new_status
+        _set_loaded(application, "status", new_status)
+        return True
 
 
 class JobApplicationRepository:
@@ -80,8 +239,25 @@ class JobApplicationRepository:
         search: Optional[str] = None,
         company_name: Optional[str] = None,
         sort: Optional[str] = None,
-    ) -> tuple[list[JobApplication], int]:
-        query = select(JobApplication).options(selectinload(JobApplication.emails))
+        cursor: Optional[str] = None,
+        include_emails: bool = False,
+    ) -> tuple[list[JobApplication], Optional[int], Optional[str]]:
+        """Return (items, total, next_cursor).
+
+        With cursor (a previous page's next_cursor), continue after that row;
+        offset is then ignored and total is None, since the first page already
+        reported it and counting every filtered row on each deep page is what
+        cursors avoid. next_cursor is None on the last page and for a search
+        without an explicit sort, which is ranked by relevance and paged with
+        offset only. Linked emails are only loaded with include_emails;
+        email_count is a column either way. Raises InvalidCursorError for a
+        malformed cursor, one issued for another sort, or one passed with a
+        relevance-ranked search.
+        """
+        sort_key = _SORT_KEYS.get(sort or "", _DEFAULT_SORT_KEY)
+        query = select(JobApplication)
+        if include_emails:
+            query = query.options(selectinload(JobApplication.emails))
         count_query = select(func.count()).select_from(JobApplication)
 
         if status:
@@ -93,34 +269,27 @@ class JobApplicationRepository:
             count_query = count_query.where(JobApplication.company_name == company_name)
 
         if search:
-            pattern = f"%{search}%"
-            search_filter = or_(
-                JobApplication.company_name.ilike(pattern),
-                JobApplication.role_title.ilike(pattern),
-                JobApplication.source.ilike(pattern),
-                JobApplication.job_url.ilike(pattern),
-            )
+            search_filter = _SEARCH.where(self.session.bind.dialect.name, search)
             query = query.where(search_filter)
             count_query = count_query.where(search_filter)
 
-        _sort_map = {
-            "updated_at": JobApplication.updated_at.desc(),
-            "created_at": JobApplication.created_at.desc(),
-            "applied_at": JobApplication.applied_at.desc().nulls_last(),
-            "last_email_at": JobApplication.last_email_at.desc().nulls_last(),
-            "company_name": JobApplication.company_name.asc(),
-            "role_title": JobApplication.role_title.asc().nulls_last(),
-            "status": JobApplication.status.asc(),
-        }
-        sort_col = _sort_map.get(sort or "", JobApplication.last_email_at.desc().nulls_last())
-
-        total = await self.session.scalar(count_query)
-        result = await self.session.execute(
-            # id as tiebreaker: ties on sort_col alone (e.g. multiple rows with
-            # last_email_at IS NULL) make OFFSET pagination non-deterministic.
-            query.order_by(sort_col, JobApplication.id.desc()).limit(limit).offset(offset)
-        )
-        return list(result.scalars().all()), total or 0
+        if search and not sort:
+            if cursor:
+                raise InvalidCursorError("Relevance-ranked search results are paged with offset")
+            rank = _SEARCH.rank(self.session.bind.dialect.name, search)
+            query = query.order_by(rank.desc(), JobApplication.id.desc()).limit(limit).offset(offset)
+            result = await self.session.execute(query)
+            return list(result.scalars().all()), await self.session.scalar(count_query) or 0, None
+
+        total = None if cursor else await self.session.scalar(count_query) or 0
+        # id as tiebreaker (in SortKey.order_by): ties on the sort column alone
+        # (e.g. multiple rows with last_email_at IS NULL) would make paging
+        # non-deterministic.
+        query = query.order_by(*sort_key.order_by()).limit(limit + 1)
+        query = query.where(sort_key.after(cursor)) if cursor else query.offset(offset)
+        result = await self.session.execute(query)
+        items, next_cursor = sort_key.page(list(result.scalars().all()), limit)
+        return items, total, next_cursor
 
     async def count_by_status(self) -> list[tuple[ApplicationStatus, int]]:
         """Return application counts grouped by status."""
@@ -141,12 +310,17 @@ class JobApplicationRepository:
         result = await self.session.execute(select(JobApplication))
         return list(result.scalars().all())
 
-    async def list_company_role_keys(self) -> set[tuple[str, str]]:
-        """Return (company_name.lower(), role_title.lower()) for all existing applications."""
+    async def list_match_rows(self) -> list[ApplicationMatchRow]:
+        """Return id, company_name, role_title and status of every application."""
         result = await self.session.execute(
-            select(JobApplication.company_name, JobApplication.role_title)
+            select(
+                JobApplication.id,
+                JobApplication.company_name,
+                JobApplication.role_title,
+                JobApplication.status,
+            )
         )
-        return {(row[0].lower(), (row[1] or "").lower()) for row in result.all()}
+        return [ApplicationMatchRow(*row) for row in result.all()]
 
     async def list_recent(self, limit: int = 10) -> list[JobApplication]:
         result = await self.session.execute(
@@ -157,25 +331,66 @@ class JobApplicationRepository:
         )
         return list(result.scalars().all())
 
-    async def update_last_email_at(self, application_id: int, received_at: datetime) -> None:
-        """Advance last_email_at only if received_at is more recent."""
+    async def add_linked_email(self, application_id: int, received_at: datetime) -> None:
+        """Count one newly linked email and advance last_email_at if received_at is more recent."""
+        table = JobApplication.__table__
+        advances = or_(table.c.last_email_at.is_(None), table.c.last_email_at < received_at)
         await self.session.execute(
-            update(JobApplication)
-            .where(JobApplication.id == application_id)
-            .where(
-                (JobApplication.last_email_at == None)  # noqa: E711
-                | (JobApplication.last_email_at < received_at)
+            update(table)
+            .where(table.c.id == application_id)
+            .values(
+                email_count=table.c.email_count + 1,
+                last_email_at=case((advances, received_at), else_=table.c.last_email_at),
             )
-            .values(last_email_at=received_at)
         )
-
-    async def set_last_email_at(self, application_id: int, value: datetime | None) -> None:
-        """Unconditionally set last_email_at (used after unlinking an email)."""
+        await self._refresh_counters(application_id)
+
+    async def remove_linked_email(self, application_id: int, received_at: datetime) -> None:
+        """Uncount one email unlinked from the application (the unlink must
+        already be in the session). last_email_at is recomputed from the
+        remaining emails only if the removed one may have been the latest."""
+        table = JobApplication.__table__
+        remaining_latest = (
+            select(func.max(EmailReference.received_at))
+            .where(EmailReference.application_id == application_id)
+            .scalar_subquery()
+        )
+        may_be_latest = or_(table.c.last_email_at.is_(None), table.c.last_email_at <= received_at)
         await self.session.execute(
-            update(JobApplication)
-            .where(JobApplication.id == application_id)
-            .values(last_email_at=value)
+            update(table)
+            .where(table.c.id == application_id)
+            .values(
+                email_count=table.c.email_count - 1,
+                last_email_at=case((may_be_latest, remaining_latest), else_=table.c.last_email_at),
+            )
+        )
+        await self._refresh_counters(application_id)
+
+    async def _refresh_counters(self, application_id: int) -> None:
+        """Reload the counters of the application if the session has it loaded;
+        the UPDATEs above bypass the ORM."""
+        application = self.session.identity_map.get(identity_key(JobApplication, application_id))
+        if application is not None:
+            await self.session.refresh(application, ["email_count", "last_email_at", "updated_at"])
+
+    async def recompute_email_counters(self) -> int:
+        """Recompute email_count and last_email_at of every application from
+        its linked emails; return how many applications were out of date."""
+        table = JobApplication.__table__
+        linked = EmailReference.__table__
+        count = (
+            select(func.count()).select_from(linked).where(linked.c.application_id == table.c.id).scalar_subquery()
         )
+        latest = (
+            select(func.max(linked.c.received_at)).where(linked.c.application_id == table.c.id).scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(table)
+            .where(or_(table.c.email_count.is_distinct_from(count), table.c.last_email_at.is_distinct_from(latest)))
+            .values(email_count=count, last_email_at=latest, updated_at=table.c.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
 
     async def update_status_from_email(
         self,
@@ -188,35 +403,9 @@ class JobApplicationRepository:
         rejected: allowed only from applied; cannot override interviewing or offer.
         Returns True if status was changed, False if skipped.
         """
-        current = application.status
-
-        # Never act on applied — it's the default, not a signal
-        if inferred_status == ApplicationStatus.APPLIED:
-            return False
-
-        # No-op: already at this status
-        if current == inferred_status:
+        if next_status_from_email(application.status, inferred_status) is None:
             return False
 
-        # Rejected is terminal — no automatic transition back out via email inference
-        if current == ApplicationStatus.REJECTED:
-            return False
-
-        _priority = {
-            ApplicationStatus.APPLIED: 0,
-            ApplicationStatus.INTERVIEWING: 1,
-            ApplicationStatus.OFFER: 2,
-        }
-
-        if inferred_status == ApplicationStatus.REJECTED:
-            # rejected only upgrades from applied; never downgrades interviewing/offer
-            if current != ApplicationStatus.APPLIED:
-                return False
-        else:
-            # For the priority chain, only allow upgrades
-            if _priority.get(inferred_status, -1) <= _priority.get(current, -1):
-                return False
-
         await self.session.execute(
             update(JobApplication)
             .where(JobApplication.id == application.id)
@@ -225,31 +414,119 @@ class JobApplicationRepository:
         application.status = inferred_status
         return True
 
+    async def apply_email_activity(self, batch: EmailActivityBatch) -> int:
+        """Write a batch of email-driven changes in one set-based UPDATE.
+
+        email_count grows by the emails recorded; last_email_at only ever
+        advances, as in add_linked_email; status is set where the batch
+        changed it. updated_at moves only when last_email_at or status does.
+        Loaded JobApplication objects get the new values without being marked
+        dirty (ApplicationMatchRow carries none of these columns).
+        Returns the number of applications in the batch.
+        """
+        rows = batch.rows()
+        if not rows:
+            return 0
+
+        table = JobApplication.__table__
+        now = utcnow()
+        if self.session.bind.dialect.name == "postgresql":
+            for start in range(0, len(rows), _ACTIVITY_UPDATE_CHUNK):
+                chunk = rows[start : start + _ACTIVITY_UPDATE_CHUNK]
+                incoming = values(
+                    column("id", Integer),
+                    column("last_email_at", DateTime(timezone=True)),
+                    column("email_count", Integer),
+                    column("status", table.c.status.type),
+                    name="incoming",
+                ).data([(app.id, last_email_at, count, status) for app, last_email_at, count, status in chunk])
+                # A VALUES column that is NULL in every row is typed text; cast it back.
+                incoming_status = cast(incoming.c.status, table.c.status.type)
+                await self.session.execute(
+                    self._email_activity_update(
+                        table,
+                        incoming.c.id,
+                        incoming.c.last_email_at,
+                        incoming.c.email_count,
+                        incoming_status,
+                        now,
+                    )
+                )
+        else:
+            # SQLite can't alias the columns of a VALUES subquery, so run the
+            # same statement as a single executemany instead.
+            await self.session.execute(
+                self._email_activity_update(
+                    table,
+                    bindparam("b_id", type_=Integer),
+                    bindparam("b_last_email_at", type_=DateTime(timezone=True)),
+                    bindparam("b_email_count", type_=Integer),
+                    bindparam("b_status", type_=table.c.status.type),
+                    now,
+                ),
+                [
+                    {"b_id": app.id, "b_last_email_at": last_email_at, "b_email_count": count, "b_status": status}
+                    for app, last_email_at, count, status in rows
+                ],
+            )
+
+        for application, last_email_at, count, status in rows:
+            if isinstance(application, ApplicationMatchRow):
+                continue
+            set_committed_value(application, "email_count", (application.email_count or 0) + count)
+            advanced = application.last_email_at is None or application.last_email_at < last_email_at
+            if advanced:
+                set_committed_value(application, "last_email_at", last_email_at)
+            if advanced or status is not None:
+                set_committed_value(application, "updated_at", now)
+        return len(rows)
+
+    @staticmethod
+    def _email_activity_update(table, app_id, last_email_at, email_count, status, now):
+        advances = or_(table.c.last_email_at.is_(None), table.c.last_email_at < last_email_at)
+        return (
+            update(table)
+            .where(table.c.id == app_id)
+            .values(
+                email_count=table.c.email_count + email_count,
+                last_email_at=case((advances, last_email_at), else_=table.c.last_email_at),
+                status=func.coalesce(status, table.c.status),
+                updated_at=case((or_(advances, status.is_not(None)), now), else_=table.c.updated_at),
+            )
+        )
+
     async def list_pipeline_page(
         self,
         status: ApplicationStatus,
         page: int,
         page_size: int,
-    ) -> tuple[list[JobApplication], int]:
-        """Return one page of pipeline cards for a single status column."""
-        offset = (page - 1) * page_size
-        base = (
+        cursor: Optional[str] = None,
+    ) -> tuple[list[JobApplication], Optional[int], Optional[str]]:
+        """Return (items, total, next_cursor) for one page of a single status column.
+
+        With cursor, continue after that row instead of seeking to page; total
+        is then None (see list_paginated). Linked emails are not loaded; cards
+        use the email_count column.
+        """
+        total = None
+        if not cursor:
+            count_q = select(func.count()).select_from(
+                select(JobApplication.id).where(JobApplication.status == status).subquery()
+            )
+            total = await self.session.scalar(count_q) or 0
+        items_q = (
             select(JobApplication)
             .where(JobApplication.status == status)
+            .order_by(*_DEFAULT_SORT_KEY.order_by())
+            .limit(page_size + 1)
         )
-        count_q = select(func.count()).select_from(
-            select(JobApplication.id).where(JobApplication.status == status).subquery()
-        )
-        total = await self.session.scalar(count_q) or 0
-        items_q = (
-            base
-            .options(selectinload(JobApplication.emails))
-            .order_by(JobApplication.last_email_at.desc().nulls_last(), JobApplication.id.desc())
-            .limit(page_size)
-            .offset(offset)
-        )
+        if cursor:
+            items_q = items_q.where(_DEFAULT_SORT_KEY.after(cursor))
+        else:
+            items_q = items_q.offset((page - 1) * page_size)
         result = await self.session.execute(items_q)
-        return list(result.scalars().all()), total
+        items, next_cursor = _DEFAULT_SORT_KEY.page(list(result.scalars().all()), page_size)
+        return items, total, next_cursor
 
     async def list_company_summary_page(
         self,
@@ -0,0 +1,102 @@
+"""
+Keyset (cursor) pagination.
+
+A page is continued from the last row of the previous one — "rows after
+(sort value, id)" — instead of with OFFSET, so a deep page costs the same
+as the first: the database seeks to the cursor through the sort index
+rather than reading and discarding every earlier row. Cursors are opaque
+URL-safe strings encoding the sort name, the last row's sort value and its
+id; the id is always the tiebreaker (descending), which keeps the order
+total when sort values repeat. Pages are fetched with one extra row, so a
+next cursor is only issued when another row actually follows.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursorError(ValueError):
+    """A cursor that is malformed or was issued for a different sort."""
+
+
+class SortKey:
+    """One sort order: a column, its direction and whether it holds NULLs.
+
+    Nullable columns sort NULLs last in both directions, matching the
+    order_by() clauses the list endpoints used with OFFSET.
+    """
+
+    __slots__ = ("name", "column", "descending", "nullable", "id_column")
+
+    def __init__(self, name: str, column, id_column, descending: bool, nullable: bool = False):
+        self.name = name
+        self.column = column
+        self.id_column = id_column
+        self.descending = descending
+        self.nullable = nullable
+
+    def order_by(self) -> list:
+        clause = self.column.desc() if self.descending else self.column.asc()
+        if self.nullable:
+            clause = clause.nulls_last()
+        return [clause, self.id_column.desc()]
+
+    def after(self, cursor: str):
+        """WHERE clause selecting the rows that follow cursor in this order."""
+        value, last_id = self._decode(cursor)
+        id_after = self.id_column < last_id
+        if value is None:
+            # Only nullable columns issue NULL cursors; NULLs sort last.
+            return and_(self.column.is_(None), id_after)
+        beyond = self.column < value if self.descending else self.column > value
+        clause = or_(beyond, and_(self.column == value, id_after))
+        if self.nullable:
+            clause = or_(clause, self.column.is_(None))
+        return clause
+
+    def cursor_for(self, row) -> str:
+        value = getattr(row, self.column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Enum):
+            value = value.value
+        payload = json.dumps([self.name, value, row.id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def page(self, rows: list, limit: int) -> tuple[list, Optional[str]]:
+        """Split rows, fetched with LIMIT limit + 1, into the page and the cursor
+        for the next one; the cursor is None when no row follows the page."""
+        if len(rows) <= limit:
+            return rows, None
+        items = rows[:limit]
+        return items, self.cursor_for(items[-1])
+
+    def _decode(self, cursor: str) -> tuple[Any, int]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            name, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursorError("Malformed cursor") from None
+        if name != self.name:
+            raise InvalidCursorError("Cursor was issued for a different sort order")
+        if not isinstance(last_id, int) or (value is None and not self.nullable):
+            raise InvalidCursorError("Malformed cursor")
+        if value is None:
+            return None, last_id
+
+        python_type = self.column.type.python_type
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif issubclass(python_type, Enum):
+                value = python_type(value)
+            elif not isinstance(value, python_type):
+                raise TypeError(value)
+        except (ValueError, TypeError):
+            raise InvalidCursorError("Malformed cursor") from None
+        return value, last_id
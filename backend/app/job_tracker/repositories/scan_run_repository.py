@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -26,6 +27,8 @@ class ScanRunRepository:
         emails_fetched: int,
         emails_inserted: int,
         apps_created: int,
+        fetches_avoided: Optional[int] = None,
+        history_id: Optional[str] = None,
     ) -> None:
         run = await self.session.scalar(select(ScanRun).where(ScanRun.id == run_id))
         if run:
@@ -34,6 +37,8 @@ class ScanRunRepository:
             run.emails_fetched = emails_fetched
             run.emails_inserted = emails_inserted
             run.apps_created = apps_created
+            run.fetches_avoided = fetches_avoided
+            run.history_id = history_id
         else:
             logger.warning("ScanRun id=%s not found when trying to complete", run_id)
 
@@ -46,6 +51,15 @@ class ScanRunRepository:
         else:
             logger.warning("ScanRun id=%s not found when trying to fail", run_id)
 
+    async def get_last_history_id(self) -> Optional[str]:
+        """Return the Gmail historyId recorded by the most recent completed scan."""
+        return await self.session.scalar(
+            select(ScanRun.history_id)
+            .where(ScanRun.status == "completed", ScanRun.history_id.is_not(None))
+            .order_by(ScanRun.started_at.desc(), ScanRun.id.desc())
+            .limit(1)
+        )
+
     async def list_recent(self, limit: int = 10) -> list[ScanRun]:
         result = await self.session.execute(
             select(ScanRun).order_by(ScanRun.started_at.desc()).limit(limit)
@@ -0,0 +1,71 @@
+"""
+Ranked text search for the list endpoints' ?search= parameter.
+
+On PostgreSQL a row matches when the term's websearch tsquery matches the
+table's search_vector (a generated, GIN-indexed tsvector column added by
+migration 007) or when one of the searched columns contains the term; the
+pg_trgm GIN indexes on those columns serve the ILIKE '%term%' predicates,
+so neither side needs a sequential scan as the table grows. Matches rank by
+ts_rank plus the best trigram similarity.
+
+Other dialects (the SQLite test engine) have neither, so they fall back to
+ILIKE over the same columns, ranked by the most significant column that
+matched.
+"""
+from sqlalchemy import case, func, literal, literal_column, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# Name of the generated tsvector column on every searchable table. It is not
+# mapped on the models: SQLite test databases are built with create_all()
+# and could not create it.
+SEARCH_VECTOR_COLUMN = "search_vector"
+
+
+def contains_pattern(term: str) -> str:
+    """ILIKE pattern matching term as a literal substring."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class TextSearch:
+    """Search over one table.
+
+    columns are matched as substrings everywhere (most significant first;
+    each has a gin_trgm_ops index on PostgreSQL). fallback_columns are long
+    text the search_vector already covers; they are matched as substrings
+    only where there is no search_vector.
+    """
+
+    __slots__ = ("vector", "config", "columns", "fallback_columns")
+
+    def __init__(self, table, config: str, columns: list, fallback_columns: tuple = ()):
+        self.vector = literal_column(f"{table.name}.{SEARCH_VECTOR_COLUMN}", TSVECTOR)
+        self.config = config
+        self.columns = columns
+        self.fallback_columns = list(fallback_columns)
+
+    def where(self, dialect: str, term: str):
+        """WHERE clause selecting the rows that match term."""
+        pattern = contains_pattern(term)
+        if dialect != "postgresql":
+            return or_(*(column.ilike(pattern, escape="\\") for column in self.columns + self.fallback_columns))
+        substring = [column.ilike(pattern, escape="\\") for column in self.columns]
+        return or_(self.vector.op("@@")(self._tsquery(term)), *substring)
+
+    def rank(self, dialect: str, term: str):
+        """Relevance of a matching row to term; higher is better."""
+        if dialect == "postgresql":
+            similarity = func.greatest(*(func.similarity(column, term) for column in self.columns))
+            return func.ts_rank(self.vector, self._tsquery(term)) + func.coalesce(similarity, 0)
+        pattern = contains_pattern(term)
+        columns = self.columns + self.fallback_columns
+        return case(
+            *(
+                (column.ilike(pattern, escape="\\"), literal(len(columns) - index))
+                for index, column in enumerate(columns)
+            ),
+            else_=literal(0),
+        )
+
+    def _tsquery(self, term: str):
+        return func.websearch_to_tsquery(literal_column(f"'{self.config}'"), term)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from app.job_tracker.models.job_application import ApplicationStatus
 from app.job_tracker.schemas.email_reference import EmailReferenceRead
@@ -68,7 +68,8 @@ class JobApplicationUpdate(BaseModel):
         return _validate_job_url(v)
 
 
-class JobApplicationRead(BaseModel):
+class JobApplicationSummary(BaseModel):
+    """An application without its linked emails, as listed by /applications."""
     model_config = ConfigDict(from_attributes=True)
 
     id: int
@@ -84,15 +85,16 @@ class JobApplicationRead(BaseModel):
     last_email_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
-    emails: list[EmailReferenceRead] = []
+    email_count: int = 0
+
 
-    @computed_field  # type: ignore[prop-decorator]
-    @property
-    def email_count(self) -> int:
-        return len(self.emails)
+class JobApplicationRead(JobApplicationSummary):
+    emails: list[EmailReferenceRead] = []
 
 
 class JobApplicationPage(BaseModel):
-    total: int
-    items: list[JobApplicationRead]
+    total: Optional[int] = None  # null on ?cursor= pages; the first page reports it
+    # JobApplicationRead (with emails) only for ?include=emails.
+    items: list[JobApplicationRead | JobApplicationSummary]
+    next_cursor: Optional[str] = None  # pass as ?cursor= to fetch the next page
 
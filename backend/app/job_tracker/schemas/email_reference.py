@@ -18,5 +18,6 @@ class EmailReferenceRead(BaseModel):
 
 
 class EmailReferencePage(BaseModel):
-    total: int
+    total: Optional[int] = None  # null on ?cursor= pages; the first page reports it
     items: list[EmailReferenceRead]
+    next_cursor: Optional[str] = None  # pass as ?cursor= to fetch the next page
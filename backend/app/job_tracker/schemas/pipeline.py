@@ -25,9 +25,10 @@ class PipelineCardRead(BaseModel):
 class PipelineColumnPage(BaseModel):
     """Paginated response for a single pipeline column (status)."""
     status: ApplicationStatus
-    total: int
+    total: Optional[int] = None  # null on ?cursor= pages; the first page reports it
     page: int
     page_size: int
     has_next: bool
+    next_cursor: Optional[str] = None  # pass as ?cursor= to fetch the next page
     items: list[PipelineCardRead]
 
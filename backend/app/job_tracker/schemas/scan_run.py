@@ -14,4 +14,5 @@ class ScanRunRead(BaseModel):
     emails_fetched: Optional[int] = None
     emails_inserted: Optional[int] = None
     apps_created: Optional[int] = None
+    fetches_avoided: Optional[int] = None
     error: Optional[str] = None
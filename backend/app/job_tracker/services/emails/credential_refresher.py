@@ -0,0 +1,34 @@
+"""Background Gmail credential refresh.
+
+Started from the FastAPI lifespan when GMAIL_TOKEN_FILE is set. Keeps the
+shared Gmail client's OAuth token loaded and refreshed ahead of expiry, so
+manual scans and auto-scans never refresh the token on their hot path.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def run_credential_refresh_loop(interval_seconds: float, margin_seconds: float) -> None:
+    """Refresh the token when it expires within margin_seconds; check every interval_seconds."""
+    from app.config import get_settings
+    from app.job_tracker.api.deps import make_gmail_client
+
+    logger.info(
+        "Gmail credential refresh enabled: every %.0fs, %.0fs before expiry",
+        interval_seconds,
+        margin_seconds,
+    )
+    while True:
+        try:
+            client = make_gmail_client(get_settings())
+            expiry = await asyncio.to_thread(client.refresh_credentials, margin_seconds)
+            logger.debug("Gmail credentials valid until %s", expiry)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Background Gmail credential refresh failed; will retry", exc_info=True)
+
+        await asyncio.sleep(interval_seconds)
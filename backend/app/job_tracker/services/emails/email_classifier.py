@@ -0,0 +1,164 @@
+"""
+CPU-bound scan classification: keyword filtering, application parsing,
+status inference and matching.
+
+These are pure regex work over plain dicts and tuples, so with
+SCAN_CLASSIFY_PROCESSES > 0 classify() runs them in a process pool: a large
+scan then neither blocks the event loop (and every other API request) while
+it classifies nor is limited to one core. Workers return compact results
+(indices, ids, parsed dicts) that the async layer applies to the database.
+With SCAN_CLASSIFY_PROCESSES = 0, or for small batches, they run inline on
+the calling thread.
+"""
+import asyncio
+import functools
+import hashlib
+import logging
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+from app.config import get_settings
+from app.job_tracker.models.email_reference import EmailReference
+from app.job_tracker.models.job_application import ApplicationStatus
+from app.job_tracker.repositories.job_application_repository import ApplicationMatchRow
+from app.job_tracker.services.emails.email_matcher import MatcherIndex, matches_job_keywords
+from app.job_tracker.services.emails.email_parser import infer_status, parse_application_with_pattern
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Upper bound on items per worker task, so one task's pickled payload stays small.
+_CLASSIFY_CHUNK_SIZE = 2000
+# Below this many items in a stage classify() runs inline even with a pool: a
+# small incremental scan classifies in a few milliseconds, less than the
+# pickling and IPC round trips (or the worker spawn, on first use) would cost.
+# A stage fed in batches (the streamed keyword filter) is measured as a whole.
+_CLASSIFY_MIN_ITEMS = 500
+
+_EMAIL_FIELDS = ("subject", "snippet", "body_text", "sender", "received_at")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: forking a process that runs an event loop
+                # and I/O threads can copy a held lock into the child.
+                _pool = ProcessPoolExecutor(
+                    max_workers=get_settings().SCAN_CLASSIFY_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def shutdown_classify_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+async def classify(fn: Callable[..., list], items: list, *args, total_items: Optional[int] = None) -> list:
+    """Return fn(items, *args), computed in the process pool when one is configured.
+
+    fn must be a module-level function returning one result per item; items
+    are split into chunks that run on the pool's workers concurrently and
+    the results are concatenated in order. When items is one batch of a
+    larger stage, total_items is the stage's size. Stages of fewer than
+    _CLASSIFY_MIN_ITEMS items run inline.
+    """
+    processes = get_settings().SCAN_CLASSIFY_PROCESSES
+    stage_size = len(items) if total_items is None else total_items
+    if processes <= 0 or not items or stage_size < _CLASSIFY_MIN_ITEMS:
+        return fn(items, *args)
+
+    size = min(_CLASSIFY_CHUNK_SIZE, -(-len(items) // processes))
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    chunks = await asyncio.gather(*(
+        loop.run_in_executor(pool, functools.partial(fn, items[start : start + size], *args))
+        for start in range(0, len(items), size)
+    ))
+    return [result for chunk in chunks for result in chunk]
+
+
+def email_fields(email: EmailReference) -> dict:
+    """The EmailReference fields classification reads, as a picklable dict."""
+    return {field: getattr(email, field, None) for field in _EMAIL_FIELDS}
+
+
+def match_row_fields(application: ApplicationMatchRow) -> tuple:
+    """An ApplicationMatchRow as a picklable tuple (its constructor arguments)."""
+    return (application.id, application.company_name, application.role_title, application.status)
+
+
+class ApplicationSnapshot:
+    """The applications of one matching stage, pickled once for every chunk.
+
+    classify() ships the same bytes with each match_emails chunk instead of
+    re-pickling the application list, and key (a digest of those bytes) lets
+    each worker reuse the MatcherIndex it built for an earlier chunk or scan.
+    Statuses are those at the time of the snapshot; the matcher does not see
+    status changes the stage's own emails go on to cause.
+    """
+
+    __slots__ = ("data", "key")
+
+    def __init__(self, applications: list[ApplicationMatchRow]):
+        self.data = pickle.dumps([match_row_fields(app) for app in applications])
+        self.key = hashlib.sha256(self.data).hexdigest()
+
+
+# MatcherIndex of the last ApplicationSnapshot this process matched against.
+_matcher_cache: Optional[tuple[str, MatcherIndex]] = None
+
+
+def _snapshot_matcher(applications: ApplicationSnapshot) -> MatcherIndex:
+    global _matcher_cache
+    if _matcher_cache is None or _matcher_cache[0] != applications.key:
+        rows = [ApplicationMatchRow(*fields) for fields in pickle.loads(applications.data)]
+        _matcher_cache = (applications.key, MatcherIndex(rows))
+    return _matcher_cache[1]
+
+
+def email_status_signal(email) -> ApplicationStatus:
+    """The status signal of a linked email's subject, snippet and body."""
+    return infer_status(" ".join(filter(None, [email.subject, email.snippet, getattr(email, "body_text", None)])))
+
+
+# ── Worker functions: one result per item ─────────────────────────────────────
+
+
+def filter_job_messages(messages: list[dict]) -> list[bool]:
+    """Whether each fetched message passes the job keyword filter."""
+    return [matches_job_keywords(msg.get("subject"), msg.get("snippet"), msg.get("body_text")) for msg in messages]
+
+
+def match_emails(
+    emails: list[dict],
+    applications: ApplicationSnapshot,
+) -> list[Optional[tuple[int, ApplicationStatus]]]:
+    """(application id, inferred status) of each email's match, or None.
+
+    The matcher sees the applications' statuses as they were when the
+    snapshot was taken; the caller folds the inferred statuses in order.
+    """
+    matcher = _snapshot_matcher(applications)
+    results = []
+    for fields in emails:
+        email = SimpleNamespace(**fields)
+        best = matcher.match(email)
+        results.append((best.id, email_status_signal(email)) if best is not None else None)
+    return results
+
+
+def parse_emails(emails: list[dict]) -> list[Optional[tuple[dict, int]]]:
+    """parse_application_with_pattern of each email."""
+    return [parse_application_with_pattern(SimpleNamespace(**fields)) for fields in emails]
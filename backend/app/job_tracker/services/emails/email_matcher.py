@@ -1,33 +1,36 @@
 import re
 from typing import Optional
 
+# Stamped on unlinked emails once a scan has evaluated them (see
+# EmailReference.matcher_version); scans only re-evaluate emails with an older
+# stamp. Bump whenever matching or application-parsing rules change so the
+# whole unlinked backlog is evaluated again.
+MATCHER_VERSION = 1
+
 # Keywords that must match at word boundaries to avoid substring false positives
 # (e.g. "hr" must not match "through", "Thursday").
-_WORD_BOUNDARY_KEYWORDS: list[re.Pattern] = [
-    re.compile(r"\b" + re.escape(kw) + r"\b", re.IGNORECASE)
-    for kw in [
-        "interview",
-        "application",
-        "applied",
-        "recruiter",
-        "recruiting",
-        "hr",
-        "human resources",
-        "job offer",
-        "offer letter",
-        "unfortunately",
-        "regret to inform",
-        "pleased to inform",
-        "moving forward",
-        "next steps",
-        "hiring",
-        "position",
-        "candidate",
-        "background check",
-        "onboarding",
-        "start date",
-        "thank you for applying",
-    ]
+_JOB_KEYWORDS: list[str] = [
+    "interview",
+    "application",
+    "applied",
+    "recruiter",
+    "recruiting",
+    "hr",
+    "human resources",
+    "job offer",
+    "offer letter",
+    "unfortunately",
+    "regret to inform",
+    "pleased to inform",
+    "moving forward",
+    "next steps",
+    "hiring",
+    "position",
+    "candidate",
+    "background check",
+    "onboarding",
+    "start date",
+    "thank you for applying",
 ]
 
 _EXCLUDE_PHRASES: list[str] = [
@@ -83,6 +86,39 @@ _GENERIC_EMAIL_DOMAINS: frozenset[str] = frozenset([
 ])
 
 
+# Both lists compiled into one alternation, exclusion phrases first so that an
+# exclusion starting at the same position as a keyword wins. Exclusions match
+# anywhere (plain substring semantics); keywords need a word boundary on each
+# side — the trailing one is in the pattern, the leading one is checked in
+# _scan_keywords because a leading \b would stop the regex engine from
+# skipping ahead on the alternation's first characters. Callers lowercase the
+# text, so no IGNORECASE is needed.
+_EXCLUDE_RE = re.compile("|".join(re.escape(phrase) for phrase in _EXCLUDE_PHRASES))
+_KEYWORD_SCAN_RE = re.compile(
+    "(" + _EXCLUDE_RE.pattern + ")|(?:" + "|".join(re.escape(kw) for kw in _JOB_KEYWORDS) + r")\b"
+)
+
+
+def _scan_keywords(haystack: str) -> Optional[bool]:
+    """Scan lowercased text once for exclusion phrases and job keywords.
+
+    Returns False if any exclusion phrase occurs, True if a keyword occurs
+    and no exclusion phrase does, and None if neither occurs.
+    """
+    match = _KEYWORD_SCAN_RE.search(haystack)
+    while match is not None:
+        if match.lastindex == 1:
+            return False
+        pos = match.start()
+        prev = haystack[pos - 1] if pos else " "
+        if not (prev.isalnum() or prev == "_"):
+            # Nothing before pos matched, so only the rest can still hold an exclusion.
+            return _EXCLUDE_RE.search(haystack, pos + 1) is None
+        # Restart one character on, not at match.end(): terms can overlap.
+        match = _KEYWORD_SCAN_RE.search(haystack, pos + 1)
+    return None
+
+
 def matches_job_keywords(
     subject: str | None,
     snippet: str | None,
@@ -94,9 +130,27 @@ def matches_job_keywords(
         if domain and normalize_domain(domain) in _EXCLUDE_SENDER_DOMAINS:
             return False
     haystack = " ".join(filter(None, [subject, snippet, body_text])).lower()
-    if any(phrase in haystack for phrase in _EXCLUDE_PHRASES):
-        return False
-    return any(pat.search(haystack) for pat in _WORD_BOUNDARY_KEYWORDS)
+    return bool(_scan_keywords(haystack))
+
+
+# Gmail cuts message snippets at roughly 200 characters. A snippet clearly
+# shorter than that already holds the whole body text, so the body cannot add
+# a keyword the snippet lacks.
+_COMPLETE_SNIPPET_MAX_CHARS = 100
+
+
+def may_match_job_keywords(subject: str | None, snippet: str | None) -> bool:
+    """Decide from message metadata whether the full body is worth fetching.
+
+    Returns False only when fetching the body cannot make matches_job_keywords
+    pass: an exclusion phrase already appears in the subject/snippet, or no
+    keyword matched and the snippet is short enough to be the entire body.
+    """
+    haystack = " ".join(filter(None, [subject, snippet])).lower()
+    found = _scan_keywords(haystack)
+    if found is not None:
+        return found
+    return len(snippet or "") >= _COMPLETE_SNIPPET_MAX_CHARS
 
 
 _STRIP_WORDS = {
@@ -195,61 +249,153 @@ def match_application_by_domain(
     return newest if len(ties) == 1 else None
 
 
-def match_email_to_application(email_reference, applications: list) -> Optional[object]:
-    """Try to match an EmailReference to an existing JobApplication.
-
-    Priority:
-    1. Strong company-name / role-name text match (score >= 5).
-    2. Domain match with a non-generic sender domain.
-    """
-    if not applications:
-        return None
+class _IndexedApplication:
+    """Per-application matching data, computed once when the index is built."""
 
-    subject = email_reference.subject or ""
-    sender = email_reference.sender or ""
-    haystack = f"{subject} {sender}".lower()
+    __slots__ = ("app", "order", "company_re", "role_re", "company_kw", "role_kw")
 
-    best_match = None
-    best_score = 0
-
-    for app in applications:
+    def __init__(self, app, order: int):
         company_lower = app.company_name.lower()
         role_lower = (app.role_title or "").lower()
-
+        self.app = app
+        self.order = order
         # Word-boundary match, not a bare substring check: a short company
         # name like "Co" would otherwise match inside the ".com"/".co.il" TLD
         # of virtually every sender address, auto-linking unrelated emails.
+        self.company_re = re.compile(r"\b" + re.escape(company_lower) + r"\b")
+        self.role_re = re.compile(r"\b" + re.escape(role_lower) + r"\b") if role_lower else None
+        self.company_kw = _extract_keywords(company_lower)
+        self.role_kw = _extract_keywords(role_lower) if role_lower else set()
+
+    def score(self, haystack: str, hay_kw: set[str]) -> int:
         company_score = 0
-        if re.search(r"\b" + re.escape(company_lower) + r"\b", haystack):
+        if self.company_re.search(haystack):
             company_score += 10
+        company_score += len(hay_kw & self.company_kw) * 3
+
+        # Role title alone is not trustworthy: generic titles ("Full Stack
+        # Engineer", "Account Executive") appear in countless unrelated
+        # postings/notifications from other companies. Only count role
+        # evidence when there's at least some company-name evidence too.
+        if company_score == 0:
+            return 0
 
         role_score = 0
-        if role_lower and re.search(r"\b" + re.escape(role_lower) + r"\b", haystack):
+        if self.role_re is not None and self.role_re.search(haystack):
             role_score += 8
+        role_score += len(hay_kw & self.role_kw) * 2
+        return company_score + role_score
+
+
+# match_application_by_domain only accepts a company name that starts with a
+# brand of at least this many characters, so its candidates always share the
+# company name's first _BRAND_PREFIX_LEN characters.
+_BRAND_PREFIX_LEN = 4
+
 
+def match_terms(company_name: str) -> set[str]:
+    """Lowercased substrings, one of which is in the subject or sender of every
+    email MatcherIndex can link to an application with this company name.
+
+    A text-score match needs a company keyword (or, for a name without any,
+    the whole name) in the email; a domain match needs the company name's
+    leading brand in the sender. Lets a database query narrow the emails worth
+    matching against a few applications.
+    """
+    company_lower = company_name.lower()
+    terms = _extract_keywords(company_lower) or {company_lower}
+    if len(company_lower) >= _BRAND_PREFIX_LEN:
+        terms.add(company_lower[:_BRAND_PREFIX_LEN])
+    return terms
+
+
+class MatcherIndex:
+    """Email-to-application matcher over a fixed set of applications.
+
+    Built once per scan stage instead of rescanning every application for
+    every email. Company keywords are indexed to the applications they occur
+    in: a company word-boundary match implies all of the company's keywords
+    appear in the email, so any application that can score above zero either
+    shares a keyword with the email or has no company keywords at all (e.g.
+    "HP"). Only those candidates are scored, in the original list order, so
+    results and tie-breaking are identical to a linear scan. The domain
+    fallback looks up applications by the first characters of their company
+    name.
+    """
+
+    def __init__(self, applications: list):
+        self._entries: list[_IndexedApplication] = []
+        self._by_company_keyword: dict[str, list[_IndexedApplication]] = {}
+        self._without_company_keywords: list[_IndexedApplication] = []
+        self._by_brand_prefix: dict[str, list] = {}
+        for app in applications:
+            self.add(app)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, app) -> None:
+        """Index an application, e.g. one created mid-scan."""
+        entry = _IndexedApplication(app, len(self._entries))
+        self._entries.append(entry)
+        if entry.company_kw:
+            for kw in entry.company_kw:
+                self._by_company_keyword.setdefault(kw, []).append(entry)
+        else:
+            self._without_company_keywords.append(entry)
+        prefix = app.company_name.lower()[:_BRAND_PREFIX_LEN]
+        self._by_brand_prefix.setdefault(prefix, []).append(app)
+
+    def _candidates(self, hay_kw: set[str]) -> list[_IndexedApplication]:
+        found: dict[int, _IndexedApplication] = {
+            entry.order: entry for entry in self._without_company_keywords
+        }
+        for kw in hay_kw:
+            for entry in self._by_company_keyword.get(kw, ()):
+                found[entry.order] = entry
+        return [found[order] for order in sorted(found)]
+
+    def match(self, email_reference) -> Optional[object]:
+        """Match an EmailReference; see match_email_to_application."""
+        if not self._entries:
+            return None
+
+        subject = email_reference.subject or ""
+        sender = email_reference.sender or ""
+        haystack = f"{subject} {sender}".lower()
         hay_kw = _extract_keywords(haystack)
-        company_kw = _extract_keywords(company_lower)
-        role_kw = _extract_keywords(role_lower) if role_lower else set()
 
-        company_score += len(hay_kw & company_kw) * 3
-        role_score += len(hay_kw & role_kw) * 2
+        best_match = None
+        best_score = 0
+        for entry in self._candidates(hay_kw):
+            score = entry.score(haystack, hay_kw)
+            if score > best_score:
+                best_score = score
+                best_match = entry.app
 
-        # Role title alone is not trustworthy: generic titles ("Full Stack
-        # Engineer", "Account Executive") appear in countless unrelated
-        # postings/notifications from other companies. Only count role
-        # evidence when there's at least some company-name evidence too.
-        score = company_score + role_score if company_score > 0 else 0
+        if best_score >= 5:
+            return best_match
 
-        if score > best_score:
-            best_score = score
-            best_match = app
+        # Fallback: domain-based match
+        domain = extract_email_domain(sender)
+        if domain and not is_generic_email_domain(domain):
+            brand = normalize_domain(domain).split(".")[0]
+            bucket = self._by_brand_prefix.get(brand[:_BRAND_PREFIX_LEN], [])
+            return match_application_by_domain(domain, bucket)
 
-    if best_score >= 5:
-        return best_match
+        return None
 
-    # Fallback: domain-based match
-    domain = extract_email_domain(sender)
-    if domain and not is_generic_email_domain(domain):
-        return match_application_by_domain(domain, applications)
 
-    return None
+def match_email_to_application(email_reference, applications: list) -> Optional[object]:
+    """Try to match an EmailReference to an existing JobApplication.
+
+    Priority:
+    1. Strong company-name / role-name text match (score >= 5).
+    2. Domain match with a non-generic sender domain.
+
+    Matching many emails against the same applications should build one
+    MatcherIndex and call its match() instead.
+    """
+    if not applications:
+        return None
+    return MatcherIndex(applications).match(email_reference)
@@ -1,6 +1,6 @@
 import logging
 import re
-from typing import Optional
+from typing import Iterator, Optional
 
 from app.job_tracker.models.email_reference import EmailReference
 from app.job_tracker.models.job_application import ApplicationStatus
@@ -32,86 +32,160 @@ def _is_ats_company_name(name: str) -> bool:
     return name.lower().strip() in _ATS_COMPANY_NAMES
 
 
-_APPLICATION_SUBJECT_PATTERNS = [
-    re.compile(
-        r"(?:your\s+)?application\s+(?:to|for)\s+(?P<role>.+?)\s+at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+class _SubjectPattern:
+    """An application subject pattern plus the literal anchors it needs.
+
+    Every match of regex contains at least one of anchors (case-insensitively),
+    so the regex only runs on text that contains an anchor.
+    """
+
+    __slots__ = ("anchors", "regex")
+
+    def __init__(self, anchors: tuple[str, ...], regex: re.Pattern):
+        self.anchors = anchors
+        self.regex = regex
+
+
+_APPLICATION_SUBJECT_PATTERNS: list[_SubjectPattern] = [
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"(?:your\s+)?application\s+(?:to|for)\s+(?P<role>.+?)\s+at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"(?:thank(?:s|\s+you)\s+for\s+apply(?:ing)?(?:\s+for)?)\s+(?:the\s+)?(?P<role>.+?)\s+(?:position\s+)?at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("apply",),
+        re.compile(
+            r"(?:thank(?:s|\s+you)\s+for\s+apply(?:ing)?(?:\s+for)?)\s+(?:the\s+)?(?P<role>.+?)\s+(?:position\s+)?at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"thank(?:s|\s+you)\s+for\s+applying\s+to\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("applying",),
+        re.compile(
+            r"thank(?:s|\s+you)\s+for\s+applying\s+to\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"thanks?\s+for\s+applying\s+to\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("applying",),
+        re.compile(
+            r"thanks?\s+for\s+applying\s+to\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"application\s+was\s+sent\s+to\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*\([^)]*\))?(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"application\s+was\s+sent\s+to\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*\([^)]*\))?(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"application\s+was\s+viewed\s+by\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"application\s+was\s+viewed\s+by\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"application\s+update\s+from\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"application\s+update\s+from\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"(?:re:\s*)?(?:your\s+)?application\s+to\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"(?:re:\s*)?(?:your\s+)?application\s+to\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"^(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]{1,50}?)\s*[\-–—]\s*thank\s+you\s+for\s+your\s+application\s*[\-–—]\s*(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"^(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]{1,50}?)\s*[\-–—]\s*thank\s+you\s+for\s+your\s+application\s*[\-–—]\s*(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"(?:we\s+got\s+it[:\s]+)?thanks?\s+for\s+applying\s+for\s+(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("applying",),
+        re.compile(
+            r"(?:we\s+got\s+it[:\s]+)?thanks?\s+for\s+applying\s+for\s+(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]{2,60}?)\s+opportunity\s+at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("opportunity",),
+        re.compile(
+            r"(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]{2,60}?)\s+opportunity\s+at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"(?:your\s+)?application\s*[\-–—]\s*(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]{3,80}?)(?:\s*[\-–—]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"(?:your\s+)?application\s*[\-–—]\s*(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]{3,80}?)(?:\s*[\-–—]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"interest\s+in\s+joining\s+(?:us\s+)?at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("joining",),
+        re.compile(
+            r"interest\s+in\s+joining\s+(?:us\s+)?at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"(?:your\s+)?application\s+for\s+(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]+?)(?:\s+has\s+been|\s+was|\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"(?:your\s+)?application\s+for\s+(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]+?)(?:\s+has\s+been|\s+was|\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"(?:we\s+)?received\s+your\s+application\s+(?:for\s+(?P<role>.+?)\s+)?at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"(?:we\s+)?received\s+your\s+application\s+(?:for\s+(?P<role>.+?)\s+)?at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"next\s+steps?\s+for\s+your\s+(?:job\s+)?application[:\s]+(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]+?)\s+at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"next\s+steps?\s+for\s+your\s+(?:job\s+)?application[:\s]+(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]+?)\s+at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"next\s+steps?\s+(?:for\s+your\s+(?:application|candidacy)\s+)?at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("next",),
+        re.compile(
+            r"next\s+steps?\s+(?:for\s+your\s+(?:application|candidacy)\s+)?at\s+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"interview\s+invitation[\s\-–—]+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("interview",),
+        re.compile(
+            r"interview\s+invitation[\s\-–—]+(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)(?:\s*[|,!]|$)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"^(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)\s*[\-–—]+\s*(?:interview|phone\s+screen|technical\s+screen)",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("interview", "screen"),
+        re.compile(
+            r"^(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]+?)\s*[\-–—]+\s*(?:interview|phone\s+screen|technical\s+screen)",
+            re.IGNORECASE,
+        ),
     ),
-    re.compile(
-        r"^(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]{2,40})\s*[\-–—:]\s*(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]{2,80})\s*[\-–—]\s*application",
-        re.IGNORECASE,
+    _SubjectPattern(
+        ("application",),
+        re.compile(
+            r"^(?P<company>[A-Za-z0-9][A-Za-z0-9\s&.,'\-]{2,40})\s*[\-–—:]\s*(?P<role>[A-Za-z0-9][A-Za-z0-9\s&.,'\-/]{2,80})\s*[\-–—]\s*application",
+            re.IGNORECASE,
+        ),
     ),
 ]
 
@@ -191,12 +265,40 @@ def infer_status(text: str) -> ApplicationStatus:
     return ApplicationStatus.APPLIED
 
 
+# Characters that re.IGNORECASE treats as equal to an ASCII anchor letter but
+# that str.lower() leaves different.
+_ANCHOR_CASE_FOLD = str.maketrans({"ı": "i", "İ": "i", "ſ": "s"})
+_ALL_ANCHORS: frozenset[str] = frozenset(
+    anchor for pattern in _APPLICATION_SUBJECT_PATTERNS for anchor in pattern.anchors
+)
+
+
+def _candidate_patterns(text: str) -> Iterator[tuple[int, _SubjectPattern]]:
+    """Yield (index, pattern) for the patterns whose anchors occur in text, in order."""
+    folded = text.lower() if text.isascii() else text.translate(_ANCHOR_CASE_FOLD).lower()
+    present = {anchor for anchor in _ALL_ANCHORS if anchor in folded}
+    if not present:
+        return
+    for index, pattern in enumerate(_APPLICATION_SUBJECT_PATTERNS):
+        if not present.isdisjoint(pattern.anchors):
+            yield index, pattern
+
+
 def parse_application_from_email(email: EmailReference) -> Optional[dict]:
     """
     Try to extract company_name + role_title from an email subject/body.
     Returns a dict suitable for JobApplicationRepository.create(), or None.
     Returns None, rather than "Unknown Company", when company cannot be identified.
     """
+    result = parse_application_with_pattern(email)
+    return result[0] if result else None
+
+
+def parse_application_with_pattern(email: EmailReference) -> Optional[tuple[dict, int]]:
+    """
+    Like parse_application_from_email, but also return the index into
+    _APPLICATION_SUBJECT_PATTERNS of the pattern that produced the result.
+    """
     subject = email.subject or ""
     snippet = email.snippet or ""
     _raw_body = getattr(email, "body_text", None)
@@ -206,8 +308,8 @@ def parse_application_from_email(email: EmailReference) -> Optional[dict]:
     search_texts = [t for t in (subject, snippet, body_text) if t]
 
     for search_text in search_texts:
-        for pattern in _APPLICATION_SUBJECT_PATTERNS:
-            m = pattern.search(search_text)
+        for index, pattern in _candidate_patterns(search_text):
+            m = pattern.regex.search(search_text)
             if not m:
                 continue
             groups = m.groupdict()
@@ -239,23 +341,57 @@ def parse_application_from_email(email: EmailReference) -> Optional[dict]:
                 )
                 continue
 
-            return {
+            parsed = {
                 "company_name": company,
                 "role_title": role or None,
                 "status": infer_status(haystack),
                 "source": "Gmail",
                 "applied_at": email.received_at,
             }
+            return parsed, index
 
     return None
 
 
+class ApplicationEmailParser:
+    """Memoizes parse_application_with_pattern per email for the length of a scan.
+
+    The auto-create stage parses every unlinked email in a peek pass and again
+    in its main loop; with one parser per stage each email is parsed once.
+    Callers get a copy of the parsed dict, so they may modify it.
+    """
+
+    def __init__(self):
+        # id(email) -> (email, result); holding the email keeps its id from being reused.
+        self._results: dict[int, tuple[EmailReference, Optional[tuple[dict, int]]]] = {}
+
+    def _result(self, email: EmailReference) -> Optional[tuple[dict, int]]:
+        cached = self._results.get(id(email))
+        if cached is None:
+            cached = (email, parse_application_with_pattern(email))
+            self._results[id(email)] = cached
+        return cached[1]
+
+    def store(self, email: EmailReference, result: Optional[tuple[dict, int]]) -> None:
+        """Memoize a result computed elsewhere (e.g. by email_classifier.parse_emails)."""
+        self._results[id(email)] = (email, result)
+
+    def parse(self, email: EmailReference) -> Optional[dict]:
+        result = self._result(email)
+        return dict(result[0]) if result else None
+
+    def pattern_index(self, email: EmailReference) -> Optional[int]:
+        """Index into _APPLICATION_SUBJECT_PATTERNS of the pattern that parsed email, if any."""
+        result = self._result(email)
+        return result[1] if result else None
+
+
 def extract_role_from_subjects(subjects: list[str | None]) -> str | None:
     for subject in subjects:
         if not subject:
             continue
-        for pattern in _APPLICATION_SUBJECT_PATTERNS:
-            m = pattern.search(subject)
+        for _, pattern in _candidate_patterns(subject):
+            m = pattern.regex.search(subject)
             if m:
                 role = m.groupdict().get("role", "").strip().rstrip(".,!")
                 if role:
@@ -1,32 +1,54 @@
 import asyncio
+import functools
+import inspect
 import logging
 import threading
 from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
 
-from app.job_tracker.email_scanner.gmail_client import GmailClient
+from app.config import get_settings
+from app.job_tracker.email_scanner.gmail_client import GmailClientBase
 from app.job_tracker.models.email_reference import EmailReference
-from app.job_tracker.models.job_application import JobApplication
+from app.job_tracker.models.job_application import ApplicationStatus
 from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
-from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+from app.job_tracker.repositories.job_application_repository import (
+    ApplicationMatchRow,
+    EmailActivityBatch,
+    JobApplicationRepository,
+)
 from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+from app.job_tracker.services.emails.email_classifier import (
+    ApplicationSnapshot,
+    classify,
+    email_fields,
+    email_status_signal,
+    filter_job_messages,
+    match_emails,
+    parse_emails,
+)
 from app.job_tracker.services.emails.email_matcher import (
-    match_email_to_application,
-    matches_job_keywords,
+    MATCHER_VERSION,
+    MatcherIndex,
+    match_terms,
+    may_match_job_keywords,
 )
 from app.job_tracker.services.emails.email_parser import (
-    extract_sender_domain,
+    ApplicationEmailParser,
     extract_role_from_subjects,
-    infer_status,
-    parse_application_from_email,
 )
-from app.job_tracker.models.job_application import ApplicationStatus
 
 logger = logging.getLogger(__name__)
 
 _executor: Optional[ThreadPoolExecutor] = None
 _executor_lock = threading.Lock()
 SCAN_RUN_ERROR_MESSAGE = "Scan failed. Check server logs."
+# Matched emails buffered per COPY in backfill mode.
+_BACKFILL_COPY_BATCH_SIZE = 5000
+
+
+def _dedup_key(parsed: dict) -> tuple[str, str]:
+    """The auto-create dedup key of a parsed application; see ApplicationMatchRow.dedup_key."""
+    return (parsed["company_name"].lower(), (parsed["role_title"] or "").lower())
 
 
 def _get_executor() -> ThreadPoolExecutor:
@@ -34,7 +56,6 @@ def _get_executor() -> ThreadPoolExecutor:
     if _executor is None or _executor._shutdown:
         with _executor_lock:
             if _executor is None or _executor._shutdown:
-                from app.config import get_settings
                 _executor = ThreadPoolExecutor(
                     max_workers=get_settings().SCAN_EXECUTOR_MAX_WORKERS,
                     thread_name_prefix="gmail-scan",
@@ -50,25 +71,57 @@ def shutdown_executor() -> None:
             _executor = None
 
 
+def _may_be_job_email(message: dict) -> bool:
+    """Metadata-phase filter: keep messages whose body could still pass the keyword filter."""
+    return may_match_job_keywords(message.get("subject"), message.get("snippet"))
+
+
+async def reopen_matching_backlog(
+    repo: EmailReferenceRepository, applications: list[ApplicationMatchRow]
+) -> int:
+    """Make already evaluated unlinked emails that applications can match due again.
+
+    For applications just created or whose matched fields changed: the next
+    scan then re-evaluates that mail against every application, while the
+    rest of the evaluated backlog keeps its stamp. The database narrows the
+    backlog with match_terms; a MatcherIndex over just these applications
+    decides. Returns the number of emails made due; the caller commits.
+    """
+    terms = set().union(*(match_terms(app.company_name) for app in applications))
+    if not terms:
+        return 0
+    matcher = MatcherIndex(applications)
+    evaluated = await repo.list_evaluated_unlinked(MATCHER_VERSION, containing=terms)
+    due = [email.id for email in evaluated if matcher.match(email) is not None]
+    await repo.mark_matched(due, None)
+    return len(due)
+
+
 class EmailScanService:
     def __init__(
         self,
-        gmail_client: Optional[GmailClient],
+        gmail_client: Optional[GmailClientBase],
         repo: EmailReferenceRepository,
         app_repo: Optional[JobApplicationRepository] = None,
         scan_run_repo: Optional[ScanRunRepository] = None,
+        backfill: bool = False,
     ):
+        """backfill=True imports a whole mailbox window: it ignores the stored
+        history ID and saves matched emails in large COPY batches
+        (EmailReferenceRepository.copy_create) instead of per fetched batch."""
         self.gmail_client = gmail_client
         self.repo = repo
         self.app_repo = app_repo
         self.scan_run_repo = scan_run_repo
+        self.backfill = backfill
 
     async def scan_for_applications(
         self,
         on_progress: Optional[Callable[[str, str], None]] = None,
     ) -> dict:
         """
-        Returns {"inserted": int, "applications_created": int}.
+        Returns {"inserted": int, "applications_created": int, "fetches_avoided": int,
+        "fetch_stats": dict}.
         Calls on_progress(stage, detail) at key steps if provided.
         """
         scan_run_id: Optional[int] = None
@@ -91,33 +144,39 @@ class EmailScanService:
 
         try:
             emit("fetching", "Connecting to Gmail…")
-            loop = asyncio.get_running_loop()
-            fetched_messages = await loop.run_in_executor(_get_executor(), self.gmail_client.fetch_recent_messages)
-            emit("fetching", f"Fetched {len(fetched_messages)} emails from Gmail")
-
-            emit("filtering", "Filtering for job-related emails…")
-            matched = [
-                msg for msg in fetched_messages
-                if matches_job_keywords(msg.get("subject"), msg.get("snippet"), msg.get("body_text"))
-            ]
-            emit("filtering", f"Found {len(matched)} job-related emails")
-
-            emit("saving", f"Saving {len(matched)} emails to database…")
-            inserted, skipped = await self._bulk_insert(matched)
+            start_history_id = await self._get_start_history_id()
+            listed_ids = await self._call_gmail(self.gmail_client.list_message_ids, start_history_id)
+            # Only download payloads for mail we haven't stored yet: a repeat
+            # scan of the same window otherwise re-fetches (and spends quota on)
+            # messages bulk_create would just discard as duplicates.
+            known_ids = await self.repo.list_existing_message_ids(listed_ids)
+            new_ids = [mid for mid in listed_ids if mid not in known_ids]
+            fetches_avoided = len(listed_ids) - len(new_ids)
+            emit("fetching", f"Fetching {len(new_ids)} new emails from Gmail ({fetches_avoided} already saved)…")
+            fetched_count, matched_count, inserted, skipped = await self._stream_ingest(new_ids, emit)
+            emit("fetching", f"Fetched {fetched_count} emails from Gmail")
+            emit("filtering", f"Found {matched_count} job-related emails")
             emit("saving", f"Saved {inserted} new emails ({skipped} duplicates skipped)")
 
             applications_created = 0
             if self.app_repo is not None:
                 emit("matching", "Matching emails to existing applications…")
-                await self._match_unlinked_emails()
+                # Only emails no scan has evaluated with the current rules yet.
+                candidates = await self.repo.list_unlinked(stale_for_version=MATCHER_VERSION)
+                # One lightweight read of the applications serves both stages.
+                applications = await self.app_repo.list_match_rows() if candidates else []
+                still_unlinked = await self._match_unlinked_emails(candidates, applications)
                 emit("creating", "Auto-creating applications from email subjects…")
-                applications_created = await self._auto_create_applications()
+                created = await self._auto_create_applications(still_unlinked, applications)
+                await self._stamp_evaluated(candidates, created)
+                applications_created = len(created)
                 emit("creating", f"Created {applications_created} new applications")
 
             logger.info(
-                "Email scan completed: fetched=%s matched=%s inserted=%s skipped=%s apps_created=%s",
-                len(fetched_messages),
-                len(matched),
+                "Email scan completed: fetched=%s avoided=%s matched=%s inserted=%s skipped=%s apps_created=%s",
+                fetched_count,
+                fetches_avoided,
+                matched_count,
                 inserted,
                 skipped,
                 applications_created,
@@ -127,15 +186,22 @@ class EmailScanService:
                 try:
                     await self.scan_run_repo.complete(
                         scan_run_id,
-                        emails_fetched=len(fetched_messages),
+                        emails_fetched=fetched_count,
                         emails_inserted=inserted,
                         apps_created=applications_created,
+                        fetches_avoided=fetches_avoided,
+                        history_id=self._resume_history_id(),
                     )
                     await self.repo.session.commit()
                 except Exception:
                     logger.warning("Could not record scan run completion", exc_info=True)
 
-            return {"inserted": inserted, "applications_created": applications_created}
+            return {
+                "inserted": inserted,
+                "applications_created": applications_created,
+                "fetches_avoided": fetches_avoided,
+                "fetch_stats": self.gmail_client.fetch_stats(),
+            }
 
         except Exception as exc:
             if scan_run_id is not None and self.scan_run_repo is not None:
@@ -146,107 +212,342 @@ class EmailScanService:
                     logger.warning("Could not record scan run failure", exc_info=True)
             raise
 
+    async def _get_start_history_id(self) -> Optional[str]:
+        """Return the historyId to resume from, or None to list the full query window."""
+        if self.backfill or self.scan_run_repo is None or not get_settings().GMAIL_INCREMENTAL_SYNC:
+            return None
+        try:
+            return await self.scan_run_repo.get_last_history_id()
+        except Exception:
+            logger.warning("Could not load last scan history ID; running a full scan", exc_info=True)
+            return None
+
+    def _resume_history_id(self) -> Optional[str]:
+        """The historyId the next scan may resume from, or None to keep the previous one.
+
+        If the fetch gave up on listed messages that a later attempt could
+        still get (see GmailClientBase.has_gaps), resuming past this scan's
+        history would never list them again. Without a new history_id the
+        next scan resumes from the previous completed run instead (or lists
+        the full window). Messages deleted since they were listed do not hold
+        the checkpoint back: they would fail the same way on every scan.
+        """
+        if self.gmail_client.has_gaps:
+            logger.warning(
+                "Not saving Gmail history %s: some messages were not fetched (%s); "
+                "the next scan lists them again",
+                self.gmail_client.latest_history_id,
+                self.gmail_client.fetch_stats(),
+            )
+            return None
+        return self.gmail_client.latest_history_id
+
+    async def _call_gmail(self, method: Callable, *args):
+        """Await a Gmail client method: directly for the asyncio transport,
+        otherwise on the scan executor so blocking I/O stays off the loop."""
+        if inspect.iscoroutinefunction(method):
+            return await method(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(method, *args))
+
+    async def _stream_ingest(
+        self,
+        message_ids: list[str],
+        emit: Callable[[str, str], None],
+    ) -> tuple[int, int, int, int]:
+        """Fetch, filter and insert message_ids batch by batch.
+
+        A producer task dispatches batch-get chunks to the Gmail client, up
+        to GMAIL_FETCH_CONCURRENCY at a time, while this coroutine filters and
+        inserts whichever batch finished first. The bounded queue between them
+        applies backpressure, so memory stays at a few batches regardless of
+        GMAIL_MAX_MESSAGES.
+
+        Returns (fetched, matched, inserted, skipped).
+        """
+        settings = get_settings()
+        metadata_filter = _may_be_job_email if settings.GMAIL_TWO_PHASE_FETCH else None
+        queue: asyncio.Queue[Optional[list[dict]]] = asyncio.Queue(maxsize=settings.SCAN_PIPELINE_QUEUE_SIZE)
+        in_flight = asyncio.Semaphore(max(1, settings.GMAIL_FETCH_CONCURRENCY))
+
+        async def fetch_chunk(chunk: list[str]) -> None:
+            try:
+                batch = await self._call_gmail(self.gmail_client.fetch_batch, chunk, metadata_filter)
+                if batch:
+                    await queue.put(batch)
+            finally:
+                in_flight.release()
+
+        async def produce() -> None:
+            pending: set[asyncio.Task] = set()
+            try:
+                pos = 0
+                while pos < len(message_ids):
+                    await in_flight.acquire()
+                    # Stop dispatching as soon as an earlier chunk has failed.
+                    if any(t.done() and t.exception() is not None for t in pending):
+                        in_flight.release()
+                        break
+                    # Read the size per chunk: the client shrinks it under throttling.
+                    size = self.gmail_client.batch_size_hint
+                    chunk = message_ids[pos : pos + size]
+                    pos += size
+                    pending.add(asyncio.create_task(fetch_chunk(chunk)))
+                # Let chunks already in flight land so their messages still get saved.
+                results = await asyncio.gather(*pending, return_exceptions=True)
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+            except asyncio.CancelledError:
+                for task in pending:
+                    task.cancel()
+                raise
+            finally:
+                await queue.put(None)  # end of stream, also after a fetch error
+
+        producer = asyncio.create_task(produce(), name="gmail-batch-producer")
+        fetched = matched_total = inserted_total = skipped_total = 0
+        # Backfill mode saves matched emails in large COPY batches rather than per fetched batch.
+        pending: list[dict] = []
+        flush_size = _BACKFILL_COPY_BATCH_SIZE if self.backfill else 1
+        try:
+            while (batch := await queue.get()) is not None:
+                fetched += len(batch)
+                keep = await classify(filter_job_messages, batch, total_items=len(message_ids))
+                matched = [msg for msg, is_job in zip(batch, keep) if is_job]
+                matched_total += len(matched)
+                pending.extend(matched)
+                if len(pending) >= flush_size:
+                    inserted, skipped = await self._bulk_insert(pending)
+                    pending = []
+                    inserted_total += inserted
+                    skipped_total += skipped
+                emit("fetching", f"Fetched {fetched} of {len(message_ids)} emails, saved {inserted_total}")
+            # Also after a fetch error: whatever was fetched is still saved.
+            if pending:
+                inserted, skipped = await self._bulk_insert(pending)
+                inserted_total += inserted
+                skipped_total += skipped
+        finally:
+            if not producer.done():
+                producer.cancel()
+        # Re-raise a fetch error here; the consumer saw it only as end-of-stream.
+        await producer
+        return fetched, matched_total, inserted_total, skipped_total
+
     async def _bulk_insert(self, messages: list[dict]) -> tuple[int, int]:
-        created, duplicates = await self.repo.bulk_create(messages)
+        if self.backfill:
+            created, duplicates = await self.repo.copy_create(messages)
+        else:
+            created, duplicates = await self.repo.bulk_create(messages)
         await self.repo.session.commit()
         return created, duplicates
 
-    async def _apply_inferred_status(self, email: EmailReference, application: JobApplication) -> bool:
-        """Infer a status signal from an email and apply it to the linked application."""
-        haystack = " ".join(filter(None, [email.subject, email.snippet, getattr(email, "body_text", None)]))
-        inferred = infer_status(haystack)
-        return await self.app_repo.update_status_from_email(application, inferred)
-
-    async def _match_unlinked_emails(self) -> None:
-        """Link unlinked EmailReference rows to existing JobApplications via heuristic matcher."""
-        unlinked = await self.repo.list_unlinked()
-        if not unlinked:
-            return
-
-        applications = await self.app_repo.list_all()
-        if not applications:
-            return
-
+    @staticmethod
+    def _record_linked_email(
+        activity: EmailActivityBatch, email: EmailReference, application: ApplicationMatchRow
+    ) -> bool:
+        """Record a linked email's date and inferred status signal; True if the status changes."""
+        return activity.record(application, email.received_at, email_status_signal(email))
+
+    async def _match_unlinked_emails(
+        self, unlinked: list[EmailReference], applications: list[ApplicationMatchRow]
+    ) -> list[EmailReference]:
+        """Link unlinked EmailReference rows to existing JobApplications via heuristic matcher.
+
+        An email whose Gmail thread is already linked to one application
+        follows the thread without being matched. The rest go through the
+        matcher (run via classify()); a thread first linked in this stage
+        takes the application of its earliest matched message, so every
+        message in it ends up on the same application.
+
+        Every email is matched against the applications' statuses as of the
+        start of the stage; status changes this stage's emails cause are
+        applied afterwards. The domain fallback's preference for applications
+        that are not rejected therefore does not see a rejection recorded
+        earlier in the same stage, only from the next stage or scan on.
+        Returns the emails that are still unlinked.
+        """
+        if not unlinked or not applications:
+            return unlinked
+
+        by_id = {app.id: app for app in applications}
+        thread_links = await self.repo.map_thread_applications(
+            [email.gmail_thread_id for email in unlinked if email.gmail_thread_id]
+        )
+        to_match = [email for email in unlinked if thread_links.get(email.gmail_thread_id) not in by_id]
+        matches = await classify(
+            match_emails,
+            [email_fields(email) for email in to_match],
+            ApplicationSnapshot(applications),
+        )
+        matched: dict[int, tuple[int, ApplicationStatus]] = {
+            email.id: match for email, match in zip(to_match, matches) if match is not None
+        }
+        for email in sorted(to_match, key=lambda e: e.received_at):
+            if email.id in matched and email.gmail_thread_id:
+                thread_links.setdefault(email.gmail_thread_id, matched[email.id][0])
+
+        activity = EmailActivityBatch()
         linked_count = 0
+        thread_linked_count = 0
         status_updated_count = 0
         for email in unlinked:
-            best = match_email_to_application(email, applications)
-            if best is not None:
-                email.application_id = best.id
-                await self.app_repo.update_last_email_at(best.id, email.received_at)
-                linked_count += 1
-
-                if await self._apply_inferred_status(email, best):
-                    status_updated_count += 1
+            match = matched.get(email.id)
+            thread_app_id = thread_links.get(email.gmail_thread_id)
+            if thread_app_id in by_id:
+                app_id = thread_app_id
+                inferred_status = match[1] if match is not None else email_status_signal(email)
+                if match is None or match[0] != app_id:
+                    thread_linked_count += 1
+            elif match is not None:
+                app_id, inferred_status = match
+            else:
+                continue
+            email.application_id = app_id
+            linked_count += 1
+            if activity.record(by_id[app_id], email.received_at, inferred_status):
+                status_updated_count += 1
 
         if linked_count:
+            await self.app_repo.apply_email_activity(activity)
             await self.repo.session.commit()
             logger.info(
-                "Linked %s emails to existing applications, status updated for %s",
+                "Linked %s emails to existing applications (%s by thread), status updated for %s",
                 linked_count,
+                thread_linked_count,
                 status_updated_count,
             )
+        return [email for email in unlinked if email.application_id is None]
 
-    async def _auto_create_applications(self) -> int:
+    async def _auto_create_applications(
+        self,
+        still_unlinked: list[EmailReference],
+        applications: list[ApplicationMatchRow],
+    ) -> list[ApplicationMatchRow]:
         """
         For unlinked emails, parse a JobApplication from subject/body and create it.
         Emails where company cannot be identified are left unlinked for manual review.
-        Deduplicates by (company_name, role_title).
+        Deduplicates by (company_name, role_title): an email whose application
+        already existed is linked only if the matcher picks one for it, and
+        later emails of an application created here are linked to it. Emails
+        are processed oldest first, and later messages of a thread follow the
+        thread's application. Returns the created applications.
         """
-        still_unlinked = await self.repo.list_unlinked()
         if not still_unlinked:
-            return 0
+            return []
 
-        existing_keys = await self.app_repo.list_company_role_keys()
-        all_apps = await self.app_repo.list_all()
+        existing_keys = {app.dedup_key for app in applications}
+        by_id = {app.id: app for app in applications}
 
-        created_count = 0
-        created_this_run: dict[tuple[str, str], JobApplication] = {}
+        # Parse up front through classify(); the passes below read the memoized results.
+        parser = ApplicationEmailParser()
+        parsed_results = await classify(parse_emails, [email_fields(email) for email in still_unlinked])
+        for email, result in zip(still_unlinked, parsed_results):
+            parser.store(email, result)
 
         company_subjects: dict[str, list[str | None]] = {}
         for email in still_unlinked:
-            parsed_peek = parse_application_from_email(email)
+            parsed_peek = parser.parse(email)
             if parsed_peek and parsed_peek["company_name"]:
                 company_key = parsed_peek["company_name"].lower()
                 company_subjects.setdefault(company_key, []).append(email.subject)
 
+        parsed_by_email: dict[int, dict] = {}
         for email in still_unlinked:
-            parsed = parse_application_from_email(email)
+            parsed = parser.parse(email)
             if not parsed:
                 continue
-
             if not parsed["role_title"]:
                 company_key = parsed["company_name"].lower()
                 sibling_subjects = [s for s in company_subjects.get(company_key, []) if s != email.subject]
                 parsed["role_title"] = extract_role_from_subjects(sibling_subjects)
+            parsed_by_email[id(email)] = parsed
+
+        # Emails parsed into an application that already exists are linked by
+        # the matcher, run through classify() like the match stage.
+        to_match = [
+            email
+            for email in still_unlinked
+            if id(email) in parsed_by_email and _dedup_key(parsed_by_email[id(email)]) in existing_keys
+        ]
+        matches = (
+            await classify(match_emails, [email_fields(email) for email in to_match], ApplicationSnapshot(applications))
+            if to_match
+            else []
+        )
+        best_by_email = {id(email): by_id[match[0]] for email, match in zip(to_match, matches) if match is not None}
+
+        activity = EmailActivityBatch()
+        created_count = 0
+        created_this_run: dict[tuple[str, str], ApplicationMatchRow] = {}
 
-            key = (parsed["company_name"].lower(), (parsed["role_title"] or "").lower())
+        thread_apps: dict[str, ApplicationMatchRow] = {}
 
-            if key in existing_keys:
-                best = match_email_to_application(email, all_apps)
-                if best:
-                    email.application_id = best.id
-                    await self.app_repo.update_last_email_at(best.id, email.received_at)
-                    await self._apply_inferred_status(email, best)
+        for email in sorted(still_unlinked, key=lambda e: e.received_at):
+            thread_app = thread_apps.get(email.gmail_thread_id)
+            if thread_app is not None:
+                email.application_id = thread_app.id
+                self._record_linked_email(activity, email, thread_app)
+                continue
+
+            parsed = parsed_by_email.get(id(email))
+            if not parsed:
                 continue
 
+            key = _dedup_key(parsed)
+
             if key in created_this_run:
                 app = created_this_run[key]
                 email.application_id = app.id
-                await self.app_repo.update_last_email_at(app.id, email.received_at)
-                await self._apply_inferred_status(email, app)
+                self._record_linked_email(activity, email, app)
+                if email.gmail_thread_id:
+                    thread_apps[email.gmail_thread_id] = app
+                continue
+
+            if key in existing_keys:
+                best = best_by_email.get(id(email))
+                if best:
+                    email.application_id = best.id
+                    self._record_linked_email(activity, email, best)
+                    if email.gmail_thread_id:
+                        thread_apps[email.gmail_thread_id] = best
                 continue
 
             new_app = await self.app_repo.create(parsed)
-            all_apps = list(all_apps) + [new_app]
-            existing_keys.add(key)
-            created_this_run[key] = new_app
-            email.application_id = new_app.id
-            await self.app_repo.update_last_email_at(new_app.id, email.received_at)
+            logger.debug(
+                "Created application %s from email %s (subject pattern %s)",
+                new_app.id,
+                email.gmail_message_id,
+                parser.pattern_index(email),
+            )
+            row = ApplicationMatchRow.from_application(new_app)
+            created_this_run[key] = row
+            email.application_id = row.id
+            if email.gmail_thread_id:
+                thread_apps[email.gmail_thread_id] = row
+            activity.record(row, email.received_at)
             created_count += 1
 
         if created_count or any(email.application_id is not None for email in still_unlinked):
+            await self.app_repo.apply_email_activity(activity)
             await self.repo.session.commit()
             logger.info("Auto-created %s new job applications from emails", created_count)
 
-        return created_count
+        return list(created_this_run.values())
+
+    async def _stamp_evaluated(
+        self, candidates: list[EmailReference], created: list[ApplicationMatchRow]
+    ) -> None:
+        """Record that candidates were evaluated with the current MATCHER_VERSION.
+
+        Applications created in this scan can match mail evaluated before
+        they existed; only that mail is made due again, as after a manual
+        create (see JobApplicationService.create).
+        """
+        if not candidates and not created:
+            return
+        await self.repo.mark_matched([email.id for email in candidates], MATCHER_VERSION)
+        if created:
+            await reopen_matching_backlog(self.repo, created)
+        await self.repo.session.commit()
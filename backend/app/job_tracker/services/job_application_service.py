@@ -1,9 +1,17 @@
 from typing import Optional
 
 from app.job_tracker.models.job_application import ApplicationStatus, JobApplication
-from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+from app.job_tracker.repositories.job_application_repository import (
+    ApplicationMatchRow,
+    JobApplicationRepository,
+)
 from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
 from app.job_tracker.services.emails.email_parser import infer_status
+from app.job_tracker.services.emails.email_scan_service import reopen_matching_backlog
+
+# Application fields the scan matcher reads; changing them can make already
+# evaluated unlinked mail match.
+_MATCHED_FIELDS = frozenset({"company_name", "role_title", "status"})
 
 
 class JobApplicationService:
@@ -21,6 +29,8 @@ class JobApplicationService:
 
     async def create(self, data: dict) -> JobApplication:
         app = await self.app_repo.create(data)
+        # Unlinked mail already evaluated by a scan may match the new application.
+        await reopen_matching_backlog(self.email_repo, [ApplicationMatchRow.from_application(app)])
         await self._session.commit()
         return await self.app_repo.get_by_id(app.id)
 
@@ -30,6 +40,8 @@ class JobApplicationService:
     async def update(self, application_id: int, data: dict) -> Optional[JobApplication]:
         app = await self.app_repo.update(application_id, data)
         if app:
+            if _MATCHED_FIELDS.intersection(data):
+                await reopen_matching_backlog(self.email_repo, [ApplicationMatchRow.from_application(app)])
             await self._session.commit()
         return app
 
@@ -53,9 +65,19 @@ class JobApplicationService:
         search: Optional[str] = None,
         company_name: Optional[str] = None,
         sort: Optional[str] = None,
-    ) -> tuple[list[JobApplication], int]:
+        cursor: Optional[str] = None,
+        include_emails: bool = False,
+    ) -> tuple[list[JobApplication], Optional[int], Optional[str]]:
+        """Return (items, total, next_cursor); see JobApplicationRepository.list_paginated."""
         return await self.app_repo.list_paginated(
-            limit=limit, offset=offset, status=status, search=search, company_name=company_name, sort=sort
+            limit=limit,
+            offset=offset,
+            status=status,
+            search=search,
+            company_name=company_name,
+            sort=sort,
+            cursor=cursor,
+            include_emails=include_emails,
         )
 
     async def assign_email(self, application_id: int, email_id: int) -> bool:
@@ -69,16 +91,14 @@ class JobApplicationService:
             return False
 
         previous_application_id = email.application_id
-        email.application_id = application_id
-        await self.app_repo.update_last_email_at(application_id, email.received_at)
+        if previous_application_id != application_id:
+            email.application_id = application_id
+            await self.app_repo.add_linked_email(application_id, email.received_at)
 
-        # Reassigning away from another application: that application's
-        # last_email_at may now be stale (it could have been driven by this
-        # email), so recompute it from its remaining linked emails — same as
-        # unassign_email does.
-        if previous_application_id is not None and previous_application_id != application_id:
-            remaining_max = await self.email_repo.get_latest_received_at(previous_application_id)
-            await self.app_repo.set_last_email_at(previous_application_id, remaining_max)
+            # Reassigning away from another application: uncount the email
+            # there too; its last_email_at may have been driven by this email.
+            if previous_application_id is not None:
+                await self.app_repo.remove_linked_email(previous_application_id, email.received_at)
 
         haystack = " ".join(filter(None, [email.subject, email.snippet, getattr(email, "body_text", None)]))
         inferred = infer_status(haystack)
@@ -94,8 +114,8 @@ class JobApplicationService:
             return False
 
         email.application_id = None
-        remaining_max = await self.email_repo.get_latest_received_at(application_id)
-        await self.app_repo.set_last_email_at(application_id, remaining_max)
+        email.matcher_version = None  # let the next scan evaluate it again
+        await self.app_repo.remove_linked_email(application_id, email.received_at)
         await self._session.commit()
         return True
 
@@ -125,16 +145,21 @@ class JobApplicationService:
         status: ApplicationStatus,
         page: int,
         page_size: int,
+        cursor: Optional[str] = None,
     ) -> dict:
-        """Return one paginated page of cards for a single Kanban column."""
-        apps, total = await self.app_repo.list_pipeline_page(status, page, page_size)
-        has_next = (page * page_size) < total
+        """Return one paginated page of cards for a single Kanban column.
+
+        With cursor, the page continues after the cursor's card, page is
+        ignored and total is None.
+        """
+        apps, total, next_cursor = await self.app_repo.list_pipeline_page(status, page, page_size, cursor=cursor)
         return {
             "status": status,
             "total": total,
             "page": page,
             "page_size": page_size,
-            "has_next": has_next,
+            "has_next": next_cursor is not None,
+            "next_cursor": next_cursor,
             "items": [
                 {
                     "id": app.id,
@@ -146,7 +171,7 @@ class JobApplicationService:
                     "applied_at": app.applied_at,
                     "last_email_at": app.last_email_at,
                     "updated_at": app.updated_at,
-                    "email_count": len(app.emails),
+                    "email_count": app.email_count,
                 }
                 for app in apps
             ],
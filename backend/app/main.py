@@ -46,6 +46,17 @@ async def lifespan(_: FastAPI):
     _bootstrap_gmail_token()
 
     settings = get_settings()
+    credential_refresh_task = None
+    if settings.GMAIL_TOKEN_FILE and settings.GMAIL_CREDENTIAL_REFRESH_SECONDS > 0:
+        from app.job_tracker.services.emails.credential_refresher import run_credential_refresh_loop
+        credential_refresh_task = asyncio.create_task(
+            run_credential_refresh_loop(
+                settings.GMAIL_CREDENTIAL_REFRESH_SECONDS,
+                settings.GMAIL_CREDENTIAL_REFRESH_MARGIN_SECONDS,
+            ),
+            name="gmail-credential-refresh",
+        )
+
     auto_scan_task = None
     if settings.SCAN_INTERVAL_HOURS > 0:
         from app.job_tracker.services.emails.auto_scanner import run_auto_scan_loop
@@ -56,12 +67,13 @@ async def lifespan(_: FastAPI):
 
     yield
 
-    if auto_scan_task is not None:
-        auto_scan_task.cancel()
-        try:
-            await auto_scan_task
-        except asyncio.CancelledError:
-            pass
+    for task in (auto_scan_task, credential_refresh_task):
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
     from app.job_tracker.api.routes.scans import shutdown_background_scans
     await shutdown_background_scans()
@@ -72,6 +84,18 @@ async def lifespan(_: FastAPI):
     except Exception:
         logger.warning("Error shutting down executor", exc_info=True)
 
+    try:
+        from app.job_tracker.services.emails.email_classifier import shutdown_classify_pool
+        shutdown_classify_pool()
+    except Exception:
+        logger.warning("Error shutting down classify pool", exc_info=True)
+
+    try:
+        from app.job_tracker.api.deps import close_gmail_clients
+        await close_gmail_clients()
+    except Exception:
+        logger.warning("Error closing Gmail clients", exc_info=True)
+
 
 def create_app(lifespan_override=None) -> FastAPI:
     settings = get_settings()
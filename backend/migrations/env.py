@@ -7,6 +7,7 @@ from alembic import context
 import app.job_tracker.models  # noqa: F401 — registers all ORM models on Base
 from app.db import Base
 from app.config import get_settings
+from app.job_tracker.repositories.search import SEARCH_VECTOR_COLUMN
 
 config = context.config
 
@@ -16,6 +17,18 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def _include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Skip the generated search_vector columns (and their GIN indexes) that
+    migration 007 adds but the models leave unmapped, so autogenerate does
+    not drop them."""
+    if reflected and compare_to is None:
+        if type_ == "column" and name == SEARCH_VECTOR_COLUMN:
+            return False
+        if type_ == "index" and name.endswith(f"_{SEARCH_VECTOR_COLUMN}"):
+            return False
+    return True
+
+
 def _get_sync_url() -> str:
     url = get_settings().DATABASE_URL
     # asyncpg → psycopg2 for Alembic's sync engine
@@ -29,6 +42,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=_include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -49,6 +63,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            include_object=_include_object,
         )
         with context.begin_transaction():
             context.run_migrations()
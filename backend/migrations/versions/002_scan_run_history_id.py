@@ -0,0 +1,24 @@
+"""scan_run_history_id
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "002"
+down_revision: Union[str, Sequence[str], None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scan_runs", sa.Column("history_id", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("scan_runs", "history_id")
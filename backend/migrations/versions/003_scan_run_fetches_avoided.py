@@ -0,0 +1,24 @@
+"""scan_run_fetches_avoided
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "003"
+down_revision: Union[str, Sequence[str], None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scan_runs", sa.Column("fetches_avoided", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("scan_runs", "fetches_avoided")
@@ -0,0 +1,24 @@
+"""email_reference_matcher_version
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, Sequence[str], None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("email_references", sa.Column("matcher_version", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("email_references", "matcher_version")
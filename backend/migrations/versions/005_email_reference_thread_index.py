@@ -0,0 +1,23 @@
+"""email_reference_thread_index
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, Sequence[str], None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_email_references_gmail_thread_id", "email_references", ["gmail_thread_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_references_gmail_thread_id", table_name="email_references")
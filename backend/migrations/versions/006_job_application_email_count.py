@@ -0,0 +1,36 @@
+"""job_application_email_count
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, Sequence[str], None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "job_applications",
+        sa.Column("email_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE job_applications
+        SET email_count = (
+            SELECT count(*) FROM email_references
+            WHERE email_references.application_id = job_applications.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("job_applications", "email_count")
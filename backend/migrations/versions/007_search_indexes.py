@@ -0,0 +1,65 @@
+"""search_indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "007"
+down_revision: Union[str, Sequence[str], None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_APPLICATION_TRGM_COLUMNS = ("company_name", "role_title", "source", "job_url")
+_EMAIL_TRGM_COLUMNS = ("subject", "sender")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated columns stay current on every insert/update (including COPY
+    # and bulk UPDATEs) without triggers. The configurations must match the
+    # TextSearch specs in the repositories.
+    op.execute(
+        "ALTER TABLE job_applications ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(company_name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(role_title, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(source, '')), 'C')"
+        ") STORED"
+    )
+    op.execute(
+        "ALTER TABLE email_references ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(subject, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(snippet, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(body_text, '')), 'C')"
+        ") STORED"
+    )
+    op.create_index("ix_job_applications_search_vector", "job_applications", ["search_vector"], unique=False, postgresql_using="gin")
+    op.create_index("ix_email_references_search_vector", "email_references", ["search_vector"], unique=False, postgresql_using="gin")
+
+    for column in _APPLICATION_TRGM_COLUMNS:
+        op.create_index(
+            f"ix_job_applications_{column}_trgm", "job_applications", [column], unique=False,
+            postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+        )
+    for column in _EMAIL_TRGM_COLUMNS:
+        op.create_index(
+            f"ix_email_references_{column}_trgm", "email_references", [column], unique=False,
+            postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for column in _EMAIL_TRGM_COLUMNS:
+        op.drop_index(f"ix_email_references_{column}_trgm", table_name="email_references")
+    for column in _APPLICATION_TRGM_COLUMNS:
+        op.drop_index(f"ix_job_applications_{column}_trgm", table_name="job_applications")
+    op.drop_index("ix_email_references_search_vector", table_name="email_references")
+    op.drop_index("ix_job_applications_search_vector", table_name="job_applications")
+    op.drop_column("email_references", "search_vector")
+    op.drop_column("job_applications", "search_vector")
+    # pg_trgm is left installed; other objects in the database may use it.
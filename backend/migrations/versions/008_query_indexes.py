@@ -0,0 +1,61 @@
+"""query_indexes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, Sequence[str], None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicates: primary keys and the gmail_message_id unique constraint are
+    # already indexed, and status is the prefix of the pipeline index below.
+    op.drop_index("ix_job_applications_id", table_name="job_applications")
+    op.drop_index("ix_job_applications_status", table_name="job_applications")
+    op.drop_index("ix_email_references_id", table_name="email_references")
+    op.drop_index("ix_email_references_gmail_message_id", table_name="email_references")
+    op.drop_index("ix_scan_runs_id", table_name="scan_runs")
+
+    # Same order as the list/pipeline ORDER BY, NULLS LAST included, so a
+    # page is an index range read with no sort.
+    op.create_index(
+        "ix_job_applications_status_last_email_at", "job_applications",
+        ["status", sa.text("last_email_at DESC NULLS LAST"), sa.text("id DESC")], unique=False,
+    )
+    op.create_index(
+        "ix_job_applications_last_email_at", "job_applications",
+        [sa.text("last_email_at DESC NULLS LAST"), sa.text("id DESC")], unique=False,
+    )
+    op.create_index("ix_email_references_application_id_received_at", "email_references", ["application_id", "received_at"], unique=False)
+    op.create_index("ix_email_references_received_at_id", "email_references", ["received_at", "id"], unique=False)
+    op.create_index(
+        "ix_email_references_unlinked", "email_references", ["matcher_version"], unique=False,
+        postgresql_where=sa.text("application_id IS NULL"),
+    )
+    op.create_index("ix_scan_runs_started_at", "scan_runs", ["started_at"], unique=False)
+    op.create_index("ix_scan_runs_status_started_at_id", "scan_runs", ["status", "started_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scan_runs_status_started_at_id", table_name="scan_runs")
+    op.drop_index("ix_scan_runs_started_at", table_name="scan_runs")
+    op.drop_index("ix_email_references_unlinked", table_name="email_references")
+    op.drop_index("ix_email_references_received_at_id", table_name="email_references")
+    op.drop_index("ix_email_references_application_id_received_at", table_name="email_references")
+    op.drop_index("ix_job_applications_last_email_at", table_name="job_applications")
+    op.drop_index("ix_job_applications_status_last_email_at", table_name="job_applications")
+
+    op.create_index("ix_scan_runs_id", "scan_runs", ["id"], unique=False)
+    op.create_index("ix_email_references_gmail_message_id", "email_references", ["gmail_message_id"], unique=False)
+    op.create_index("ix_email_references_id", "email_references", ["id"], unique=False)
+    op.create_index("ix_job_applications_status", "job_applications", ["status"], unique=False)
+    op.create_index("ix_job_applications_id", "job_applications", ["id"], unique=False)
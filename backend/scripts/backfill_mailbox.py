@@ -0,0 +1,78 @@
+"""
+Import a whole Gmail window in one go — for the first import of a mailbox.
+
+Runs the regular scan pipeline in backfill mode: the full query window is
+listed (the stored history ID is ignored) and matched emails are saved in
+large batches through PostgreSQL COPY instead of per fetched batch. Matching
+and application auto-creation run afterwards as in a normal scan.
+
+Requires GMAIL_TOKEN_FILE.
+
+Usage:
+    python scripts/backfill_mailbox.py [--days 365] [--max-messages 100000] [--no-match]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.db import AsyncSessionLocal
+from app.job_tracker.api.deps import close_gmail_clients, make_gmail_client
+from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+from app.job_tracker.services.emails.email_classifier import shutdown_classify_pool
+from app.job_tracker.services.emails.email_scan_service import EmailScanService, shutdown_executor
+
+
+async def backfill(days: int | None, max_messages: int | None, match: bool) -> None:
+    settings = get_settings()
+    if not settings.GMAIL_TOKEN_FILE:
+        sys.exit("GMAIL_TOKEN_FILE is not set; there is no mailbox to import.")
+
+    overrides = {}
+    if days is not None:
+        overrides["GMAIL_QUERY_WINDOW_DAYS"] = days
+    if max_messages is not None:
+        overrides["GMAIL_MAX_MESSAGES"] = max_messages
+    client = make_gmail_client(settings.model_copy(update=overrides))
+
+    started = time.monotonic()
+    try:
+        async with AsyncSessionLocal() as session:
+            service = EmailScanService(
+                client,
+                EmailReferenceRepository(session),
+                app_repo=JobApplicationRepository(session) if match else None,
+                scan_run_repo=ScanRunRepository(session),
+                backfill=True,
+            )
+            result = await service.scan_for_applications(
+                on_progress=lambda stage, detail: print(f"[{stage}] {detail}")
+            )
+    finally:
+        await close_gmail_clients()
+        shutdown_executor()
+        shutdown_classify_pool()
+
+    print(
+        f"Inserted {result['inserted']} emails, created {result['applications_created']} applications "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, help="query window to import (default GMAIL_QUERY_WINDOW_DAYS)")
+    parser.add_argument("--max-messages", type=int, help="listing cap (default GMAIL_MAX_MESSAGES)")
+    parser.add_argument("--no-match", action="store_true", help="only import; leave matching to the next scan")
+    args = parser.parse_args()
+    asyncio.run(backfill(days=args.days, max_messages=args.max_messages, match=not args.no_match))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Micro-benchmark: application parsing with and without the anchor prefilter.
+
+Builds a corpus of realistic job-mail and everyday subjects, checks that the
+anchor prefilter changes no result, and prints emails per second for:
+  - every pattern on every text (no prefilter)
+  - the anchor prefilter
+  - the auto-create stage's two passes through a memoizing ApplicationEmailParser
+
+Usage:
+    python scripts/bench_email_parsing.py [--emails 20000] [--seed 0]
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.job_tracker.services.emails import email_parser
+from app.job_tracker.services.emails.email_parser import (
+    _APPLICATION_SUBJECT_PATTERNS,
+    ApplicationEmailParser,
+    parse_application_with_pattern,
+)
+
+_COMPANIES = ["Acme Corp", "Wix", "Monday.com", "Check Point", "Melio", "Riskified", "Stripe", "Lightricks"]
+_ROLES = ["Backend Engineer", "Full Stack Developer", "Data Scientist", "Product Manager", "QA Automation Engineer"]
+_JOB_SUBJECTS = [
+    "Your application to {role} at {company}",
+    "Thank you for applying to {company}",
+    "Thanks for applying for the {role} position at {company}",
+    "Your application was sent to {company}",
+    "Application update from {company}",
+    "{company} - Thank you for your application - {role}",
+    "{role} opportunity at {company}",
+    "Next steps for your application: {role} at {company}",
+    "Interview invitation - {company}",
+    "{company} - phone screen",
+    "We received your application for {role} at {company}",
+]
+_OTHER_SUBJECTS = [
+    "Your order #{n} has shipped",
+    "Weekly digest: top stories",
+    "Invoice {n} is ready",
+    "Security alert: new sign-in",
+    "Team offsite agenda",
+    "Re: lunch on Thursday?",
+    "Your subscription renews soon",
+    "Flight confirmation {n}",
+]
+_BODY = (
+    "Hi there, thanks for being a customer. Here is a summary of your recent activity and a few "
+    "recommendations we think you will like. If you have questions, reply to this message. "
+)
+
+
+def make_corpus(count: int, seed: int) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    received_at = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    corpus = []
+    for n in range(count):
+        if rng.random() < 0.3:
+            subject = rng.choice(_JOB_SUBJECTS).format(role=rng.choice(_ROLES), company=rng.choice(_COMPANIES))
+        else:
+            subject = rng.choice(_OTHER_SUBJECTS).format(n=n)
+        corpus.append(
+            SimpleNamespace(
+                subject=subject,
+                snippet=_BODY[:150],
+                body_text=_BODY * 5,
+                sender="notifications@example.com",
+                received_at=received_at,
+            )
+        )
+    return corpus
+
+
+def _unfiltered_patterns(text):
+    return enumerate(_APPLICATION_SUBJECT_PATTERNS)
+
+
+def run(fn, corpus) -> tuple[float, list]:
+    started = time.perf_counter()
+    results = [fn(email) for email in corpus]
+    return time.perf_counter() - started, results
+
+
+def two_pass(corpus) -> None:
+    """Parse every email twice, like _auto_create_applications' peek and main passes."""
+    parser = ApplicationEmailParser()
+    for email in corpus:
+        parser.parse(email)
+    for email in corpus:
+        parser.parse(email)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.emails, args.seed)
+
+    prefiltered = email_parser._candidate_patterns
+    email_parser._candidate_patterns = _unfiltered_patterns
+    try:
+        baseline_seconds, baseline = run(parse_application_with_pattern, corpus)
+    finally:
+        email_parser._candidate_patterns = prefiltered
+    seconds, results = run(parse_application_with_pattern, corpus)
+
+    started = time.perf_counter()
+    two_pass(corpus)
+    memo_seconds = time.perf_counter() - started
+
+    mismatches = sum(a != b for a, b in zip(baseline, results))
+    print(f"Corpus: {len(corpus)} emails, {sum(r is not None for r in results)} parsed")
+    print(f"all patterns:          {len(corpus) / baseline_seconds:>10,.0f} emails/s")
+    print(f"anchor prefilter:      {len(corpus) / seconds:>10,.0f} emails/s")
+    print(f"auto-create two-pass:  {len(corpus) / memo_seconds:>10,.0f} emails/s (was {len(corpus) / (2 * baseline_seconds):,.0f})")
+    print(f"speedup: {baseline_seconds / seconds:.2f}x, mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: matches_job_keywords against the previous per-pattern filter.
+
+Builds a synthetic corpus of messages (subject, snippet, body), checks both
+implementations agree on every message, and prints messages per second.
+
+Usage:
+    python scripts/bench_keyword_matching.py [--messages 50000] [--seed 0]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.job_tracker.services.emails.email_matcher import (
+    _EXCLUDE_PHRASES,
+    _JOB_KEYWORDS,
+    matches_job_keywords,
+)
+
+_LEGACY_KEYWORD_PATTERNS = [re.compile(r"\b" + re.escape(kw) + r"\b", re.IGNORECASE) for kw in _JOB_KEYWORDS]
+
+
+def legacy_matches_job_keywords(subject, snippet, body_text=None, sender=None) -> bool:
+    """The filter before keywords were compiled into one scan: one regex per keyword."""
+    haystack = " ".join(filter(None, [subject, snippet, body_text])).lower()
+    if any(phrase in haystack for phrase in _EXCLUDE_PHRASES):
+        return False
+    return any(pat.search(haystack) for pat in _LEGACY_KEYWORD_PATTERNS)
+
+
+_FILLER = (
+    "thanks for your order the package has shipped weekly digest of top stories from your "
+    "team meeting notes attached please review the invoice before friday our sale ends soon "
+    "reminder your subscription renews next month security alert new sign in from chrome "
+    "through thursday the roadmap discussion will continue share your feedback with us"
+).split()
+_SUBJECTS = [
+    "Your order has shipped",
+    "Weekly digest",
+    "Invoice #{n}",
+    "Interview invitation - Backend Engineer",
+    "Thank you for applying to Acme",
+    "Update on your application",
+    "John wants to connect",
+    "Deploy failed for service-{n}",
+    "Team sync notes",
+    "Unfortunately we will not be moving forward",
+]
+
+
+def make_corpus(count: int, seed: int) -> list[tuple[str, str, str]]:
+    rng = random.Random(seed)
+    corpus = []
+    for n in range(count):
+        words = [rng.choice(_FILLER) for _ in range(rng.randint(30, 250))]
+        if rng.random() < 0.2:
+            words.insert(rng.randrange(len(words)), rng.choice(_JOB_KEYWORDS))
+        if rng.random() < 0.05:
+            words.insert(rng.randrange(len(words)), rng.choice(_EXCLUDE_PHRASES))
+        body = " ".join(words)
+        corpus.append((rng.choice(_SUBJECTS).format(n=n), body[:200], body))
+    return corpus
+
+
+def run(fn, corpus) -> tuple[float, list[bool]]:
+    started = time.perf_counter()
+    results = [fn(subject, snippet, body) for subject, snippet, body in corpus]
+    return time.perf_counter() - started, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.messages, args.seed)
+    legacy_seconds, legacy_results = run(legacy_matches_job_keywords, corpus)
+    seconds, results = run(matches_job_keywords, corpus)
+
+    mismatches = sum(a != b for a, b in zip(legacy_results, results))
+    print(f"Corpus: {len(corpus)} messages, {sum(results)} match")
+    print(f"per-pattern filter: {len(corpus) / legacy_seconds:>10,.0f} msg/s")
+    print(f"single-pass scan:   {len(corpus) / seconds:>10,.0f} msg/s")
+    print(f"speedup: {legacy_seconds / seconds:.2f}x, mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
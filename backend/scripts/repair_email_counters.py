@@ -0,0 +1,43 @@
+"""
+Recompute job_applications.email_count and last_email_at from email_references.
+
+The counters are kept current as emails are linked and unlinked; this
+recomputes them from scratch for rows that have drifted, e.g. after
+email_references were edited by hand. Only rows whose counters differ are
+updated.
+
+Usage:
+    python scripts/repair_email_counters.py [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import AsyncSessionLocal
+from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+
+
+async def repair(dry_run: bool) -> None:
+    async with AsyncSessionLocal() as session:
+        repaired = await JobApplicationRepository(session).recompute_email_counters()
+        if dry_run:
+            await session.rollback()
+        else:
+            await session.commit()
+
+    suffix = " (dry run, nothing committed)" if dry_run else ""
+    print(f"Repaired email counters on {repaired} applications{suffix}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="roll back instead of committing")
+    args = parser.parse_args()
+    asyncio.run(repair(dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Re-run Gmail message parsing over the local payload cache — no network, no quota.
+
+Updates the parsed columns (subject, sender, date, snippet, body text) of
+stored emails from their cached raw payloads. With --insert-new, cached
+messages that are not stored yet but now pass the job keyword filter are
+inserted too. The next scan's matching stage links new and re-parsed
+unlinked emails to applications.
+
+Requires GMAIL_PAYLOAD_CACHE_DIR.
+
+Usage:
+    python scripts/reprocess_cache.py [--insert-new] [--dry-run]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.db import AsyncSessionLocal
+from app.job_tracker.api.deps import make_payload_cache
+from app.job_tracker.email_scanner.gmail_client import GmailClientBase
+from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+from app.job_tracker.services.emails.email_matcher import matches_job_keywords
+
+BATCH_SIZE = 500
+
+
+async def reprocess(insert_new: bool, dry_run: bool) -> None:
+    settings = get_settings()
+    if not settings.GMAIL_PAYLOAD_CACHE_DIR:
+        sys.exit("GMAIL_PAYLOAD_CACHE_DIR is not set; there is no payload cache to reprocess.")
+
+    cache = make_payload_cache(settings)
+    # Read and parse the cache BATCH_SIZE payloads at a time, so memory stays
+    # bounded however large the cache is.
+    payloads = cache.iter_payloads()
+
+    parsed_count = updated = inserted = 0
+    async with AsyncSessionLocal() as session:
+        repo = EmailReferenceRepository(session)
+        while batch := [
+            GmailClientBase.parse_payload(payload) for payload in itertools.islice(payloads, BATCH_SIZE)
+        ]:
+            parsed_count += len(batch)
+            existing = await repo.list_existing_message_ids([m["gmail_message_id"] for m in batch])
+            updated += await repo.update_parsed_fields([m for m in batch if m["gmail_message_id"] in existing])
+            if insert_new:
+                new = [
+                    m for m in batch
+                    if m["gmail_message_id"] not in existing
+                    and matches_job_keywords(m.get("subject"), m.get("snippet"), m.get("body_text"))
+                ]
+                created, _ = await repo.copy_create(new)
+                inserted += created
+
+        print(f"Parsed {parsed_count} cached payloads")
+        if dry_run:
+            await session.rollback()
+        else:
+            await session.commit()
+
+    suffix = " (dry run, nothing committed)" if dry_run else ""
+    print(f"Updated {updated} stored emails, inserted {inserted} new emails{suffix}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--insert-new", action="store_true", help="insert cached job emails not stored yet")
+    parser.add_argument("--dry-run", action="store_true", help="roll back instead of committing")
+    args = parser.parse_args()
+    asyncio.run(reprocess(insert_new=args.insert_new, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,4 +12,5 @@ from use_cases.test_email_matching import *  # noqa: F401,F403
 from use_cases.test_email_parsing import *  # noqa: F401,F403
 from use_cases.test_gmail_client import *  # noqa: F401,F403
 from use_cases.test_health import *  # noqa: F401,F403
+from use_cases.test_query_plans import *  # noqa: F401,F403
 from use_cases.test_scan_stream import *  # noqa: F401,F403
@@ -22,8 +22,11 @@ def main() -> None:
         query_window_days=settings.GMAIL_QUERY_WINDOW_DAYS,
         max_messages=settings.GMAIL_MAX_MESSAGES,
         page_size=settings.GMAIL_LIST_PAGE_SIZE,
+        list_shard_days=settings.GMAIL_LIST_SHARD_DAYS,
+        list_concurrency=settings.GMAIL_LIST_CONCURRENCY,
         batch_size=settings.GMAIL_BATCH_SIZE,
         retry_backoff_seconds=settings.GMAIL_RETRY_BACKOFF_SECONDS,
+        retry_budget_seconds=settings.GMAIL_RETRY_BUDGET_SECONDS,
     )
 
     messages = client.fetch_recent_messages()
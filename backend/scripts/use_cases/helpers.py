@@ -1,4 +1,7 @@
 import datetime as dt
+from typing import Awaitable, Callable
+
+from sqlalchemy import event
 
 
 def make_email_data(suffix: str = "1") -> dict:
@@ -9,3 +12,26 @@ def make_email_data(suffix: str = "1") -> dict:
         "received_at": dt.datetime(2024, 1, 1, 12, 0, 0, tzinfo=dt.timezone.utc),
         "snippet": "Thank you for applying...",
     }
+
+
+async def explain_query_plans(session, call: Callable[[], Awaitable]) -> list[str]:
+    """Await call() and return SQLite's EXPLAIN QUERY PLAN of every statement it
+    executed, in order, each plan's steps joined with " | "."""
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters[0] if executemany else parameters))
+
+    engine = session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        await call()
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    connection = await session.connection()
+    plans = []
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.append(" | ".join(row[3] for row in result.all()))
+    return plans
@@ -74,7 +74,7 @@ class TestJobApplicationRepository:
         await repo.create({"company_name": "B", "role_title": "R", "status": ApplicationStatus.APPLIED})
         await db_session.commit()
 
-        items, total = await repo.list_paginated(limit=10, offset=0, status=ApplicationStatus.APPLIED)
+        items, total, _ = await repo.list_paginated(limit=10, offset=0, status=ApplicationStatus.APPLIED)
         assert total == 1
         assert items[0].company_name == "B"
 
@@ -111,6 +111,26 @@ class TestApplicationsEndpoint:
         assert get_resp.status_code == 200
         assert get_resp.json()["company_name"] == "Beta Corp"
 
+    async def test_list_counts_emails_and_includes_them_on_request(self, client, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+
+        app_id = (await client.post("/job-tracker/applications", json={"company_name": "Delta"})).json()["id"]
+        await client.post("/job-tracker/applications", json={"company_name": "Epsilon"})
+        repo = EmailReferenceRepository(db_session)
+        await repo.bulk_create([make_email_data(f"cnt{i}") for i in range(3)])
+        await db_session.commit()
+        for email in await repo.list_unlinked():
+            await client.post(f"/job-tracker/applications/{app_id}/emails/{email.id}")
+
+        items = (await client.get("/job-tracker/applications?sort=company_name")).json()["items"]
+        assert [(item["email_count"], "emails" in item) for item in items] == [(3, False), (0, False)]
+
+        items = (await client.get("/job-tracker/applications?sort=company_name&include=emails")).json()["items"]
+        assert [(item["email_count"], len(item["emails"])) for item in items] == [(3, 3), (0, 0)]
+
+        card = (await client.get("/job-tracker/applications/pipeline/column?status=applied")).json()["items"]
+        assert sorted(c["email_count"] for c in card) == [0, 3]
+
     async def test_get_nonexistent_returns_404(self, client):
         response = await client.get("/job-tracker/applications/99999")
         assert response.status_code == 404
@@ -322,6 +342,45 @@ class TestUnassignEmailEndpoint:
         assert unassign_resp.status_code == 200
         assert unassign_resp.json()["unassigned"] is True
 
+    async def test_link_changes_keep_counters_current(self, client, db_session):
+        import datetime as dt
+
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+
+        repo = EmailReferenceRepository(db_session)
+        day = lambda d: dt.datetime(2024, 3, d, tzinfo=dt.timezone.utc)  # noqa: E731
+        await repo.bulk_create([{**make_email_data(f"ctr{d}"), "received_at": day(d)} for d in (1, 2, 3)])
+        await db_session.commit()
+        ids = {e.gmail_message_id: e.id for e in await repo.list_unlinked()}
+        first = (await client.post("/job-tracker/applications", json={"company_name": "CountA"})).json()["id"]
+        second = (await client.post("/job-tracker/applications", json={"company_name": "CountB"})).json()["id"]
+
+        async def counters(app_id):
+            data = (await client.get(f"/job-tracker/applications/{app_id}")).json()
+            return data["email_count"], data["last_email_at"] and data["last_email_at"][:10]
+
+        for d in (1, 2, 3):
+            await client.post(f"/job-tracker/applications/{first}/emails/{ids[f'msg-ctr{d}']}")
+        assert await counters(first) == (3, "2024-03-03")
+
+        # Reassigning the latest email moves it and its date to the other application.
+        await client.post(f"/job-tracker/applications/{second}/emails/{ids['msg-ctr3']}")
+        assert await counters(first) == (2, "2024-03-02")
+        assert await counters(second) == (1, "2024-03-03")
+
+        await client.delete(f"/job-tracker/applications/{second}/emails/{ids['msg-ctr3']}")
+        assert await counters(second) == (0, None)
+
+        # Drifted counters are repaired in bulk.
+        app_repo = JobApplicationRepository(db_session)
+        await app_repo.update(first, {"email_count": 7})
+        await db_session.commit()
+        assert await app_repo.recompute_email_counters() == 1
+        await db_session.commit()
+        db_session.expire_all()
+        assert await counters(first) == (2, "2024-03-02")
+
     async def test_unassign_nonexistent_returns_404(self, client):
         create_resp = await client.post(
             "/job-tracker/applications",
@@ -536,6 +595,34 @@ class TestExtendedSearchAndSort:
         assert data["total"] == 10
         assert len(data["items"]) == 3
 
+    async def test_search_ranks_by_relevance(self, client):
+        for body in (
+            {"company_name": "Other", "role_title": "Dev", "source": "Rankly board"},
+            {"company_name": "Another", "role_title": "Rankly liaison"},
+            {"company_name": "Rankly", "role_title": "Dev"},
+            {"company_name": "Unrelated", "role_title": "Dev"},
+        ):
+            await client.post("/job-tracker/applications", json=body)
+
+        data = (await client.get("/job-tracker/applications?search=rankly")).json()
+        assert [item["company_name"] for item in data["items"]] == ["Rankly", "Another", "Other"]
+        assert data["next_cursor"] is None
+        page = (await client.get("/job-tracker/applications?search=rankly&limit=1&offset=1")).json()
+        assert [item["company_name"] for item in page["items"]] == ["Another"]
+        # An explicit sort keeps its order and cursor; a cursor cannot continue a ranked search.
+        sorted_page = (await client.get("/job-tracker/applications?search=rankly&sort=company_name&limit=2")).json()
+        assert [item["company_name"] for item in sorted_page["items"]] == ["Another", "Other"]
+        cursor = sorted_page["next_cursor"]
+        assert cursor is not None
+        assert (await client.get(f"/job-tracker/applications?search=rankly&cursor={cursor}")).status_code == 400
+
+    async def test_search_matches_wildcards_literally(self, client):
+        await client.post("/job-tracker/applications", json={"company_name": "100% Remote"})
+        await client.post("/job-tracker/applications", json={"company_name": "100 Remote"})
+
+        data = (await client.get("/job-tracker/applications?search=0%25")).json()
+        assert [item["company_name"] for item in data["items"]] == ["100% Remote"]
+
     async def test_empty_result_pagination(self, client):
         response = await client.get("/job-tracker/applications?search=NoSuchCompanyXYZ123")
         assert response.status_code == 200
@@ -543,6 +630,43 @@ class TestExtendedSearchAndSort:
         assert data["total"] == 0
         assert data["items"] == []
 
+    async def test_cursor_pages_match_offset_order(self, client):
+        for i, (company, role, applied_at) in enumerate([
+            ("Acme", "Dev", "2024-01-03T00:00:00Z"),
+            ("Acme", None, None),
+            ("Beta", "QA", "2024-01-01T00:00:00Z"),
+            ("Beta", None, "2024-01-03T00:00:00Z"),
+            ("Gamma", "Dev", None),
+        ]):
+            await client.post("/job-tracker/applications", json={
+                "company_name": company,
+                "role_title": role,
+                "applied_at": applied_at,
+                "status": ["applied", "interviewing"][i % 2],
+            })
+
+        for sort in ("", "&sort=role_title", "&sort=company_name", "&sort=applied_at", "&sort=status"):
+            full = (await client.get(f"/job-tracker/applications?limit=100{sort}")).json()
+            ids, cursor = [], None
+            while True:
+                url = f"/job-tracker/applications?limit=2{sort}" + (f"&cursor={cursor}" if cursor else "")
+                page = (await client.get(url)).json()
+                ids += [item["id"] for item in page["items"]]
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            assert ids == [item["id"] for item in full["items"]], sort
+
+    async def test_invalid_cursor_rejected(self, client):
+        for i in range(3):
+            await client.post("/job-tracker/applications", json={"company_name": f"Cur{i}"})
+        response = await client.get("/job-tracker/applications?limit=1&sort=company_name")
+        cursor = response.json()["next_cursor"]
+
+        assert (await client.get("/job-tracker/applications?cursor=not-a-cursor")).status_code == 400
+        response = await client.get(f"/job-tracker/applications?sort=status&cursor={cursor}")
+        assert response.status_code == 400
+
 
 @pytest.mark.asyncio
 class TestPipelineColumnEndpoint:
@@ -589,6 +713,31 @@ class TestPipelineColumnEndpoint:
         assert len(data["items"]) == 1
         assert data["has_next"] is False
 
+    async def test_column_cursor_pagination(self, client):
+        for i in range(5):
+            await client.post("/job-tracker/applications", json={"company_name": f"Cc{i}", "status": "applied"})
+
+        url = "/job-tracker/applications/pipeline/column?status=applied&page_size=2"
+        names, cursor = [], None
+        for _ in range(3):
+            data = (await client.get(url + (f"&cursor={cursor}" if cursor else ""))).json()
+            names += [item["company_name"] for item in data["items"]]
+            cursor = data["next_cursor"]
+        assert cursor is None and data["has_next"] is False
+        full = (await client.get("/job-tracker/applications/pipeline/column?status=applied&page_size=10")).json()
+        assert names == [item["company_name"] for item in full["items"]]
+
+    async def test_column_last_full_page_has_no_next(self, client):
+        for i in range(4):
+            await client.post("/job-tracker/applications", json={"company_name": f"Lf{i}", "status": "applied"})
+
+        url = "/job-tracker/applications/pipeline/column?status=applied&page_size=2"
+        first = (await client.get(url)).json()
+        assert first["total"] == 4 and first["has_next"] is True
+        last = (await client.get(f"{url}&cursor={first['next_cursor']}")).json()
+        assert len(last["items"]) == 2
+        assert last["total"] is None and last["has_next"] is False and last["next_cursor"] is None
+
     async def test_column_page_size_capped_at_100(self, client):
         response = await client.get("/job-tracker/applications/pipeline/column?status=applied&page_size=101")
         assert response.status_code == 422
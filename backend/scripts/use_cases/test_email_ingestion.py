@@ -45,7 +45,7 @@ class TestEmailReferenceRepository:
             await repo.create_from_raw_message(make_email_data(f"p{i}"))
         await db_session.commit()
 
-        items, total = await repo.list_paginated(limit=3, offset=0)
+        items, total, _ = await repo.list_paginated(limit=3, offset=0)
         assert total == 5
         assert len(items) == 3
 
@@ -94,6 +94,50 @@ class TestEmailsEndpoint:
         assert data["total"] == 5
         assert len(data["items"]) == 2
 
+    async def test_cursor_pagination(self, client, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+
+        # Same received_at for all: the id tiebreaker keeps pages disjoint.
+        await EmailReferenceRepository(db_session).bulk_create([make_email_data(f"cur{i}") for i in range(5)])
+        await db_session.commit()
+
+        ids, cursor = [], None
+        for _ in range(3):
+            data = (await client.get("/job-tracker/emails?limit=2" + (f"&cursor={cursor}" if cursor else ""))).json()
+            ids += [item["id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+        assert cursor is None
+        assert ids == sorted(ids, reverse=True) and len(set(ids)) == 5
+        assert (await client.get("/job-tracker/emails?cursor=%%%")).status_code == 400
+
+    async def test_last_full_page_has_no_cursor(self, client, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+
+        await EmailReferenceRepository(db_session).bulk_create([make_email_data(f"full{i}") for i in range(4)])
+        await db_session.commit()
+
+        first = (await client.get("/job-tracker/emails?limit=2")).json()
+        assert first["total"] == 4 and first["next_cursor"] is not None
+        # Cursor pages skip the count, and the page that ends the list says so.
+        last = (await client.get(f"/job-tracker/emails?limit=2&cursor={first['next_cursor']}")).json()
+        assert len(last["items"]) == 2
+        assert last["total"] is None and last["next_cursor"] is None
+
+    async def test_search_ranks_subject_matches_first(self, client, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+
+        await EmailReferenceRepository(db_session).bulk_create([
+            {**make_email_data("body"), "subject": "Update", "body_text": "Your Globex interview is booked"},
+            {**make_email_data("subj"), "subject": "Globex interview"},
+            {**make_email_data("none"), "subject": "Newsletter"},
+        ])
+        await db_session.commit()
+
+        data = (await client.get("/job-tracker/emails?search=globex")).json()
+        assert data["total"] == 2
+        assert [item["gmail_message_id"] for item in data["items"]] == ["msg-subj", "msg-body"]
+        assert data["next_cursor"] is None
+
     async def test_scan_without_config_returns_error_or_runs(self, client):
         """Scan endpoint responds: 503/502 if Gmail is not configured, 202 if it succeeds."""
         response = await client.post("/job-tracker/scan")
@@ -124,3 +168,504 @@ class TestBulkInsertIdempotency:
         await db_session.commit()
         assert inserted2 == 0
         assert skipped2 == 1
+
+    async def test_conflict_keeps_pending_session_work(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+
+        repo = EmailReferenceRepository(db_session)
+        await repo.bulk_create([make_email_data("taken")])
+        await db_session.commit()
+
+        app = await JobApplicationRepository(db_session).create({"company_name": "Acme"})
+        inserted, skipped = await repo.bulk_create([make_email_data("taken"), make_email_data("fresh")])
+        await db_session.commit()
+
+        assert (inserted, skipped) == (1, 1)
+        assert await JobApplicationRepository(db_session).get_by_id(app.id) is not None
+
+    async def test_insert_chunk_stays_under_the_parameter_limit(self, db_session):
+        from sqlalchemy import event
+
+        from app.job_tracker.repositories import email_reference_repository
+
+        inserts = []
+
+        def _capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("INSERT"):
+                inserts.append(parameters)
+
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", _capture)
+        try:
+            await email_reference_repository.EmailReferenceRepository(db_session).bulk_create([make_email_data("param")])
+        finally:
+            event.remove(engine, "before_cursor_execute", _capture)
+
+        [per_row] = [len(parameters) for parameters in inserts]
+        # asyncpg caps a statement at 32767 bind parameters.
+        assert per_row * email_reference_repository._INSERT_CHUNK_SIZE <= 32767
+
+
+@pytest.mark.asyncio
+class TestScanRunHistoryId:
+    async def test_last_history_id_comes_from_latest_completed_run(self, db_session):
+        from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+
+        repo = ScanRunRepository(db_session)
+        assert await repo.get_last_history_id() is None
+
+        first = await repo.create()
+        await repo.complete(first.id, emails_fetched=1, emails_inserted=1, apps_created=0, history_id="100")
+        second = await repo.create()
+        await repo.complete(second.id, emails_fetched=1, emails_inserted=0, apps_created=0, history_id="200")
+        failed = await repo.create()
+        await repo.fail(failed.id, "boom")
+        await db_session.commit()
+
+        assert await repo.get_last_history_id() == "200"
+
+
+class FakeGmailClient:
+    """Stands in for GmailClient: serves canned messages and records fetched IDs."""
+
+    batch_size_hint = 1
+    has_gaps = False
+
+    def __init__(self, messages: list[dict], fail_after: int | None = None):
+        self._messages = {m["gmail_message_id"]: m for m in messages}
+        self._order = list(self._messages)
+        self._fail_after = fail_after
+        self.fetched_ids: list[str] = []
+        self.latest_history_id = None
+
+    def list_message_ids(self, start_history_id=None) -> list[str]:
+        return list(self._messages)
+
+    def fetch_batch(self, message_ids: list[str], metadata_filter=None) -> list[dict]:
+        # Messages from position fail_after onwards fail, whichever thread fetches them.
+        if self._fail_after is not None and any(
+            self._order.index(mid) >= self._fail_after for mid in message_ids
+        ):
+            raise RuntimeError("Gmail went away")
+        self.fetched_ids.extend(message_ids)
+        return [self._messages[mid] for mid in message_ids]
+
+    def fetch_stats(self) -> dict:
+        return {"batches": len(self.fetched_ids)}
+
+
+@pytest.mark.asyncio
+class TestScanSkipsKnownMessages:
+    async def test_already_stored_ids_are_not_fetched_again(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        repo = EmailReferenceRepository(db_session)
+        await repo.bulk_create([make_email_data("known")])
+        await db_session.commit()
+
+        client = FakeGmailClient([make_email_data("known"), make_email_data("new")])
+        service = EmailScanService(client, repo, scan_run_repo=ScanRunRepository(db_session))
+        result = await service.scan_for_applications()
+
+        assert client.fetched_ids == ["msg-new"]
+        assert result["inserted"] == 1
+        assert result["fetches_avoided"] == 1
+
+        runs = await ScanRunRepository(db_session).list_recent()
+        assert runs[0].fetches_avoided == 1
+
+    async def test_update_parsed_fields_keeps_links_and_thread_ids(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+
+        repo = EmailReferenceRepository(db_session)
+        await repo.bulk_create([{**make_email_data("r1"), "gmail_thread_id": "t1"}])
+        await db_session.commit()
+
+        reparsed = {
+            **make_email_data("r1"),
+            "gmail_thread_id": None,
+            "subject": "Reparsed subject",
+            "body_text": "full body",
+        }
+        assert await repo.update_parsed_fields([reparsed]) == 1
+        await db_session.commit()
+
+        rows, _, _ = await repo.list_paginated(limit=10, offset=0)
+        await db_session.refresh(rows[0])
+        assert rows[0].subject == "Reparsed subject"
+        assert rows[0].body_text == "full body"
+        assert rows[0].gmail_thread_id == "t1"
+
+    async def test_reparsed_unlinked_emails_are_matched_again(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+        from app.job_tracker.services.emails.email_matcher import MATCHER_VERSION
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        repo = EmailReferenceRepository(db_session)
+        app_repo = JobApplicationRepository(db_session)
+        initech = await app_repo.create({"company_name": "Initech"})
+        await db_session.commit()
+        initech_id = initech.id
+
+        # Parsed badly the first time: matches nothing and is stamped.
+        client = FakeGmailClient([{**make_email_data("rp"), "subject": "Interview invitation"}])
+        await EmailScanService(client, repo, app_repo=app_repo).scan_for_applications()
+        assert await repo.list_unlinked(stale_for_version=MATCHER_VERSION) == []
+
+        reparsed = {**make_email_data("rp"), "subject": "Interview invitation from Initech"}
+        await repo.update_parsed_fields([reparsed])
+        await db_session.commit()
+        assert len(await repo.list_unlinked(stale_for_version=MATCHER_VERSION)) == 1
+
+        await EmailScanService(FakeGmailClient([]), repo, app_repo=app_repo).scan_for_applications()
+        db_session.expire_all()
+        linked = await app_repo.get_by_id(initech_id)
+        assert [email.gmail_message_id for email in linked.emails] == ["msg-rp"]
+
+    async def test_list_existing_message_ids(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+
+        repo = EmailReferenceRepository(db_session)
+        await repo.bulk_create([make_email_data("e1"), make_email_data("e2")])
+        await db_session.commit()
+
+        existing = await repo.list_existing_message_ids(["msg-e1", "msg-e2", "msg-e3"])
+        assert existing == {"msg-e1", "msg-e2"}
+
+
+@pytest.mark.asyncio
+class TestStreamingScanPipeline:
+    async def test_every_streamed_batch_is_inserted(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        repo = EmailReferenceRepository(db_session)
+        client = FakeGmailClient([make_email_data(f"s{i}") for i in range(7)])
+        progress: list[tuple[str, str]] = []
+
+        result = await EmailScanService(client, repo).scan_for_applications(
+            on_progress=lambda stage, detail: progress.append((stage, detail))
+        )
+
+        assert result["inserted"] == 7
+        _, total, _ = await repo.list_paginated(limit=10, offset=0)
+        assert total == 7
+        assert ("fetching", "Fetched 7 emails from Gmail") in progress
+
+    async def test_fetch_error_mid_stream_fails_scan_but_keeps_saved_batches(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        repo = EmailReferenceRepository(db_session)
+        client = FakeGmailClient([make_email_data(f"f{i}") for i in range(5)], fail_after=2)
+        service = EmailScanService(client, repo, scan_run_repo=ScanRunRepository(db_session))
+
+        with pytest.raises(RuntimeError, match="Gmail went away"):
+            await service.scan_for_applications()
+
+        _, total, _ = await repo.list_paginated(limit=10, offset=0)
+        assert total == 2
+        runs = await ScanRunRepository(db_session).list_recent()
+        assert runs[0].status == "failed"
+
+    async def test_backfill_saves_in_one_batch_and_ignores_history(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        scan_runs = ScanRunRepository(db_session)
+        run = await scan_runs.create()
+        await scan_runs.complete(run.id, emails_fetched=0, emails_inserted=0, apps_created=0, history_id="100")
+        await db_session.commit()
+
+        class RecordingFakeGmailClient(FakeGmailClient):
+            def list_message_ids(self, start_history_id=None):
+                self.start_history_id = start_history_id
+                return super().list_message_ids(start_history_id)
+
+        repo = EmailReferenceRepository(db_session)
+        copies: list[int] = []
+        copy_create = repo.copy_create
+
+        async def recording_copy_create(items):
+            copies.append(len(items))
+            return await copy_create(items)
+
+        repo.copy_create = recording_copy_create
+        client = RecordingFakeGmailClient([make_email_data(f"bf{i}") for i in range(6)])
+        service = EmailScanService(client, repo, scan_run_repo=scan_runs, backfill=True)
+        result = await service.scan_for_applications()
+
+        assert client.start_history_id is None
+        assert copies == [6]
+        assert result["inserted"] == 6
+
+    async def test_batches_are_fetched_concurrently(self, db_session):
+        import threading
+
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        # Each fetch waits until three are in flight at once; a serial
+        # pipeline would time out at the barrier.
+        barrier = threading.Barrier(3, timeout=5)
+
+        class ConcurrentFakeGmailClient(FakeGmailClient):
+            def fetch_batch(self, message_ids, metadata_filter=None):
+                barrier.wait()
+                return super().fetch_batch(message_ids, metadata_filter)
+
+        repo = EmailReferenceRepository(db_session)
+        client = ConcurrentFakeGmailClient([make_email_data(f"c{i}") for i in range(6)])
+
+        result = await EmailScanService(client, repo).scan_for_applications()
+
+        assert result["inserted"] == 6
+        assert sorted(client.fetched_ids) == sorted(f"msg-c{i}" for i in range(6))
+
+
+@pytest.mark.asyncio
+class TestBatchedEmailActivity:
+    async def test_batch_applies_latest_date_and_folded_status(self, db_session):
+        import datetime as dt
+
+        from app.job_tracker.models.job_application import ApplicationStatus
+        from app.job_tracker.repositories.job_application_repository import (
+            EmailActivityBatch,
+            JobApplicationRepository,
+        )
+
+        repo = JobApplicationRepository(db_session)
+        day = lambda d: dt.datetime(2024, 1, d, 12, 0, 0, tzinfo=dt.timezone.utc)  # noqa: E731
+        acme = await repo.create({"company_name": "Acme", "status": "applied"})
+        beta = await repo.create({"company_name": "Beta", "status": "applied", "last_email_at": day(20)})
+        await db_session.commit()
+        beta_updated_at = beta.updated_at
+
+        batch = EmailActivityBatch()
+        assert batch.record(acme, day(3), ApplicationStatus.INTERVIEWING) is True
+        # Rejection can no longer override interviewing; offer still upgrades.
+        assert batch.record(acme, day(5), ApplicationStatus.REJECTED) is False
+        assert batch.record(acme, day(4), ApplicationStatus.OFFER) is True
+        # Older than the stored date and no status change: row left untouched.
+        assert batch.record(beta, day(10), ApplicationStatus.APPLIED) is False
+
+        assert await repo.apply_email_activity(batch) == 2
+        await db_session.commit()
+
+        assert acme.status == ApplicationStatus.OFFER
+        acme_id, beta_id = acme.id, beta.id
+        db_session.expire_all()
+        acme = await repo.get_by_id(acme_id)
+        beta = await repo.get_by_id(beta_id)
+        assert acme.status == ApplicationStatus.OFFER
+        assert (acme.email_count, beta.email_count) == (3, 1)
+        assert acme.last_email_at.replace(tzinfo=dt.timezone.utc) == day(5)
+        assert beta.last_email_at.replace(tzinfo=dt.timezone.utc) == day(20)
+        assert beta.updated_at.replace(tzinfo=dt.timezone.utc) == beta_updated_at
+
+    async def test_batch_accepts_match_rows(self, db_session):
+        import datetime as dt
+
+        from app.job_tracker.models.job_application import ApplicationStatus
+        from app.job_tracker.repositories.job_application_repository import (
+            EmailActivityBatch,
+            JobApplicationRepository,
+        )
+
+        repo = JobApplicationRepository(db_session)
+        app = await repo.create({"company_name": "Acme", "role_title": "Backend Engineer"})
+        await db_session.commit()
+        app_id = app.id
+        db_session.expire_all()
+
+        [row] = await repo.list_match_rows()
+        assert (row.id, row.status) == (app_id, ApplicationStatus.APPLIED)
+        assert row.dedup_key == ("acme", "backend engineer")
+
+        received_at = dt.datetime(2024, 2, 1, tzinfo=dt.timezone.utc)
+        batch = EmailActivityBatch()
+        assert batch.record(row, received_at, ApplicationStatus.INTERVIEWING) is True
+        assert row.status == ApplicationStatus.INTERVIEWING
+        await repo.apply_email_activity(batch)
+        await db_session.commit()
+
+        db_session.expire_all()
+        app = await repo.get_by_id(app_id)
+        assert app.status == ApplicationStatus.INTERVIEWING
+        assert app.last_email_at.replace(tzinfo=dt.timezone.utc) == received_at
+
+    async def test_scan_links_emails_with_batched_updates(self, db_session):
+        from app.job_tracker.models.job_application import ApplicationStatus
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        app_repo = JobApplicationRepository(db_session)
+        app = await app_repo.create({"company_name": "Acme", "status": "applied"})
+        await db_session.commit()
+
+        interview = {**make_email_data("i1"), "subject": "Interview invitation from Acme"}
+        client = FakeGmailClient([make_email_data("l1"), interview])
+        repo = EmailReferenceRepository(db_session)
+        await EmailScanService(client, repo, app_repo=app_repo).scan_for_applications()
+
+        app_id = app.id
+        db_session.expire_all()
+        app = await app_repo.get_by_id(app_id)
+        assert len(app.emails) == 2
+        assert app.email_count == 2
+        assert app.status == ApplicationStatus.INTERVIEWING
+        assert app.last_email_at is not None
+
+    async def test_matching_sees_statuses_from_the_start_of_the_stage(self, db_session):
+        import datetime as dt
+
+        from app.job_tracker.models.job_application import ApplicationStatus
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        app_repo = JobApplicationRepository(db_session)
+        labs = await app_repo.create({"company_name": "Acme Labs"})
+        robotics = await app_repo.create({"company_name": "Acme Robotics"})
+        await db_session.commit()
+        labs_id, robotics_id = labs.id, robotics.id
+
+        rejection = {
+            **make_email_data("rej"),
+            "subject": "Acme Robotics: unfortunately we will not be moving forward",
+        }
+        # Only the sender domain points at Acme, and both applications share it.
+        follow_up = {
+            **make_email_data("later"),
+            "subject": "Your application status",
+            "received_at": rejection["received_at"] + dt.timedelta(days=1),
+        }
+        repo = EmailReferenceRepository(db_session)
+        client = FakeGmailClient([rejection, follow_up])
+        await EmailScanService(client, repo, app_repo=app_repo).scan_for_applications()
+
+        db_session.expire_all()
+        robotics = await app_repo.get_by_id(robotics_id)
+        assert robotics.status == ApplicationStatus.REJECTED
+        # The domain fallback prefers active applications, but the stage
+        # matches every email against the statuses it started with: the
+        # follow-up still goes to the newest candidate, not to Acme Labs.
+        assert sorted(email.gmail_message_id for email in robotics.emails) == ["msg-later", "msg-rej"]
+        assert (await app_repo.get_by_id(labs_id)).emails == []
+
+
+@pytest.mark.asyncio
+class TestIncrementalMatching:
+    async def test_evaluated_emails_are_skipped_until_applications_change(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+        from app.job_tracker.services.emails.email_matcher import MATCHER_VERSION
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+        from app.job_tracker.services.job_application_service import JobApplicationService
+
+        repo = EmailReferenceRepository(db_session)
+        app_repo = JobApplicationRepository(db_session)
+        await app_repo.create({"company_name": "Globex"})
+        await db_session.commit()
+
+        # Match no application and parse into none: both stay unlinked.
+        client = FakeGmailClient(
+            [
+                {**make_email_data("inc"), "subject": "Interview with Initech"},
+                {**make_email_data("other"), "subject": "Interview with Umbrella"},
+            ]
+        )
+        result = await EmailScanService(client, repo, app_repo=app_repo).scan_for_applications()
+        assert result["applications_created"] == 0
+
+        assert len(await repo.list_unlinked()) == 2
+        assert await repo.list_unlinked(stale_for_version=MATCHER_VERSION) == []
+        assert await repo.list_unlinked(stale_for_version=MATCHER_VERSION + 1) != []
+
+        # Only the mail the new application can match is due again.
+        initech = await JobApplicationService(app_repo, repo).create({"company_name": "Initech"})
+        due = await repo.list_unlinked(stale_for_version=MATCHER_VERSION)
+        assert [email.gmail_message_id for email in due] == ["msg-inc"]
+
+        await EmailScanService(FakeGmailClient([]), repo, app_repo=app_repo).scan_for_applications()
+        assert [email.gmail_message_id for email in await repo.list_unlinked()] == ["msg-other"]
+        initech_id = initech.id
+        db_session.expire_all()
+        linked = await app_repo.get_by_id(initech_id)
+        assert [email.gmail_message_id for email in linked.emails] == ["msg-inc"]
+
+    async def test_renaming_an_application_reopens_only_mail_it_can_match(self, db_session):
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+        from app.job_tracker.services.emails.email_matcher import MATCHER_VERSION
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+        from app.job_tracker.services.job_application_service import JobApplicationService
+
+        repo = EmailReferenceRepository(db_session)
+        app_repo = JobApplicationRepository(db_session)
+        globex = await app_repo.create({"company_name": "Globex"})
+        await db_session.commit()
+
+        client = FakeGmailClient(
+            [
+                {**make_email_data("inc"), "subject": "Interview with Initech"},
+                {**make_email_data("other"), "subject": "Interview with Umbrella"},
+            ]
+        )
+        await EmailScanService(client, repo, app_repo=app_repo).scan_for_applications()
+        service = JobApplicationService(app_repo, repo)
+
+        await service.update(globex.id, {"notes": "Referred by a friend"})
+        assert await repo.list_unlinked(stale_for_version=MATCHER_VERSION) == []
+
+        await service.update(globex.id, {"company_name": "Umbrella"})
+        due = await repo.list_unlinked(stale_for_version=MATCHER_VERSION)
+        assert [email.gmail_message_id for email in due] == ["msg-other"]
+
+
+@pytest.mark.asyncio
+class TestThreadLinking:
+    async def test_replies_follow_the_linked_thread(self, db_session):
+        import datetime as dt
+
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        repo = EmailReferenceRepository(db_session)
+        app_repo = JobApplicationRepository(db_session)
+        acme = await app_repo.create({"company_name": "Acme"})
+        globex = await app_repo.create({"company_name": "Globex"})
+        await db_session.commit()
+        acme_id, globex_id = acme.id, globex.id
+
+        # The first message of thread t1 was linked to Globex by hand.
+        await repo.bulk_create([{**make_email_data("t1-first"), "gmail_thread_id": "t1"}])
+        [first] = await repo.list_unlinked()
+        first.application_id = globex_id
+        await db_session.commit()
+        assert await repo.map_thread_applications(["t1", "t2"]) == {"t1": globex_id}
+
+        later = dt.datetime(2024, 1, 2, tzinfo=dt.timezone.utc)
+        client = FakeGmailClient([
+            # Names Acme, but its thread is already Globex's.
+            {**make_email_data("t1-reply"), "gmail_thread_id": "t1", "subject": "Re: Acme interview"},
+            # A new thread: the earliest matched message decides for its replies.
+            {**make_email_data("t2-first"), "gmail_thread_id": "t2", "subject": "Interview at Acme"},
+            {**make_email_data("t2-reply"), "gmail_thread_id": "t2", "subject": "Re: scheduling",
+             "sender": "someone@gmail.com", "received_at": later},
+        ])
+        await EmailScanService(client, repo, app_repo=app_repo).scan_for_applications()
+
+        db_session.expire_all()
+        acme = await app_repo.get_by_id(acme_id)
+        globex = await app_repo.get_by_id(globex_id)
+        assert sorted(e.gmail_message_id for e in globex.emails) == ["msg-t1-first", "msg-t1-reply"]
+        assert sorted(e.gmail_message_id for e in acme.emails) == ["msg-t2-first", "msg-t2-reply"]
@@ -1,5 +1,7 @@
 from unittest.mock import MagicMock
 
+import pytest
+
 
 class TestDomainHelpers:
     def test_extract_email_domain_simple(self):
@@ -205,3 +207,154 @@ class TestApplicationMatcher:
         )
         result = match_email_to_application(email, apps)
         assert result is None
+
+
+class TestMatcherIndex:
+    def _make_app(self, company: str, role: str | None = None, app_id: int = 1, status: str = "applied"):
+        app = MagicMock()
+        app.company_name = company
+        app.role_title = role
+        app.status = status
+        app.id = app_id
+        return app
+
+    def _make_email(self, subject: str, sender: str = ""):
+        email = MagicMock()
+        email.subject = subject
+        email.sender = sender
+        return email
+
+    def test_candidate_lookup_keeps_linear_scan_results(self):
+        from app.job_tracker.services.emails.email_matcher import MatcherIndex
+
+        apps = [
+            self._make_app("Google", "SWE", app_id=1),
+            self._make_app("Google Cloud", "Backend Engineer", app_id=2),
+            self._make_app("HP", "QA Engineer", app_id=3),
+            self._make_app("Melio", "Full Stack Engineer", app_id=4),
+            self._make_app("Stripe", None, app_id=5),
+            self._make_app("Acme Corp", "Data Scientist", app_id=6),
+        ]
+        emails = [
+            self._make_email("Application status update from Google"),
+            self._make_email("Backend Engineer at Google Cloud"),
+            self._make_email("Your HP interview", sender="jobs@hp.com"),
+            self._make_email("Full Stack Engineer at Gotfriends", sender="jobalerts-noreply@linkedin.com"),
+            self._make_email("Next steps", sender="recruiter@stripe.com"),
+            self._make_email("Hello", sender="careers@acme.com"),
+            self._make_email("Nothing relevant", sender="someone@gmail.com"),
+        ]
+
+        index = MatcherIndex(apps)
+        assert index.match(emails[0]) is apps[0]
+        assert index.match(emails[1]) is apps[1]
+        assert index.match(emails[2]) is apps[2]
+        assert index.match(emails[3]) is None
+        assert index.match(emails[4]) is apps[4]
+        assert index.match(emails[5]) is apps[5]
+        assert index.match(emails[6]) is None
+
+    def test_added_application_is_matched(self):
+        from app.job_tracker.services.emails.email_matcher import MatcherIndex
+
+        index = MatcherIndex([self._make_app("Google", "SWE", app_id=1)])
+        email = self._make_email("Interview invitation from Wix", sender="talent@wix.com")
+        assert index.match(email) is None
+
+        wix = self._make_app("Wix", "Frontend Developer", app_id=2)
+        index.add(wix)
+        assert len(index) == 2
+        assert index.match(email) is wix
+
+
+@pytest.mark.asyncio
+class TestClassify:
+    async def test_process_pool_matches_inline_results(self, monkeypatch):
+        from app.config import Settings
+        from app.job_tracker.models.job_application import ApplicationStatus
+        from app.job_tracker.repositories.job_application_repository import ApplicationMatchRow
+        from app.job_tracker.services.emails import email_classifier
+        from app.job_tracker.services.emails.email_classifier import (
+            ApplicationSnapshot,
+            classify,
+            filter_job_messages,
+            match_emails,
+            parse_emails,
+            shutdown_classify_pool,
+        )
+
+        applications = ApplicationSnapshot([
+            ApplicationMatchRow(1, "Google", "SWE", ApplicationStatus.APPLIED),
+            ApplicationMatchRow(2, "Acme Corp", "Data Scientist", ApplicationStatus.APPLIED),
+        ])
+        emails = [
+            {"subject": "Interview invitation from Google", "snippet": "", "body_text": None,
+             "sender": "jobs@google.com", "received_at": None},
+            {"subject": "Thank you for applying to Initech", "snippet": "Your application", "body_text": None,
+             "sender": "careers@initech.com", "received_at": None},
+            {"subject": "Your order has shipped", "snippet": "", "body_text": None,
+             "sender": "orders@shop.com", "received_at": None},
+        ] * 3
+
+        inline = [
+            filter_job_messages(emails),
+            match_emails(emails, applications),
+            parse_emails(emails),
+        ]
+        monkeypatch.setattr(email_classifier, "get_settings", lambda: Settings(SCAN_CLASSIFY_PROCESSES=2, _env_file=None))
+        monkeypatch.setattr(email_classifier, "_CLASSIFY_MIN_ITEMS", 1)
+        try:
+            pooled = [
+                await classify(filter_job_messages, emails),
+                await classify(match_emails, emails, applications),
+                await classify(parse_emails, emails),
+            ]
+        finally:
+            shutdown_classify_pool()
+
+        assert pooled == inline
+        assert inline[0] == [True, True, False] * 3
+        assert [m and m[0] for m in inline[1][:3]] == [1, None, None]
+        assert inline[2][1][0]["company_name"] == "Initech"
+
+    async def test_small_batches_run_inline(self, monkeypatch):
+        from app.config import Settings
+        from app.job_tracker.services.emails import email_classifier
+        from app.job_tracker.services.emails.email_classifier import classify, filter_job_messages
+
+        monkeypatch.setattr(email_classifier, "get_settings", lambda: Settings(SCAN_CLASSIFY_PROCESSES=2, _env_file=None))
+        monkeypatch.setattr(email_classifier, "_get_pool", lambda: pytest.fail("small batch sent to the pool"))
+
+        emails = [{"subject": "Interview invitation", "snippet": "", "body_text": None}] * 3
+        assert await classify(filter_job_messages, emails) == [True] * 3
+
+    async def test_batches_of_a_large_stage_use_the_pool(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.config import Settings
+        from app.job_tracker.services.emails import email_classifier
+        from app.job_tracker.services.emails.email_classifier import classify, filter_job_messages
+
+        monkeypatch.setattr(email_classifier, "get_settings", lambda: Settings(SCAN_CLASSIFY_PROCESSES=2, _env_file=None))
+        pool = ThreadPoolExecutor(max_workers=2)
+        submitted = []
+        monkeypatch.setattr(email_classifier, "_get_pool", lambda: submitted.append(True) or pool)
+
+        emails = [{"subject": "Interview invitation", "snippet": "", "body_text": None}] * 3
+        try:
+            assert await classify(filter_job_messages, emails, total_items=10_000) == [True] * 3
+        finally:
+            pool.shutdown()
+        assert submitted
+
+    async def test_matcher_index_is_reused_for_the_same_applications(self):
+        from app.job_tracker.models.job_application import ApplicationStatus
+        from app.job_tracker.repositories.job_application_repository import ApplicationMatchRow
+        from app.job_tracker.services.emails.email_classifier import ApplicationSnapshot, _snapshot_matcher
+
+        rows = [ApplicationMatchRow(1, "Google", "SWE", ApplicationStatus.APPLIED)]
+        matcher = _snapshot_matcher(ApplicationSnapshot(rows))
+        assert _snapshot_matcher(ApplicationSnapshot(rows)) is matcher
+
+        rows[0].status = ApplicationStatus.INTERVIEWING
+        assert _snapshot_matcher(ApplicationSnapshot(rows)) is not matcher
@@ -66,6 +66,28 @@ class TestKeywordMatching:
         assert matches_job_keywords("INTERVIEW SCHEDULED", None) is True
 
 
+class TestMetadataPrefilter:
+    def test_keyword_in_subject_needs_body(self):
+        from app.job_tracker.services.emails.email_matcher import may_match_job_keywords
+
+        assert may_match_job_keywords("Interview next week", "Hi") is True
+
+    def test_exclusion_phrase_is_decisive_without_body(self):
+        from app.job_tracker.services.emails.email_matcher import may_match_job_keywords
+
+        assert may_match_job_keywords("Interview prep: Dana wants to connect", "x" * 300) is False
+
+    def test_short_snippet_without_keywords_is_decisive(self):
+        from app.job_tracker.services.emails.email_matcher import may_match_job_keywords
+
+        assert may_match_job_keywords("Weekly newsletter", "Top stories this week") is False
+
+    def test_truncated_snippet_without_keywords_is_undecided(self):
+        from app.job_tracker.services.emails.email_matcher import may_match_job_keywords
+
+        assert may_match_job_keywords("Hello", "Thanks for reaching out " * 10) is True
+
+
 class TestParseApplicationFromEmail:
     def _make_email(self, subject=None, snippet=None, sender="recruiter@acme.com"):
         email = MagicMock()
@@ -233,6 +255,22 @@ class TestWordBoundaryKeywordMatching:
 
         assert matches_job_keywords("Hello", "Greetings", "We received your application") is True
 
+    def test_exclusion_after_keyword_still_excludes(self):
+        from app.job_tracker.services.emails.email_matcher import matches_job_keywords
+
+        assert matches_job_keywords("Interview tips", "Dana wants to connect") is False
+
+    def test_exclusion_is_a_substring_match(self):
+        from app.job_tracker.services.emails.email_matcher import matches_job_keywords
+
+        assert matches_job_keywords("Hiring now", "Reconnect without delay") is False
+
+    def test_keyword_after_non_boundary_occurrence_matches(self):
+        from app.job_tracker.services.emails.email_matcher import matches_job_keywords
+
+        assert matches_job_keywords("Preinterview survey before your interview", None) is True
+        assert matches_job_keywords("Preinterview survey", None) is False
+
 
 class TestATSCompanyNameBlocklist:
     def _make_email(self, subject, sender="noreply@greenhouse.io"):
@@ -346,3 +384,49 @@ class TestStatusInferenceOrder:
 
         result = infer_status("Unfortunately, we cannot offer you a position")
         assert result == ApplicationStatus.REJECTED
+
+
+class TestApplicationEmailParser:
+    def _make_email(self, subject=None, snippet=None, sender="recruiter@acme.com"):
+        email = MagicMock()
+        email.subject = subject
+        email.snippet = snippet
+        email.sender = sender
+        email.body_text = None
+        email.received_at = dt.datetime(2024, 6, 1, 12, 0, 0, tzinfo=dt.timezone.utc)
+        return email
+
+    def test_exposes_pattern_that_fired(self):
+        from app.job_tracker.services.emails.email_parser import ApplicationEmailParser
+
+        parser = ApplicationEmailParser()
+        email = self._make_email("Interview invitation - Acme Corp")
+        assert parser.parse(email)["company_name"] == "Acme Corp"
+        assert parser.pattern_index(email) == 17
+        assert parser.pattern_index(self._make_email("Weekly newsletter")) is None
+
+    def test_parses_each_email_once_and_returns_copies(self, monkeypatch):
+        from app.job_tracker.services.emails import email_parser
+
+        calls = []
+        real = email_parser.parse_application_with_pattern
+        monkeypatch.setattr(
+            email_parser, "parse_application_with_pattern", lambda email: calls.append(email) or real(email)
+        )
+        parser = email_parser.ApplicationEmailParser()
+        email = self._make_email("Your application to Software Engineer at Acme Corp")
+
+        first = parser.parse(email)
+        first["role_title"] = "changed"
+        second = parser.parse(email)
+
+        assert len(calls) == 1
+        assert second["role_title"] == "Software Engineer"
+
+    def test_anchor_prefilter_respects_ignorecase_equivalents(self):
+        from app.job_tracker.services.emails.email_parser import parse_application_from_email
+
+        # re.IGNORECASE matches dotless "ı" to "i"; the prefilter must not drop it.
+        result = parse_application_from_email(self._make_email("APPLıCATION UPDATE FROM Acme Corp"))
+        assert result is not None
+        assert result["company_name"] == "Acme Corp"
@@ -1,7 +1,8 @@
-"""Tests for GmailClient: pagination, batch-get/429-retry, and credential handling.
+"""Tests for GmailClient: pagination, adaptive batch-get/retry, and credential handling.
 
 These mock the googleapiclient service object entirely — no real network I/O.
 """
+import json
 from unittest.mock import MagicMock
 
 import pytest
@@ -21,6 +22,7 @@ def _make_client(
     page_size: int = 50,
     batch_size: int = 10,
     retry_backoff_seconds: int = 0,
+    retry_budget_seconds: int = 0,
 ) -> GmailClient:
     return GmailClient(
         token_file=token_file,
@@ -30,6 +32,7 @@ def _make_client(
         page_size=page_size,
         batch_size=batch_size,
         retry_backoff_seconds=retry_backoff_seconds,
+        retry_budget_seconds=retry_budget_seconds,
     )
 
 
@@ -110,6 +113,107 @@ class TestFetchMessageDetailsBatchingAndRetry:
         results = client._fetch_message_details(service, ["good", "bad"])
 
         assert [r["gmail_message_id"] for r in results] == ["good"]
+        assert client.fetch_stats()["failed"] == 1
+        # It would fail the same way on the next scan, so it is no gap.
+        assert not client.has_gaps
+
+    def test_deleted_messages_are_skipped_without_counting(self):
+        client = _make_client()
+
+        def outcome_fn(request_id):
+            if request_id in ("deleted", "purged"):
+                return None, _make_http_error(404 if request_id == "deleted" else 410)
+            return {"id": request_id, "snippet": "ok", "payload": {}}, None
+
+        service = _make_service(outcome_fn)
+        results = client._fetch_message_details(service, ["good", "deleted", "purged"])
+
+        assert [r["gmail_message_id"] for r in results] == ["good"]
+        assert client.fetch_stats()["failed"] == 0
+        assert not client.has_gaps
+
+
+class TestAdaptiveBatchingAndBackoff:
+    def test_throttled_batch_halves_size_and_clean_batches_grow_it_back(self):
+        from app.job_tracker.email_scanner.batch_controller import AdaptiveBatchController
+
+        controller = AdaptiveBatchController(max_size=100)
+        controller.record_batch(100, throttled=3, server_errors=0, latency=0.2)
+        assert controller.size == 50
+        controller.record_batch(50, throttled=0, server_errors=1, latency=0.2)
+        assert controller.size == 25
+        controller.record_batch(25, throttled=0, server_errors=0, latency=0.1)
+        assert controller.size == 35
+        for _ in range(20):
+            controller.record_batch(35, throttled=0, server_errors=0, latency=0.1)
+        assert controller.size == 100
+
+    def test_messages_throttled_repeatedly_are_retried_within_budget(self):
+        client = _make_client(retry_budget_seconds=30)
+        attempt_counts: dict[str, int] = {}
+
+        def outcome_fn(request_id):
+            attempt_counts[request_id] = attempt_counts.get(request_id, 0) + 1
+            if request_id == "busy" and attempt_counts[request_id] <= 3:
+                return None, _make_http_error(503 if attempt_counts[request_id] == 2 else 429)
+            return {"id": request_id, "snippet": "ok", "payload": {}}, None
+
+        service = _make_service(outcome_fn)
+        results = client._fetch_message_details(service, ["ok1", "busy"])
+
+        assert [r["gmail_message_id"] for r in results] == ["ok1", "busy"]
+        assert attempt_counts["busy"] == 4
+        stats = client.fetch_stats()
+        assert stats["throttled"] == 2
+        assert stats["server_errors"] == 1
+        assert stats["retried"] == 3
+        assert stats["dropped"] == 0
+        assert not client.has_gaps
+
+    def test_whole_batch_rejection_is_retried(self):
+        client = _make_client()
+        calls = {"n": 0}
+
+        class RejectedOnceBatch(FakeBatch):
+            def execute(self):
+                calls["n"] += 1
+                if calls["n"] == 1:
+                    raise _make_http_error(429)
+                super().execute()
+
+        service = _make_service(lambda rid: ({"id": rid, "snippet": "", "payload": {}}, None))
+        service.new_batch_http_request.side_effect = lambda callback: RejectedOnceBatch(
+            callback, lambda rid: ({"id": rid, "snippet": "", "payload": {}}, None)
+        )
+
+        results = client._fetch_message_details(service, ["a", "b"])
+
+        assert [r["gmail_message_id"] for r in results] == ["a", "b"]
+        assert client.fetch_stats()["throttled"] == 2
+
+    def test_messages_still_throttled_after_budget_are_counted_as_dropped(self):
+        client = _make_client(retry_budget_seconds=0)
+        service = _make_service(lambda rid: (None, _make_http_error(429)))
+
+        results = client._fetch_message_details(service, ["stuck"])
+
+        assert results == []
+        stats = client.fetch_stats()
+        assert stats["retried"] == 1
+        assert stats["dropped"] == 1
+        assert stats["batches"] == 2
+        assert client.has_gaps
+
+    def test_iter_message_batches_follows_the_adaptive_size(self, monkeypatch):
+        client = _make_client(batch_size=4)
+        client._batch_controller.record_batch(4, throttled=1, server_errors=0, latency=0.0)
+        service = _make_service(lambda rid: ({"id": rid, "snippet": "", "payload": {}}, None))
+        monkeypatch.setattr(client, "_get_service", lambda: service)
+
+        batches = list(client.iter_message_batches(["a", "b", "c", "d", "e"]))
+
+        # 2 after the throttled batch, then +1 per clean batch (capped at 4).
+        assert [len(batch) for batch in batches] == [2, 3]
 
 
 class TestFetchRecentMessagesPagination:
@@ -166,6 +270,166 @@ class TestFetchRecentMessagesPagination:
         assert list_mock.call_count == 1  # no second page requested
 
 
+class TestDateShardedListing:
+    def test_long_window_is_listed_as_merged_date_shards(self, monkeypatch):
+        import datetime as dt
+
+        client = GmailClient(
+            token_file=None,
+            delegated_user=None,
+            query_window_days=90,
+            max_messages=4,
+            page_size=50,
+            list_shard_days=30,
+        )
+        today = dt.date.today()
+        newest = f"after:{(today - dt.timedelta(days=30)).isoformat()} ("
+        middle = (
+            f"after:{(today - dt.timedelta(days=60)).isoformat()} "
+            f"before:{(today - dt.timedelta(days=30)).isoformat()} ("
+        )
+        oldest = (
+            f"after:{(today - dt.timedelta(days=90)).isoformat()} "
+            f"before:{(today - dt.timedelta(days=60)).isoformat()} ("
+        )
+        shard_ids = {newest: ["n1", "n2"], middle: ["m1", "n2"], oldest: ["o1", "o2"]}
+        queries: list[str] = []
+
+        def list_side_effect(**kwargs):
+            queries.append(kwargs["q"])
+            prefix = next(p for p in shard_ids if kwargs["q"].startswith(p))
+            request = MagicMock()
+            request.execute.return_value = {"messages": [{"id": i} for i in shard_ids[prefix]]}
+            return request
+
+        service = MagicMock()
+        service.users.return_value.getProfile.return_value.execute.return_value = {"historyId": "1"}
+        service.users.return_value.messages.return_value.list.side_effect = list_side_effect
+        monkeypatch.setattr(client, "_get_service", lambda: service)
+
+        ids = client.list_message_ids()
+
+        assert len(queries) == 3
+        # Newest shard first, the duplicate dropped, capped at max_messages.
+        assert ids == ["n1", "n2", "m1", "o1"]
+
+    def test_default_window_is_a_single_open_ended_query(self):
+        client = _make_client(query_window_days=30)
+
+        shards = client._query_shards()
+
+        assert len(shards) == 1
+        assert shards[0][1] is None
+
+
+class TestSharedClientAcrossScans:
+    def test_make_gmail_client_reuses_one_client_per_settings(self, monkeypatch):
+        import asyncio
+
+        from app.config import get_settings
+        from app.job_tracker.api import deps
+
+        monkeypatch.setattr(deps, "_gmail_clients", {})
+        settings = get_settings()
+
+        first = deps.make_gmail_client(settings)
+        assert deps.make_gmail_client(settings) is first
+        changed = settings.model_copy(update={"GMAIL_MAX_MESSAGES": settings.GMAIL_MAX_MESSAGES + 1})
+        assert deps.make_gmail_client(changed) is not first
+
+        asyncio.run(deps.close_gmail_clients())
+        assert deps.make_gmail_client(settings) is not first
+
+    def test_listing_resets_per_scan_state(self, monkeypatch):
+        client = _make_client()
+        client.latest_history_id = "stale"
+        client._batch_controller.record_batch(10, throttled=1, server_errors=0, latency=0.1)
+
+        service = MagicMock()
+        service.users.return_value.getProfile.return_value.execute.return_value = {}
+        service.users.return_value.messages.return_value.list.return_value.execute.return_value = {}
+        monkeypatch.setattr(client, "_get_service", lambda: service)
+
+        client.list_message_ids()
+
+        assert client.latest_history_id is None
+        assert client.fetch_stats()["batches"] == 0
+
+    def test_refresh_credentials_refreshes_only_near_expiry(self, tmp_path):
+        import datetime as dt
+
+        client = _make_client(token_file=str(tmp_path / "token.json"))
+        creds = MagicMock()
+        creds.refresh_token = "rt"
+        creds.to_json.return_value = "{}"
+        client._credentials = creds
+        now = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+        creds.expiry = now + dt.timedelta(hours=1)
+        client.refresh_credentials(min_remaining_seconds=600)
+        creds.refresh.assert_not_called()
+
+        creds.expiry = now + dt.timedelta(minutes=5)
+        client.refresh_credentials(min_remaining_seconds=600)
+        creds.refresh.assert_called_once()
+        assert (tmp_path / "token.json").read_text() == "{}"
+
+
+class TestPayloadCache:
+    def test_round_trip_and_lru_eviction(self, tmp_path):
+        import os
+        import time
+
+        from app.job_tracker.email_scanner.payload_cache import PayloadCache
+
+        cache = PayloadCache(str(tmp_path), max_bytes=10_000)
+        assert cache.get("missing") is None
+
+        cache.put("m1", {"id": "m1", "snippet": "hello"})
+        assert cache.get("m1") == {"id": "m1", "snippet": "hello"}
+
+        # Incompressible payloads so a handful overflow the limit.
+        for i in range(2, 8):
+            cache.put(f"m{i}", {"id": f"m{i}", "data": os.urandom(1500).hex()})
+            time.sleep(0.01)
+            cache.get("m1")  # keep m1 recently used
+
+        assert cache.get("m1") is not None
+        assert cache.get("m2") is None  # least recently used, evicted
+        assert sum(os.path.getsize(p) for p in cache._iter_paths()) <= 10_000
+
+    def test_fetch_batch_serves_cached_payloads_and_caches_full_fetches(self, tmp_path, monkeypatch):
+        from app.job_tracker.email_scanner.payload_cache import PayloadCache
+
+        cache = PayloadCache(str(tmp_path), max_bytes=1_000_000)
+        cache.put("cached", {"id": "cached", "snippet": "from disk", "payload": {}})
+        client = GmailClient(
+            token_file=None,
+            delegated_user=None,
+            query_window_days=30,
+            max_messages=10,
+            page_size=10,
+            payload_cache=cache,
+        )
+        requested: list[str] = []
+
+        def outcome_fn(request_id):
+            requested.append(request_id)
+            return {"id": request_id, "snippet": "from api", "payload": {}}, None
+
+        monkeypatch.setattr(client, "_get_service", lambda: _make_service(outcome_fn))
+
+        messages = client.fetch_batch(["cached", "fresh"])
+
+        assert requested == ["fresh"]
+        assert {m["gmail_message_id"]: m["snippet"] for m in messages} == {
+            "cached": "from disk",
+            "fresh": "from api",
+        }
+        assert cache.get("fresh")["snippet"] == "from api"
+        assert client.fetch_stats()["cache_hits"] == 1
+
+
 class TestBuildCredentials:
     def test_no_token_file_configured_raises_runtime_error(self):
         client = _make_client(token_file=None)
@@ -222,3 +486,445 @@ class TestBuildCredentials:
 
         assert creds is fake_creds
         fake_creds.refresh.assert_not_called()
+
+
+def _make_history_service(pages: list[dict]) -> tuple[MagicMock, MagicMock]:
+    call_index = {"n": 0}
+
+    def execute_side_effect():
+        page = pages[call_index["n"]]
+        call_index["n"] += 1
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+    history_list = MagicMock()
+    history_list.return_value.execute.side_effect = execute_side_effect
+
+    service = MagicMock()
+    service.users.return_value.history.return_value.list = history_list
+    return service, history_list
+
+
+class TestIncrementalHistorySync:
+    def test_lists_only_added_messages_and_records_new_history_id(self, monkeypatch):
+        client = _make_client()
+        service, history_list = _make_history_service([
+            {
+                "history": [
+                    {"id": "101", "messagesAdded": [{"message": {"id": "a", "labelIds": ["INBOX"]}}]},
+                    {"id": "102", "messagesAdded": [{"message": {"id": "b", "labelIds": ["DRAFT"]}}]},
+                ],
+                "nextPageToken": "p2",
+            },
+            {
+                "history": [{"id": "103", "messagesAdded": [{"message": {"id": "a"}}, {"message": {"id": "c"}}]}],
+                "historyId": "150",
+            },
+        ])
+        monkeypatch.setattr(client, "_get_service", lambda: service)
+        monkeypatch.setattr(
+            client, "_fetch_message_details", lambda svc, ids: [{"gmail_message_id": i} for i in ids]
+        )
+
+        results = client.fetch_recent_messages(start_history_id="100")
+
+        assert [r["gmail_message_id"] for r in results] == ["a", "c"]
+        assert client.latest_history_id == "150"
+        assert history_list.call_args_list[0].kwargs["startHistoryId"] == "100"
+        service.users.return_value.messages.return_value.list.assert_not_called()
+
+    def test_expired_history_falls_back_to_full_window_query(self, monkeypatch):
+        client = _make_client()
+        service, _ = _make_history_service([_make_http_error(404)])
+        service.users.return_value.getProfile.return_value.execute.return_value = {"historyId": "900"}
+        service.users.return_value.messages.return_value.list.return_value.execute.return_value = {
+            "messages": [{"id": "x"}],
+        }
+        monkeypatch.setattr(client, "_get_service", lambda: service)
+        monkeypatch.setattr(
+            client, "_fetch_message_details", lambda svc, ids: [{"gmail_message_id": i} for i in ids]
+        )
+
+        results = client.fetch_recent_messages(start_history_id="1")
+
+        assert [r["gmail_message_id"] for r in results] == ["x"]
+        assert client.latest_history_id == "900"
+
+    def test_max_messages_cut_resumes_from_last_consumed_record(self, monkeypatch):
+        client = _make_client(max_messages=2, page_size=2)
+        service, _ = _make_history_service([
+            {
+                "history": [
+                    {"id": "11", "messagesAdded": [{"message": {"id": "a"}}]},
+                    {"id": "12", "messagesAdded": [{"message": {"id": "b"}}, {"message": {"id": "c"}}]},
+                ],
+                "historyId": "20",
+            },
+        ])
+        monkeypatch.setattr(client, "_get_service", lambda: service)
+        monkeypatch.setattr(
+            client, "_fetch_message_details", lambda svc, ids: [{"gmail_message_id": i} for i in ids]
+        )
+
+        results = client.fetch_recent_messages(start_history_id="10")
+
+        assert [r["gmail_message_id"] for r in results] == ["a", "b"]
+        # Record 12 was only partly taken, so the next scan must start before it.
+        assert client.latest_history_id == "11"
+
+
+class TestTwoPhaseFetch:
+    def test_full_payload_fetched_only_for_messages_passing_metadata_filter(self, monkeypatch):
+        client = _make_client()
+        calls: list[tuple[str, list[str]]] = []
+
+        def fake_details(svc, ids, message_format="full"):
+            calls.append((message_format, list(ids)))
+            return [{"gmail_message_id": i, "subject": f"subject {i}", "snippet": ""} for i in ids]
+
+        monkeypatch.setattr(client, "_get_service", lambda: MagicMock())
+        monkeypatch.setattr(client, "_fetch_message_details", fake_details)
+
+        results = client.fetch_messages(
+            ["job", "noise"],
+            metadata_filter=lambda msg: msg["gmail_message_id"] == "job",
+        )
+
+        assert calls == [("metadata", ["job", "noise"]), ("full", ["job"])]
+        assert [r["gmail_message_id"] for r in results] == ["job"]
+
+    def test_metadata_request_asks_for_headers_only(self):
+        client = _make_client()
+        service = _make_service(lambda request_id: ({"id": request_id, "snippet": "s", "payload": {}}, None))
+
+        client._fetch_message_details(service, ["m1"], message_format="metadata")
+
+        get_kwargs = service.users.return_value.messages.return_value.get.call_args.kwargs
+        assert get_kwargs["format"] == "metadata"
+        assert get_kwargs["metadataHeaders"] == ["Subject", "From", "Date"]
+
+
+class TestIterMessageBatches:
+    def test_yields_one_parsed_list_per_chunk(self, monkeypatch):
+        client = _make_client(batch_size=2)
+        service = _make_service(lambda request_id: ({"id": request_id, "snippet": "", "payload": {}}, None))
+        monkeypatch.setattr(client, "_get_service", lambda: service)
+
+        batches = list(client.iter_message_batches(["a", "b", "c"]))
+
+        assert [[m["gmail_message_id"] for m in batch] for batch in batches] == [["a", "b"], ["c"]]
+
+    def test_each_thread_gets_its_own_service_and_transport(self, monkeypatch):
+        import threading
+
+        import app.job_tracker.email_scanner.gmail_client as gmail_client_module
+
+        client = _make_client()
+        creds = MagicMock()
+        builds: list[object] = []
+        monkeypatch.setattr(client, "_build_credentials", lambda: creds)
+
+        def fake_build(*args, http, **kwargs):
+            builds.append(http)
+            return MagicMock()
+
+        monkeypatch.setattr(gmail_client_module, "build", fake_build)
+
+        services: list[object] = []
+        threads = [threading.Thread(target=lambda: services.append(client._get_service())) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert services[0] is not services[1]
+        assert len(builds) == 2 and builds[0] is not builds[1]
+        assert client._get_service() is client._get_service()
+
+
+def _multipart_batch_response(parts: list[tuple[int, str, dict]]) -> tuple[str, bytes]:
+    """Build a Gmail-style multipart/mixed batch response from (status, content_id, body)."""
+    boundary = "batch_resp"
+    chunks = [
+        f"--{boundary}\r\n"
+        "Content-Type: application/http\r\n"
+        f"Content-ID: <response-{content_id}>\r\n"
+        "\r\n"
+        f"HTTP/1.1 {status} X\r\n"
+        "Content-Type: application/json; charset=UTF-8\r\n"
+        "\r\n"
+        f"{json.dumps(body)}\r\n"
+        for status, content_id, body in parts
+    ]
+    return f"multipart/mixed; boundary={boundary}", ("".join(chunks) + f"--{boundary}--\r\n").encode()
+
+
+@pytest.mark.asyncio
+class TestAsyncGmailClient:
+    def _make_async_client(self, handler, **overrides):
+        import httpx
+
+        from app.job_tracker.email_scanner.async_gmail_client import AsyncGmailClient
+
+        options = dict(
+            token_file=None,
+            delegated_user=None,
+            query_window_days=30,
+            max_messages=50,
+            page_size=50,
+            batch_size=10,
+            retry_backoff_seconds=0,
+            retry_budget_seconds=0,
+        )
+        options.update(overrides)
+        client = AsyncGmailClient(transport=httpx.MockTransport(handler), **options)
+        client._credentials = MagicMock(valid=True, token="tok")
+        return client
+
+    async def test_lists_and_batch_fetches_over_multipart(self):
+        import re
+
+        import httpx
+
+        batch_calls: list[list[str]] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.headers["Authorization"] == "Bearer tok"
+            if request.url.path == "/gmail/v1/users/me/profile":
+                return httpx.Response(200, json={"historyId": "77"})
+            if request.url.path == "/gmail/v1/users/me/messages":
+                assert "after:" in request.url.params["q"]
+                return httpx.Response(200, json={"messages": [{"id": "a"}, {"id": "b"}]})
+            assert request.url.path == "/batch/gmail/v1"
+            body = request.content.decode()
+            ids = re.findall(r"GET /gmail/v1/users/me/messages/(\w+)\?", body)
+            content_ids = re.findall(r"Content-ID: <(item-\d+)>", body)
+            batch_calls.append(ids)
+            parts = []
+            for msg_id, content_id in zip(ids, content_ids):
+                if msg_id == "b" and len(batch_calls) == 1:
+                    parts.append((429, content_id, {"error": {"code": 429}}))
+                else:
+                    parts.append((200, content_id, {"id": msg_id, "threadId": "t", "snippet": "hi", "payload": {}}))
+            content_type, content = _multipart_batch_response(parts)
+            return httpx.Response(200, content=content, headers={"Content-Type": content_type})
+
+        client = self._make_async_client(handler)
+        try:
+            messages = await client.fetch_recent_messages()
+        finally:
+            await client.aclose()
+
+        assert [m["gmail_message_id"] for m in messages] == ["a", "b"]
+        assert client.latest_history_id == "77"
+        assert batch_calls == [["a", "b"], ["b"]]
+        assert client.fetch_stats()["throttled"] == 1
+
+    async def test_payload_cache_is_read_and_written_off_the_event_loop(self, tmp_path):
+        import re
+        import threading
+
+        import httpx
+
+        from app.job_tracker.email_scanner.payload_cache import PayloadCache
+
+        cache = PayloadCache(str(tmp_path), max_bytes=1_000_000)
+        cache.put("cached", {"id": "cached", "snippet": "from disk", "payload": {}})
+        cache_threads: set[int] = set()
+        get, put = cache.get, cache.put
+
+        def tracked_get(message_id):
+            cache_threads.add(threading.get_ident())
+            return get(message_id)
+
+        def tracked_put(message_id, payload):
+            cache_threads.add(threading.get_ident())
+            put(message_id, payload)
+
+        cache.get, cache.put = tracked_get, tracked_put
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = request.content.decode()
+            ids = re.findall(r"GET /gmail/v1/users/me/messages/(\w+)\?", body)
+            content_ids = re.findall(r"Content-ID: <(item-\d+)>", body)
+            parts = [
+                (200, content_id, {"id": msg_id, "snippet": "from api", "payload": {}})
+                for msg_id, content_id in zip(ids, content_ids)
+            ]
+            content_type, content = _multipart_batch_response(parts)
+            return httpx.Response(200, content=content, headers={"Content-Type": content_type})
+
+        client = self._make_async_client(handler, payload_cache=cache)
+        try:
+            messages = await client.fetch_batch(["cached", "fresh"])
+        finally:
+            await client.aclose()
+
+        assert {m["gmail_message_id"]: m["snippet"] for m in messages} == {
+            "cached": "from disk",
+            "fresh": "from api",
+        }
+        assert get("fresh")["snippet"] == "from api"
+        assert client.fetch_stats()["cache_hits"] == 1
+        assert cache_threads and threading.get_ident() not in cache_threads
+
+    async def test_scan_withholds_history_id_when_messages_are_dropped(self, db_session):
+        import re
+
+        import httpx
+
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        throttle_b = True
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/profile"):
+                return httpx.Response(200, json={"historyId": "77"})
+            if request.url.path.endswith("/messages"):
+                return httpx.Response(200, json={"messages": [{"id": "a"}, {"id": "b"}]})
+            body = request.content.decode()
+            ids = re.findall(r"GET /gmail/v1/users/me/messages/(\w+)\?", body)
+            content_ids = re.findall(r"Content-ID: <(item-\d+)>", body)
+            parts = [
+                (429, content_id, {"error": {"code": 429}}) if msg_id == "b" and throttle_b
+                else (200, content_id, {"id": msg_id, "threadId": "t", "snippet": "Thank you for applying", "payload": {}})
+                for msg_id, content_id in zip(ids, content_ids)
+            ]
+            content_type, content = _multipart_batch_response(parts)
+            return httpx.Response(200, content=content, headers={"Content-Type": content_type})
+
+        client = self._make_async_client(handler)
+        scan_runs = ScanRunRepository(db_session)
+        service = EmailScanService(client, EmailReferenceRepository(db_session), scan_run_repo=scan_runs)
+        try:
+            # "b" is still throttled when the (zero) retry budget runs out.
+            first = await service.scan_for_applications()
+            assert first["fetch_stats"]["dropped"] == 1
+            assert await scan_runs.get_last_history_id() is None
+
+            throttle_b = False
+            await service.scan_for_applications()
+            assert await scan_runs.get_last_history_id() == "77"
+        finally:
+            await client.aclose()
+
+    async def test_scan_records_history_id_past_deleted_messages(self, db_session):
+        import re
+
+        import httpx
+
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/profile"):
+                return httpx.Response(200, json={"historyId": "77"})
+            if request.url.path.endswith("/messages"):
+                return httpx.Response(200, json={"messages": [{"id": "a"}]})
+            if request.url.path.endswith("/history"):
+                assert request.url.params["startHistoryId"] == "77"
+                added = [{"message": {"id": "gone"}}, {"message": {"id": "b"}}]
+                return httpx.Response(200, json={"history": [{"id": "80", "messagesAdded": added}], "historyId": "88"})
+            body = request.content.decode()
+            ids = re.findall(r"GET /gmail/v1/users/me/messages/(\w+)\?", body)
+            content_ids = re.findall(r"Content-ID: <(item-\d+)>", body)
+            parts = [
+                (404, content_id, {"error": {"code": 404}}) if msg_id == "gone"
+                else (200, content_id, {"id": msg_id, "threadId": msg_id, "snippet": "Thank you for applying", "payload": {}})
+                for msg_id, content_id in zip(ids, content_ids)
+            ]
+            content_type, content = _multipart_batch_response(parts)
+            return httpx.Response(200, content=content, headers={"Content-Type": content_type})
+
+        client = self._make_async_client(handler)
+        scan_runs = ScanRunRepository(db_session)
+        service = EmailScanService(client, EmailReferenceRepository(db_session), scan_run_repo=scan_runs)
+        try:
+            await service.scan_for_applications()
+            assert await scan_runs.get_last_history_id() == "77"
+
+            # "gone" was deleted after history listed it; the checkpoint still advances.
+            await service.scan_for_applications()
+            assert await scan_runs.get_last_history_id() == "88"
+        finally:
+            await client.aclose()
+
+    async def test_missing_batch_part_is_a_gap(self):
+        import re
+
+        import httpx
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = request.content.decode()
+            content_ids = re.findall(r"Content-ID: <(item-\d+)>", body)
+            parts = [(200, content_ids[0], {"id": "a", "snippet": "", "payload": {}})]
+            content_type, content = _multipart_batch_response(parts)
+            return httpx.Response(200, content=content, headers={"Content-Type": content_type})
+
+        client = self._make_async_client(handler)
+        try:
+            messages = await client.fetch_batch(["a", "b"])
+        finally:
+            await client.aclose()
+
+        assert [m["gmail_message_id"] for m in messages] == ["a"]
+        assert client.fetch_stats()["missing"] == 1
+        assert client.has_gaps
+
+    async def test_expired_history_falls_back_to_query_listing(self):
+        import httpx
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/history"):
+                return httpx.Response(404, json={"error": {"code": 404}})
+            if request.url.path.endswith("/profile"):
+                return httpx.Response(200, json={"historyId": "90"})
+            return httpx.Response(200, json={"messages": [{"id": "x"}]})
+
+        client = self._make_async_client(handler)
+        try:
+            ids = await client.list_message_ids(start_history_id="5")
+        finally:
+            await client.aclose()
+
+        assert ids == ["x"]
+        assert client.latest_history_id == "90"
+
+    async def test_scan_service_awaits_async_client_without_executor(self, db_session, monkeypatch):
+        from datetime import datetime, timezone
+
+        from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+        from app.job_tracker.services.emails import email_scan_service
+        from app.job_tracker.services.emails.email_scan_service import EmailScanService
+
+        class AsyncFakeClient:
+            batch_size_hint = 10
+            latest_history_id = None
+            has_gaps = False
+
+            async def list_message_ids(self, start_history_id=None):
+                return ["msg-1"]
+
+            async def fetch_batch(self, message_ids, metadata_filter=None):
+                return [{
+                    "gmail_message_id": mid,
+                    "subject": "Your application to Acme",
+                    "sender": "jobs@acme.com",
+                    "snippet": "Thank you for applying",
+                    "received_at": datetime.now(timezone.utc),
+                } for mid in message_ids]
+
+            def fetch_stats(self):
+                return {}
+
+        def no_executor():
+            raise AssertionError("executor used for the asyncio transport")
+
+        monkeypatch.setattr(email_scan_service, "_get_executor", no_executor)
+        result = await EmailScanService(AsyncFakeClient(), EmailReferenceRepository(db_session)).scan_for_applications()
+
+        assert result["inserted"] == 1
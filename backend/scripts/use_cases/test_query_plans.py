@@ -0,0 +1,157 @@
+"""Each hot repository query is served by the index meant for it.
+
+Plans come from SQLite's EXPLAIN QUERY PLAN; the indexes are the same ones
+migration 008 builds on PostgreSQL.
+"""
+import datetime as dt
+
+import pytest
+
+from app.job_tracker.models.job_application import ApplicationStatus
+from app.job_tracker.repositories.email_reference_repository import EmailReferenceRepository
+from app.job_tracker.repositories.job_application_repository import JobApplicationRepository
+from app.job_tracker.repositories.scan_run_repository import ScanRunRepository
+
+from use_cases.helpers import explain_query_plans, make_email_data
+
+RECEIVED_AT = dt.datetime(2024, 1, 1, 12, 0, 0, tzinfo=dt.timezone.utc)
+
+
+async def _seed(db_session) -> int:
+    """One application with one linked and one unlinked email; returns its id."""
+    app = await JobApplicationRepository(db_session).create({"company_name": "Acme", "role_title": "Dev"})
+    await EmailReferenceRepository(db_session).bulk_create([
+        {**make_email_data("linked"), "application_id": app.id},
+        make_email_data("unlinked"),
+    ])
+    await ScanRunRepository(db_session).create()
+    await db_session.flush()
+    return app.id
+
+
+@pytest.mark.asyncio
+class TestJobApplicationQueryPlans:
+    async def test_pipeline_page_reads_the_status_index_in_order(self, db_session):
+        repo = JobApplicationRepository(db_session)
+        await _seed(db_session)
+
+        count, page = await explain_query_plans(
+            db_session, lambda: repo.list_pipeline_page(ApplicationStatus.APPLIED, 1, 10)
+        )
+        assert "ix_job_applications_status_last_email_at (status=?)" in count
+        assert "ix_job_applications_status_last_email_at (status=?)" in page
+        assert "TEMP B-TREE" not in page
+
+    async def test_default_list_page_reads_the_sort_index(self, db_session):
+        repo = JobApplicationRepository(db_session)
+        await _seed(db_session)
+        await repo.create({"company_name": "Globex"})
+        _, _, cursor = await repo.list_paginated(limit=1, offset=0)
+        assert cursor is not None
+
+        _, first_page = await explain_query_plans(db_session, lambda: repo.list_paginated(limit=10, offset=0))
+        # Cursor pages skip the count: the page query is the only statement.
+        [cursor_page] = await explain_query_plans(
+            db_session, lambda: repo.list_paginated(limit=10, offset=0, cursor=cursor)
+        )
+        for page in (first_page, cursor_page):
+            assert "ix_job_applications_last_email_at" in page
+            assert "TEMP B-TREE" not in page
+
+    async def test_status_filtered_list_page_reads_the_status_index(self, db_session):
+        repo = JobApplicationRepository(db_session)
+        await _seed(db_session)
+
+        _, page = await explain_query_plans(
+            db_session, lambda: repo.list_paginated(limit=10, offset=0, status=ApplicationStatus.OFFER)
+        )
+        assert "ix_job_applications_status_last_email_at (status=?)" in page
+        assert "TEMP B-TREE" not in page
+
+    async def test_linked_email_lookups_use_the_application_index(self, db_session):
+        repo = JobApplicationRepository(db_session)
+        app_id = await _seed(db_session)
+
+        plans = [
+            *await explain_query_plans(db_session, lambda: repo.list_paginated(limit=10, offset=0, include_emails=True)),
+            *await explain_query_plans(db_session, lambda: repo.remove_linked_email(app_id, RECEIVED_AT)),
+            *await explain_query_plans(db_session, repo.recompute_email_counters),
+        ]
+        email_plans = [plan for plan in plans if "email_references" in plan]
+        assert len(email_plans) == 3
+        for plan in email_plans:
+            assert "ix_email_references_application_id_received_at (application_id=" in plan
+
+    async def test_bulk_delete_finds_linked_emails_by_index(self, db_session):
+        repo = JobApplicationRepository(db_session)
+        app_id = await _seed(db_session)
+
+        _, delete_emails, delete_apps = await explain_query_plans(db_session, lambda: repo.bulk_delete([app_id]))
+        assert "ix_email_references_application_id_received_at (application_id=?)" in delete_emails
+        assert "INTEGER PRIMARY KEY" in delete_apps
+
+    async def test_company_summary_groups_by_the_company_index(self, db_session):
+        repo = JobApplicationRepository(db_session)
+        await _seed(db_session)
+
+        count, *_ = await explain_query_plans(db_session, lambda: repo.list_company_summary_page())
+        assert "INDEX ix_job_applications_company_name" in count
+
+
+@pytest.mark.asyncio
+class TestEmailReferenceQueryPlans:
+    async def test_list_page_reads_the_received_at_index(self, db_session):
+        repo = EmailReferenceRepository(db_session)
+        await _seed(db_session)
+        _, _, cursor = await repo.list_paginated(limit=1, offset=0)
+        assert cursor is not None
+
+        _, first_page = await explain_query_plans(db_session, lambda: repo.list_paginated(limit=10, offset=0))
+        [cursor_page] = await explain_query_plans(
+            db_session, lambda: repo.list_paginated(limit=10, offset=0, cursor=cursor)
+        )
+        for page in (first_page, cursor_page):
+            assert "ix_email_references_received_at_id" in page
+            assert "TEMP B-TREE" not in page
+
+    async def test_unlinked_backlog_is_an_index_search(self, db_session):
+        repo = EmailReferenceRepository(db_session)
+        await _seed(db_session)
+
+        plans = [
+            *await explain_query_plans(db_session, repo.list_unlinked),
+            *await explain_query_plans(db_session, lambda: repo.list_unlinked(stale_for_version=3)),
+            *await explain_query_plans(
+                db_session, lambda: repo.list_evaluated_unlinked(3, containing={"acme", "glob"})
+            ),
+        ]
+        assert len(plans) == 3
+        for plan in plans:
+            # PostgreSQL reads the small partial ix_email_references_unlinked;
+            # SQLite's planner prefers the composite's application_id=NULL range.
+            assert "ix_email_references_unlinked" in plan or (
+                "ix_email_references_application_id_received_at (application_id=?)" in plan
+            )
+
+    async def test_message_and_thread_lookups_use_their_indexes(self, db_session):
+        repo = EmailReferenceRepository(db_session)
+        await _seed(db_session)
+
+        existing, = await explain_query_plans(db_session, lambda: repo.list_existing_message_ids(["msg-linked"]))
+        threads, = await explain_query_plans(db_session, lambda: repo.map_thread_applications(["thread-1"]))
+        # The unique constraint's own index; no separate gmail_message_id index remains.
+        assert "COVERING INDEX sqlite_autoindex_email_references_1 (gmail_message_id=?)" in existing
+        assert "ix_email_references_gmail_thread_id (gmail_thread_id=?)" in threads
+
+
+@pytest.mark.asyncio
+class TestScanRunQueryPlans:
+    async def test_history_queries_read_newest_first_from_an_index(self, db_session):
+        repo = ScanRunRepository(db_session)
+        await _seed(db_session)
+
+        last_history, = await explain_query_plans(db_session, repo.get_last_history_id)
+        recent, = await explain_query_plans(db_session, repo.list_recent)
+        assert "ix_scan_runs_status_started_at_id (status=?)" in last_history
+        assert "ix_scan_runs_started_at" in recent
+        assert "TEMP B-TREE" not in last_history + recent
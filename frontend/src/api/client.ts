@@ -61,6 +61,7 @@ export const fetchApplications = (params?: {
 export const fetchEmails = (params?: {
   limit?: number
   offset?: number
+  search?: string
 }): Promise<EmailReferencePage> =>
   apiClient.get<EmailReferencePage>('/job-tracker/emails', { params }).then((r) => r.data)
 
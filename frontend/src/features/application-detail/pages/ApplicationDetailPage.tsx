@@ -75,10 +75,10 @@ const ApplicationDetailPage = () => {
           <Mail size={16} className="text-t2" />
           <h2 className="text-t1 font-semibold text-sm">
             Email Thread
-            {app.emails.length > 0 && <span className="ml-2 text-t2 font-normal">({app.emails.length})</span>}
+            {app.email_count > 0 && <span className="ml-2 text-t2 font-normal">({app.email_count})</span>}
           </h2>
         </div>
-        <EmailThread emails={app.emails} />
+        <EmailThread emails={app.emails ?? []} />
       </Card>
 
       <ActivityTimeline app={app} />
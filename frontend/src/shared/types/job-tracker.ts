@@ -29,7 +29,8 @@ export interface JobApplication {
   next_action_at?: string
   created_at: string
   updated_at: string
-  emails: EmailReference[]
+  // Present on single-application responses; lists include it only with ?include=emails.
+  emails?: EmailReference[]
   email_count: number
 }
 